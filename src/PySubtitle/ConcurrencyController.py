@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+class ConcurrencyController:
+    """
+    Adapts the number of requests in flight to what the provider can handle (additive increase, multiplicative decrease).
+
+    The limit rises by one for each round of successful requests, up to the maximum, and is cut sharply when the
+    provider reports a rate limit or the p95 latency rises well above the best seen so far.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: int = None,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        window: int = 20,
+    ):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = max(min(min_limit, self.max_limit), 1)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.window = window
+
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.in_flight = 0
+        self.rate_limit_count = 0
+        self.paused_until = 0.0
+        self.latencies = deque(maxlen=window)
+        self.best_p95 = None
+
+        initial_limit = initial_limit or max(self.max_limit // 2, self.min_limit)
+        self._limit = float(max(min(initial_limit, self.max_limit), self.min_limit))
+
+    @property
+    def limit(self) -> int:
+        """The number of requests currently allowed in flight"""
+        return int(self._limit)
+
+    @property
+    def p95_latency(self) -> float:
+        with self.condition:
+            return self._get_p95()
+
+    def Acquire(self) -> bool:
+        """
+        Wait until another request can be sent, returns False if the controller has been stopped
+        """
+        with self.condition:
+            while not self.stopped:
+                delay = self.paused_until - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                elif self.in_flight >= self.limit:
+                    self.condition.wait()
+                else:
+                    self.in_flight += 1
+                    return True
+
+            return False
+
+    def Release(self, latency: float, success: bool = True):
+        """
+        Record the outcome of a request and free its slot
+        """
+        with self.condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+
+            if success and latency is not None:
+                self.latencies.append(latency)
+                if self._latency_degraded():
+                    self._decrease("p95 latency has risen")
+                else:
+                    self._limit = min(self._limit + 1.0 / self._limit, float(self.max_limit))
+
+            self.condition.notify_all()
+
+    def OnRateLimited(self, retry_after: float = None):
+        """
+        The provider rejected a request for exceeding a rate limit, back off and pause new requests
+        """
+        with self.condition:
+            self.rate_limit_count += 1
+
+            now = time.monotonic()
+            if now >= self.paused_until:
+                # Requests already in flight may also be rejected, only count the first signal
+                self._decrease("rate limit reached")
+
+            pause = retry_after if retry_after and retry_after > 0 else 1.0
+            self.paused_until = max(self.paused_until, now + pause)
+            self.condition.notify_all()
+
+    def Stop(self):
+        """
+        Release any threads waiting to send a request
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def _decrease(self, reason: str):
+        previous_limit = self.limit
+        self._limit = max(self._limit * self.decrease_factor, float(self.min_limit))
+        self.latencies.clear()
+
+        if self.limit != previous_limit:
+            logging.info(f"Reducing concurrent requests from {previous_limit} to {self.limit} ({reason})")
+
+    def _latency_degraded(self) -> bool:
+        """
+        Check whether the p95 latency of a full window is much worse than the best window seen
+        """
+        if len(self.latencies) < self.window:
+            return False
+
+        p95 = self._get_p95()
+        if self.best_p95 is None or p95 < self.best_p95:
+            self.best_p95 = p95
+            return False
+
+        return p95 > self.best_p95 * self.latency_tolerance
+
+    def _get_p95(self) -> float:
+        if not self.latencies:
+            return None
+
+        latencies = sorted(self.latencies)
+        return latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
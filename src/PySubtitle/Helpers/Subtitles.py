@@ -85,6 +85,29 @@ def ResyncTranslatedLines(original_lines: list[SubtitleLine], translated_lines:
         logging.warning(f"Number of lines in original and translated subtitles don't match. Synced {min_lines} lines.")
 
 
+def FindBestSplitIndex(lines: list[SubtitleLine], min_size: int = 1) -> int | None:
+    """
+    Find the index to split a list of lines in two, at the largest gap weighted towards the middle
+    """
+    midpoint = len(lines) // 2
+    if midpoint < min_size:
+        return None
+
+    best_split_index = None
+    best_split_score = 0
+
+    for i in range(min_size, len(lines) - min_size):
+        gap = lines[i].start - lines[i - 1].end
+        proximity_to_midpoint = midpoint - abs(i - midpoint)
+        split_score = proximity_to_midpoint * (gap / timedelta(milliseconds=1))
+
+        if split_score > best_split_score:
+            best_split_score = split_score
+            best_split_index = i
+
+    return best_split_index
+
+
 def FindSplitPoint(
     line: SubtitleLine, split_sequences: list[regex.Pattern], min_duration: timedelta, min_split_chars: int
 ) -> int | None:
@@ -135,6 +135,9 @@ class DummyProvider(TranslationProvider):
         client_settings.update(settings)
         return DummyTranslationClient(settings=client_settings)
 
+    def _allow_multithreaded_translation(self) -> bool:
+        return self.settings.get("supports_parallel_threads", False)
+
 
 class DummyTranslationClient(TranslationClient):
     def __init__(self, settings: dict):
@@ -181,7 +184,47 @@ class DummyTranslationClient(TranslationClient):
         return prompt
 
     def _request_translation(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+        if prompt.user_prompt.startswith("Summarise scene"):
+            return Translation({"text": f"<summary>{prompt.user_prompt}</summary>"})
+
         for user_prompt, text in self.response_map.items():
             if user_prompt == prompt.user_prompt:
                 text = text.replace("\\n", "\n")
+
+                max_response_lines = self.settings.get("max_response_lines")
+                if max_response_lines:
+                    return self._truncate_response(prompt, text, max_response_lines)
+
                 return Translation({"text": text})
+
+    def _truncate_response(self, prompt: TranslationPrompt, text: str, max_lines: int) -> Translation:
+        """
+        Respond with only the lines in the prompt, cutting the response off part way through if there are too many
+        (as if the token limit was reached, or the stream was interrupted if truncated_finish_reason is "interrupted")
+        """
+        requested = set(regex.findall(r"^#(\d+)$", prompt.batch_prompt, regex.MULTILINE))
+        blocks = regex.split(r"\n+(?=#\d+\n)", text.strip())
+        blocks = [block for block in blocks if regex.match(r"#(\d+)\n", block) and block[1:].split("\n")[0] in requested]
+
+        if len(blocks) <= max_lines:
+            return Translation({"text": "\n\n".join(blocks), "finish_reason": "stop"})
+
+        truncated = blocks[max_lines][: len(blocks[max_lines]) // 2]
+        finish_reason = self.settings.get("truncated_finish_reason", "length")
+        return Translation({"text": "\n\n".join(blocks[:max_lines] + [truncated]), "finish_reason": finish_reason})
+
+    @property
+    def supports_streaming(self):
+        return self.settings.get("supports_streaming", False)
+
+    def _request_streamed_translation(self, prompt: TranslationPrompt, temperature: float, streaming_callback) -> Translation:
+        """
+        Stream the response to the callback in small fragments
+        """
+        translation = self._request_translation(prompt, temperature)
+        if translation:
+            text = translation.full_text
+            for i in range(0, len(text), 16):
+                streaming_callback(text[i : i + 16])
+
+        return translation
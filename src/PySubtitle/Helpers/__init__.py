@@ -79,6 +79,11 @@ def GetInputPath(filepath):
         return None
 
     basename, _ = os.path.splitext(os.path.basename(filepath))
+
+    # Compressed and database project files have a double extension
+    if basename.endswith(".subtrans"):
+        basename = basename[: -len(".subtrans")]
+
     if basename.endswith("-ChatGPT"):
         basename = basename[0 : basename.index("-ChatGPT")]
     if basename.endswith("-GPT"):
@@ -93,6 +98,10 @@ def GetOutputPath(filepath, language="translated"):
 
     basename, _ = os.path.splitext(os.path.basename(filepath))
 
+    # Compressed and database project files have a double extension
+    if basename.endswith(".subtrans"):
+        basename = basename[: -len(".subtrans")]
+
     if basename.endswith("-ChatGPT"):
         basename = basename[0 : basename.index("-ChatGPT")]
     if basename.endswith("-GPT"):
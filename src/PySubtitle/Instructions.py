@@ -55,6 +55,17 @@ default_retry_instructions = linesep.join(
     ]
 )
 
+default_summary_instructions = linesep.join(
+    [
+        "Your task is to write a brief synopsis of a scene, based on its subtitles.",
+        "",
+        "The user will provide the subtitle lines for the scene. Do NOT translate them.",
+        "Respond with one or two sentences describing what happens in the scene and who is involved, "
+        "using any names or terms that will help a translator to understand later scenes.",
+        "Your response will be processed by an automated system, so enclose the synopsis in <summary></summary> tags.",
+    ]
+)
+
 
 class Instructions:
     def __init__(self, settings):
@@ -38,6 +38,9 @@ default_options = {
     "scene_threshold": float(os.getenv("SCENE_THRESHOLD", 30.0)),
     "min_batch_size": int(os.getenv("MIN_BATCH_SIZE", 10)),
     "max_batch_size": int(os.getenv("MAX_BATCH_SIZE", 30)),
+    "max_batch_tokens": int(os.getenv("MAX_BATCH_TOKENS", 0)),
+    "token_estimator": os.getenv("TOKEN_ESTIMATOR", "auto"),
+    "coalesce_scene_size": int(os.getenv("COALESCE_SCENE_SIZE", 0)),
     "max_context_summaries": int(os.getenv("MAX_CONTEXT_SUMMARIES", 10)),
     "max_characters": int(os.getenv("MAX_CHARACTERS", 120)),
     "max_newlines": int(os.getenv("MAX_NEWLINES", 2)),
@@ -60,14 +63,31 @@ default_options = {
     "full_width_punctuation": env_bool("FULL_WIDTH_PUNCTUATION", False),
     "convert_wide_dashes": env_bool("CONVERT_WIDE_DASHES", True),
     "retry_on_error": env_bool("RETRY_ON_ERROR", True),
+    "targeted_retry": env_bool("TARGETED_RETRY", True),
+    "retry_context_lines": int(os.getenv("RETRY_CONTEXT_LINES", 2)),
     # 'autosplit_incomplete': env_bool('AUTOSPLIT_INCOMPLETE', True),
     "max_lines": int(os.getenv("MAX_LINES")) if os.getenv("MAX_LINES") else None,
-    "max_threads": int(os.getenv("MAX_THREADS", 4)),
+    "max_threads": int(os.getenv("MAX_THREADS", 1)),
+    "stream_responses": env_bool("STREAM_RESPONSES", False),
+    "adaptive_concurrency": env_bool("ADAPTIVE_CONCURRENCY", False),
+    "scene_summary_prepass": env_bool("SCENE_SUMMARY_PREPASS", False),
+    "summary_model": os.getenv("SUMMARY_MODEL", None),
+    "token_rate_limit": int(os.getenv("TOKEN_RATE_LIMIT")) if os.getenv("TOKEN_RATE_LIMIT") else None,
+    "rate_limit_file": os.getenv("RATE_LIMIT_FILE", None),
     "max_retries": int(os.getenv("MAX_RETRIES", 1)),
     "max_summary_length": int(os.getenv("MAX_SUMMARY_LENGTH", 240)),
     "backoff_time": float(os.getenv("BACKOFF_TIME", 3.0)),
+    "cache_responses": env_bool("CACHE_RESPONSES", False),
+    "bypass_cache": env_bool("BYPASS_CACHE", False),
+    "cache_dir": os.getenv("CACHE_DIR", None),
+    "cache_max_size": int(os.getenv("CACHE_MAX_SIZE", 100 * 1024 * 1024)),
+    "cache_ttl": float(os.getenv("CACHE_TTL", 30 * 24 * 3600)),
     "project": os.getenv("PROJECT", None),
     "autosave": env_bool("AUTOSAVE", True),
+    "autosave_interval": float(os.getenv("AUTOSAVE_INTERVAL", 5.0)),
+    "autosave_batches": int(os.getenv("AUTOSAVE_BATCHES", 10)),
+    "project_journal": env_bool("PROJECT_JOURNAL", True),
+    "journal_compact_threshold": int(os.getenv("JOURNAL_COMPACT_THRESHOLD", 50)),
     "last_used_path": None,
     "stop_on_error": env_bool("STOP_ON_ERROR"),
     "write_backup": env_bool("WRITE_BACKUP_FILE", True),
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from PySubtitle.SubtitleBatch import SubtitleBatch
+from PySubtitle.SubtitleScene import SubtitleScene
+
+
+class ProjectAutosave:
+    """
+    Saves changes to a project on a background thread, so that the translator does not have to wait for the disk.
+
+    Save requests are coalesced, so the project is saved at most once every interval seconds unless batch_count
+    changes have been requested since the last save. Each changed batch or scene is only passed to the save function
+    once, however many times it changed in between.
+    """
+
+    def __init__(
+        self,
+        save_function: Callable[[list[SubtitleBatch], list[SubtitleScene]], None],
+        interval: float = 5.0,
+        batch_count: int = 10,
+    ):
+        self.save_function = save_function
+        self.interval = interval
+        self.batch_count = batch_count
+        self.save_count = 0
+        self.condition = threading.Condition()
+        self._batches: dict[tuple, SubtitleBatch] = {}
+        self._scenes: dict[int, SubtitleScene] = {}
+        self._requests = 0
+        self._last_save = time.monotonic()
+        self._saving = False
+        self._stopping = False
+        self._thread: threading.Thread = None
+
+    @property
+    def pending(self) -> bool:
+        with self.condition:
+            return self._requests > 0 or self._saving
+
+    def RequestSave(self, batch: SubtitleBatch = None, scene: SubtitleScene = None):
+        """
+        Queue a save of the project, optionally noting a batch or scene that has changed
+        """
+        with self.condition:
+            if batch:
+                self._batches[(batch.scene, batch.number)] = batch
+            if scene:
+                self._scenes[scene.number] = scene
+
+            self._requests += 1
+
+            if not self._thread or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="ProjectAutosave", daemon=True)
+                self._thread.start()
+
+            self.condition.notify_all()
+
+    def Flush(self):
+        """
+        Wait for any pending changes to be saved
+        """
+        with self.condition:
+            while self._saving:
+                self.condition.wait()
+
+            batches, scenes = self._take_changes()
+
+        if batches is not None:
+            self._save(batches, scenes)
+
+    def Stop(self):
+        """
+        Save any pending changes and stop the background thread
+        """
+        with self.condition:
+            self._stopping = True
+            self.condition.notify_all()
+            thread = self._thread
+
+        if thread and thread is not threading.current_thread():
+            thread.join()
+
+        self.Flush()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self._stopping and not self._is_due():
+                    waiting = self._requests and not self._saving
+                    timeout = max(self._last_save + self.interval - time.monotonic(), 0) if waiting else None
+                    self.condition.wait(timeout)
+
+                if self._stopping:
+                    return
+
+                batches, scenes = self._take_changes()
+
+            self._save(batches, scenes)
+
+    def _is_due(self) -> bool:
+        if not self._requests or self._saving:
+            return False
+
+        if self.batch_count and self._requests >= self.batch_count:
+            return True
+
+        return time.monotonic() - self._last_save >= self.interval
+
+    def _take_changes(self) -> tuple[list[SubtitleBatch], list[SubtitleScene]]:
+        """
+        Claim the pending changes for a save (the caller must hold the lock)
+        """
+        if not self._requests:
+            return None, None
+
+        batches = list(self._batches.values())
+        scenes = list(self._scenes.values())
+        self._batches = {}
+        self._scenes = {}
+        self._requests = 0
+        self._saving = True
+        return batches, scenes
+
+    def _save(self, batches: list[SubtitleBatch], scenes: list[SubtitleScene]):
+        try:
+            self.save_function(batches, scenes)
+            self.save_count += 1
+
+        except Exception as e:
+            logging.error(f"Failed to save project: {e}")
+
+        finally:
+            with self.condition:
+                self._saving = False
+                self._last_save = time.monotonic()
+                self.condition.notify_all()
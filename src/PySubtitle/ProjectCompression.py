@@ -0,0 +1,117 @@
+import gzip
+import io
+import logging
+import os
+from contextlib import contextmanager
+
+from PySubtitle.SubtitleError import SubtitleError
+
+
+try:
+    import zstandard
+
+except ImportError as e:
+    logging.debug(f"Failed to import zstandard: {e}")
+    zstandard = None
+
+
+default_encoding = os.getenv("DEFAULT_ENCODING", "utf-8")
+
+gzip_extension = ".subtrans.gz"
+zstd_extension = ".subtrans.zst"
+
+compressed_extensions = [gzip_extension, zstd_extension]
+
+read_chunk_size = 1024 * 1024
+
+
+def IsCompressedProject(filepath: str) -> bool:
+    """
+    Check whether a project file path refers to a compressed project file
+    """
+    return bool(filepath) and filepath.lower().endswith(tuple(compressed_extensions))
+
+
+def IsZstdAvailable() -> bool:
+    """
+    Check whether the zstandard package is installed
+    """
+    return zstandard is not None
+
+
+def OpenProjectFile(filepath: str, mode: str = "r"):
+    """
+    Open a project file as a text stream, compressing or decompressing it according to the extension
+    """
+    if mode not in ("r", "w"):
+        raise ValueError(f"Unsupported mode {mode}")
+
+    lower_path = filepath.lower()
+    if lower_path.endswith(gzip_extension):
+        # Level 6 is much faster than the default of 9 and compresses the project file almost as well
+        return gzip.open(filepath, f"{mode}t", compresslevel=6, encoding=default_encoding)
+
+    if lower_path.endswith(zstd_extension):
+        _require_zstd()
+        return zstandard.open(filepath, f"{mode}t", encoding=default_encoding)
+
+    return open(filepath, mode, encoding=default_encoding)
+
+
+@contextmanager
+def OpenProjectReader(filepath: str, digest=None):
+    """
+    Open a project file as a text stream for reading, decompressing it as it is read.
+
+    If a hashlib digest is provided it is updated with the bytes on disk as they are read, so the file can be identified
+    without reading it twice or holding the compressed data in memory.
+    """
+    with open(filepath, "rb") as file:
+        source = io.BufferedReader(_DigestReader(file, digest)) if digest else file
+
+        with _open_text_reader(filepath, source) as reader:
+            yield reader
+
+            # Include any bytes the decoder did not need in the digest
+            if digest:
+                while source.read(read_chunk_size):
+                    pass
+
+
+def _open_text_reader(filepath: str, source):
+    """
+    Decode a binary stream as text, decompressing it according to the extension of the file
+    """
+    lower_path = filepath.lower()
+    if lower_path.endswith(gzip_extension):
+        return gzip.open(source, "rt", encoding=default_encoding)
+
+    if lower_path.endswith(zstd_extension):
+        _require_zstd()
+        return zstandard.open(source, "rt", encoding=default_encoding, closefd=False)
+
+    return io.TextIOWrapper(source, encoding=default_encoding)
+
+
+class _DigestReader(io.RawIOBase):
+    """
+    Update a digest with the bytes read from a binary file
+    """
+
+    def __init__(self, file, digest):
+        self.file = file
+        self.digest = digest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self.file.readinto(buffer)
+        if count:
+            self.digest.update(memoryview(buffer)[:count])
+        return count
+
+
+def _require_zstd():
+    if zstandard is None:
+        raise SubtitleError("The zstandard package is required for .subtrans.zst project files (pip install zstandard)")
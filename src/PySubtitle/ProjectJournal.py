@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from PySubtitle.ProjectCompression import read_chunk_size
+from PySubtitle.SubtitleBatch import SubtitleBatch
+from PySubtitle.SubtitleError import SubtitleError
+from PySubtitle.SubtitleFile import SubtitleFile
+from PySubtitle.SubtitleScene import SubtitleScene
+from PySubtitle.SubtitleSerialisation import SubtitleDecoder, SubtitleEncoder
+
+
+default_encoding = os.getenv("DEFAULT_ENCODING", "utf-8")
+
+
+class ProjectJournal:
+    """
+    Append-only log of the changes made to a project since the project file was last written in full.
+
+    Each record is a single line of compact JSON, so saving a translated batch costs one short append rather than a
+    rewrite of the whole project. The first line holds a hash of the project file the journal applies to, so that a
+    journal left over from an older version of the project file is discarded rather than replayed.
+    """
+
+    def __init__(self, projectfile: str):
+        self.projectfile = projectfile
+        self.path = f"{projectfile}-journal"
+        self.snapshot_hash = None
+        self.record_count = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def CreateSnapshotDigest():
+        """
+        Create a digest to identify the version of the project file that a journal applies to
+        """
+        return hashlib.sha256()
+
+    def Reset(self, snapshot_hash: str = None):
+        """
+        Discard the journal, because the project file has been written in full
+        """
+        with self.lock:
+            if snapshot_hash is None:
+                digest = self.CreateSnapshotDigest()
+                with open(self.projectfile, "rb") as f:
+                    for chunk in iter(lambda: f.read(read_chunk_size), b""):
+                        digest.update(chunk)
+                snapshot_hash = digest.hexdigest()
+
+            self.snapshot_hash = snapshot_hash
+            self.record_count = 0
+
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def AppendBatch(self, batch: SubtitleBatch):
+        """
+        Record the current state of a batch
+        """
+        self._append({"scene": batch.scene, "batch": batch.number, "data": batch})
+
+    def AppendScene(self, scene: SubtitleScene):
+        """
+        Record the context of a scene, e.g. an updated summary
+        """
+        self._append({"scene": scene.number, "context": scene.context})
+
+    def Replay(self, subtitles: SubtitleFile, snapshot_hash: str) -> int:
+        """
+        Apply the records in the journal to subtitles loaded from the project file, returning the number applied
+        """
+        with self.lock:
+            self.snapshot_hash = snapshot_hash
+            self.record_count = 0
+
+            if not os.path.exists(self.path):
+                return 0
+
+            with open(self.path, encoding=default_encoding) as f:
+                lines = f.readlines()
+
+            try:
+                header = json.loads(lines[0]) if lines else {}
+            except json.JSONDecodeError:
+                header = {}
+
+            if header.get("project") != snapshot_hash:
+                logging.warning(f"Discarding journal {self.path} because it does not match the project file")
+                os.remove(self.path)
+                return 0
+
+            for index, line in enumerate(lines[1:], start=2):
+                try:
+                    record = json.loads(line, cls=SubtitleDecoder)
+                    self._apply_record(subtitles, record)
+                    self.record_count += 1
+
+                except json.JSONDecodeError:
+                    # Only the last record can be incomplete, if the process was interrupted while writing it
+                    logging.warning(f"Ignoring incomplete record at line {index} of {self.path}")
+                    break
+
+                except SubtitleError as e:
+                    logging.warning(f"Unable to apply record at line {index} of {self.path}: {e}")
+
+            return self.record_count
+
+    def _append(self, record: dict):
+        """
+        Append a record to the journal and make sure that it reaches the disk
+        """
+        with self.lock:
+            if self.snapshot_hash is None:
+                raise SubtitleError("Journal has not been initialised with a project file")
+
+            lines = []
+            if not os.path.exists(self.path):
+                lines.append(json.dumps({"project": self.snapshot_hash}))
+
+            lines.append(json.dumps(record, cls=SubtitleEncoder, ensure_ascii=False))
+
+            with open(self.path, "a", encoding=default_encoding) as f:
+                f.write("".join(f"{line}\n" for line in lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.record_count += 1
+
+    def _apply_record(self, subtitles: SubtitleFile, record: dict):
+        scene: SubtitleScene = subtitles.GetScene(record.get("scene"))
+        if not scene:
+            raise SubtitleError(f"Scene {record.get('scene')} does not exist")
+
+        if "batch" not in record:
+            scene.context = record.get("context") or {}
+            return
+
+        batch: SubtitleBatch = record.get("data")
+        if not isinstance(batch, SubtitleBatch):
+            raise SubtitleError(f"Scene {scene.number} batch {record.get('batch')} record is invalid")
+
+        batches = scene.batches
+        for index, existing in enumerate(batches):
+            if existing.number == batch.number:
+                batches[index] = batch
+                return
+
+        raise SubtitleError(f"Scene {scene.number} batch {batch.number} does not exist")
@@ -0,0 +1,250 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from PySubtitle.ProjectCompression import OpenProjectFile
+from PySubtitle.SubtitleBatch import SubtitleBatch
+from PySubtitle.SubtitleError import SubtitleError
+from PySubtitle.SubtitleFile import SubtitleFile
+from PySubtitle.SubtitleLine import SubtitleLine
+from PySubtitle.SubtitleScene import SubtitleScene
+from PySubtitle.SubtitleSerialisation import SubtitleDecoder, SubtitleEncoder
+
+
+project_store_extension = ".subtrans.db"
+
+ORIGINAL = 0
+TRANSLATED = 1
+
+schema = """
+CREATE TABLE IF NOT EXISTS project (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS scenes (scene INTEGER PRIMARY KEY, context TEXT);
+CREATE TABLE IF NOT EXISTS batches (
+    scene INTEGER, batch INTEGER, summary TEXT, context TEXT, errors TEXT, PRIMARY KEY (scene, batch)
+);
+CREATE TABLE IF NOT EXISTS lines (
+    scene INTEGER, batch INTEGER, kind INTEGER, position INTEGER, line TEXT, translation TEXT, original TEXT,
+    PRIMARY KEY (scene, batch, kind, position)
+);
+CREATE TABLE IF NOT EXISTS translations (scene INTEGER, batch INTEGER, content TEXT, PRIMARY KEY (scene, batch));
+CREATE TABLE IF NOT EXISTS prompts (scene INTEGER, batch INTEGER, prompt TEXT, PRIMARY KEY (scene, batch));
+"""
+
+
+def IsProjectStore(filepath: str) -> bool:
+    """
+    Check whether a project file path refers to an SQLite project store
+    """
+    return bool(filepath) and filepath.lower().endswith(project_store_extension)
+
+
+class ProjectStore:
+    """
+    Stores a project in an SQLite database, as an alternative to a .subtrans JSON file.
+
+    Scenes, batches, lines, translations and prompts are stored in separate tables, so a translated batch can be saved
+    with a point update, and the translation and prompt for each batch are only loaded when they are needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(schema)
+
+    @property
+    def has_project(self) -> bool:
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM scenes LIMIT 1").fetchone() is not None
+
+    def Close(self):
+        with self.lock:
+            self.connection.close()
+
+    def Save(self, subtitles: SubtitleFile):
+        """
+        Replace the stored project with the subtitles
+        """
+        with self.lock, subtitles.lock.read():
+            # Load any deferred fields before their rows are replaced
+            batches = [batch for scene in subtitles.scenes for batch in scene.batches]
+            rows = [self._get_batch_rows(batch) for batch in batches]
+
+            with self.connection:
+                for table in ["project", "scenes", "batches", "lines", "translations", "prompts"]:
+                    self.connection.execute(f"DELETE FROM {table}")
+
+                project = {
+                    "sourcepath": subtitles.sourcepath,
+                    "outputpath": subtitles.outputpath,
+                    "settings": subtitles.settings,
+                }
+                self.connection.executemany(
+                    "INSERT INTO project (key, value) VALUES (?, ?)",
+                    [(key, self._encode(value)) for key, value in project.items()],
+                )
+
+                self.connection.executemany(
+                    "INSERT INTO scenes (scene, context) VALUES (?, ?)",
+                    [(scene.number, self._encode(scene.context)) for scene in subtitles.scenes],
+                )
+
+                for batch_row, line_rows, translation_row, prompt_row in rows:
+                    self._insert_batch_rows(batch_row, line_rows, translation_row, prompt_row)
+
+    def SaveBatch(self, batch: SubtitleBatch):
+        """
+        Update a single batch in the store
+        """
+        with self.lock:
+            batch_row, line_rows, translation_row, prompt_row = self._get_batch_rows(batch)
+            key = (batch.scene, batch.number)
+
+            with self.connection:
+                for table in ["batches", "lines", "translations", "prompts"]:
+                    self.connection.execute(f"DELETE FROM {table} WHERE scene = ? AND batch = ?", key)
+
+                self._insert_batch_rows(batch_row, line_rows, translation_row, prompt_row)
+
+    def SaveScene(self, scene: SubtitleScene):
+        """
+        Update the context of a scene in the store
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO scenes (scene, context) VALUES (?, ?)", (scene.number, self._encode(scene.context))
+            )
+
+    def Load(self, lazy: bool = True) -> SubtitleFile:
+        """
+        Load the project from the store, deferring translations and prompts until they are accessed if lazy is True
+        """
+        with self.lock:
+            project = {key: self._decode(value) for key, value in self.connection.execute("SELECT key, value FROM project")}
+            if not project:
+                raise SubtitleError(f"No project found in {self.path}")
+
+            lines = {}
+            for scene_number, batch_number, kind, line, translation, original in self.connection.execute(
+                "SELECT scene, batch, kind, line, translation, original FROM lines ORDER BY scene, batch, kind, position"
+            ):
+                batch_lines = lines.setdefault((scene_number, batch_number), ([], []))
+                batch_lines[kind].append(SubtitleLine(line, translation=translation, original=original))
+
+            batches = {}
+            for scene_number, batch_number, summary, context, errors in self.connection.execute(
+                "SELECT scene, batch, summary, context, errors FROM batches ORDER BY scene, batch"
+            ):
+                originals, translated = lines.get((scene_number, batch_number), ([], []))
+                batch = SubtitleBatch(
+                    {
+                        "scene": scene_number,
+                        "number": batch_number,
+                        "summary": summary,
+                        "context": self._decode(context) or {},
+                        "errors": self._decode(errors) or [],
+                        "originals": originals,
+                        "translated": translated,
+                    }
+                )
+
+                key = (scene_number, batch_number)
+                if lazy:
+                    batch.Defer("translation", lambda key=key: self._load_field("translations", "content", key))
+                    batch.Defer("prompt", lambda key=key: self._load_field("prompts", "prompt", key))
+                else:
+                    batch.translation = self._load_field("translations", "content", key)
+                    batch.prompt = self._load_field("prompts", "prompt", key)
+
+                batches.setdefault(scene_number, []).append(batch)
+
+            scenes = [
+                SubtitleScene(
+                    {"number": scene_number, "context": self._decode(context) or {}, "batches": batches.get(scene_number, [])}
+                )
+                for scene_number, context in self.connection.execute("SELECT scene, context FROM scenes ORDER BY scene")
+            ]
+
+        subtitles = SubtitleFile(project.get("sourcepath"), project.get("outputpath"))
+        subtitles.settings = project.get("settings") or {}
+        subtitles.scenes = scenes
+        subtitles.UpdateProjectSettings({})
+        return subtitles
+
+    def _get_batch_rows(self, batch: SubtitleBatch) -> tuple:
+        key = (batch.scene, batch.number)
+        batch_row = (*key, batch.summary, self._encode(batch.context), self._encode(batch.errors or None))
+
+        line_rows = [
+            (*key, kind, position, line.line, line.translation, line.original)
+            for kind, batch_lines in [(ORIGINAL, batch.originals), (TRANSLATED, batch.translated)]
+            for position, line in enumerate(batch_lines or [])
+        ]
+
+        translation_row = (*key, self._encode(batch.translation)) if batch.translation else None
+        prompt_row = (*key, self._encode(batch.prompt)) if batch.prompt else None
+        return batch_row, line_rows, translation_row, prompt_row
+
+    def _insert_batch_rows(self, batch_row: tuple, line_rows: list[tuple], translation_row: tuple, prompt_row: tuple):
+        self.connection.execute(
+            "INSERT INTO batches (scene, batch, summary, context, errors) VALUES (?, ?, ?, ?, ?)", batch_row
+        )
+        self.connection.executemany(
+            "INSERT INTO lines (scene, batch, kind, position, line, translation, original) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            line_rows,
+        )
+
+        if translation_row:
+            self.connection.execute("INSERT INTO translations (scene, batch, content) VALUES (?, ?, ?)", translation_row)
+
+        if prompt_row:
+            self.connection.execute("INSERT INTO prompts (scene, batch, prompt) VALUES (?, ?, ?)", prompt_row)
+
+    def _load_field(self, table: str, column: str, key: tuple):
+        with self.lock:
+            row = self.connection.execute(f"SELECT {column} FROM {table} WHERE scene = ? AND batch = ?", key).fetchone()
+
+        return self._decode(row[0]) if row else None
+
+    def _encode(self, value) -> str:
+        return json.dumps(value, cls=SubtitleEncoder, ensure_ascii=False) if value is not None else None
+
+    def _decode(self, value: str):
+        return json.loads(value, cls=SubtitleDecoder) if value is not None else None
+
+
+def ImportProject(projectfile: str, store_path: str):
+    """
+    Copy a .subtrans JSON project file (which may be compressed) into an SQLite project store
+    """
+    with OpenProjectFile(projectfile) as f:
+        subtitles: SubtitleFile = json.load(f, cls=SubtitleDecoder)
+
+    store = ProjectStore(store_path)
+    try:
+        store.Save(subtitles)
+    finally:
+        store.Close()
+
+    logging.info(f"Imported {projectfile} into {store_path}")
+
+
+def ExportProject(store_path: str, projectfile: str):
+    """
+    Write the project in an SQLite project store to a .subtrans JSON project file
+    """
+    if not os.path.exists(store_path):
+        raise FileNotFoundError(store_path)
+
+    store = ProjectStore(store_path)
+    try:
+        subtitles = store.Load(lazy=False)
+    finally:
+        store.Close()
+
+    subtitles.SaveProjectFile(projectfile, encoder_class=SubtitleEncoder)
+    logging.info(f"Exported {store_path} to {projectfile}")
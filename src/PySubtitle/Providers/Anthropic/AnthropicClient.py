@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import threading
 import time
 
 
@@ -6,6 +8,7 @@ try:
     import anthropic
 
     from PySubtitle.Helpers import FormatMessages
+    from PySubtitle.Helpers.Parse import ParseDelayFromHeader
     from PySubtitle.SubtitleError import TranslationError, TranslationImpossibleError, TranslationResponseError
     from PySubtitle.Translation import Translation
     from PySubtitle.TranslationClient import TranslationClient
@@ -23,6 +26,9 @@ try:
 
             logging.info(f"Translating with Anthropic {self.model or 'default model'}")
 
+            self.client = None
+            self.lock = threading.Lock()
+
         @property
         def api_key(self):
             return self.settings.get("api_key")
@@ -39,6 +45,10 @@ try:
         def allow_thinking(self):
             return self.settings.get("thinking", False)
 
+        @property
+        def reuse_client(self):
+            return self.settings.get("reuse_client", True)
+
         @property
         def thinking(self):
             if self.allow_thinking:
@@ -50,22 +60,28 @@ try:
             """
             Request a translation based on the provided prompt
             """
-            try:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
+            logging.debug(f"Messages:\n{FormatMessages(prompt.messages)}")
 
-                # Try to add proxy settings if specified
-                if self.settings.get("proxy"):
-                    http_client = anthropic.DefaultHttpxClient(proxies=self.settings.get("proxy"))
-                    self.client = self.client.with_options(http_client=http_client)
+            temperature = temperature or self.temperature
+            response = self._send_messages(prompt.system_prompt, prompt.content, temperature)
 
-            except Exception as e:
-                raise TranslationImpossibleError("Failed to initialize Anthropic client", error=e) from e
+            return self._create_translation(response)
 
+        async def _request_translation_async(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+            """
+            Request a translation based on the provided prompt using the async client
+            """
             logging.debug(f"Messages:\n{FormatMessages(prompt.messages)}")
 
             temperature = temperature or self.temperature
-            response = self._send_messages(prompt.system_prompt, prompt.content, temperature)
+            response = await self._send_messages_async(prompt.system_prompt, prompt.content, temperature)
 
+            return self._create_translation(response)
+
+        def _create_translation(self, response: dict) -> Translation:
+            """
+            Construct a translation from the response, raising an error if it is unusable
+            """
             translation = Translation(response) if response else None
 
             if translation:
@@ -75,22 +91,51 @@ try:
                     )
 
                 if translation.reached_token_limit:
-                    raise TranslationError("Too many tokens in translation", translation=translation)
+                    # The translator can salvage the complete lines and request the rest
+                    logging.warning("Response was truncated at the token limit")
 
             return translation
 
+        def _abort(self):
+            with self.lock:
+                if self.client:
+                    self.client.close()
+                    self.client = None
+            return super()._abort()
+
+        def _get_client(self) -> anthropic.Anthropic:
+            """
+            Get the SDK client, creating it if necessary. The client is shared by all requests so connections are reused.
+            """
+            with self.lock:
+                if not self.client or not self.reuse_client:
+                    self.client = self._create_client()
+
+                return self.client
+
+        def _create_client(self) -> anthropic.Anthropic:
+            try:
+                http_client = None
+                if self.settings.get("proxy"):
+                    http_client = anthropic.DefaultHttpxClient(proxy=self.settings.get("proxy"))
+
+                return anthropic.Anthropic(api_key=self.api_key, http_client=http_client)
+
+            except Exception as e:
+                raise TranslationImpossibleError("Failed to initialize Anthropic client", error=e) from e
+
         def _send_messages(self, system_prompt: str, messages: list[str], temperature):
             """
             Make a request to the LLM to provide a translation
             """
-            result = {}
+            client = self._get_client()
 
             for retry in range(self.max_retries + 1):
                 if self.aborted:
                     return None
 
                 try:
-                    api_response = self.client.messages.create(
+                    api_response = client.messages.create(
                         model=self.model,
                         thinking=self.thinking,
                         messages=messages,
@@ -99,50 +144,112 @@ try:
                         max_tokens=self.max_tokens,
                     )
 
-                    if self.aborted:
-                        return None
-
-                    if not api_response.content:
-                        raise TranslationResponseError("No choices returned in the response", response=api_response)
-
-                    # response['response_time'] = getattr(response, 'response_ms', 0)
+                    # Return the response if the API call succeeds
+                    return self._process_response(api_response)
 
-                    if api_response.stop_reason == "max_tokens":
-                        result["finish_reason"] = "length"
-                    else:
-                        result["finish_reason"] = api_response.stop_reason
+                except Exception as e:
+                    retry_delay = self._get_retry_delay(e, retry)
 
-                    if api_response.usage:
-                        result["prompt_tokens"] = api_response.usage.input_tokens
-                        result["output_tokens"] = api_response.usage.output_tokens
+                if retry_delay:
+                    time.sleep(retry_delay)
 
-                    for piece in api_response.content:
-                        if piece.type == "thinking":
-                            result["reasoning"] = piece.thinking
-                        elif piece.type == "redacted_thinking":
-                            result["reasoning"] = "Reasoning redacted by API"
-                        elif piece.type == "text":
-                            result["text"] = piece.text
-                            break
+            raise TranslationImpossibleError(f"Failed to communicate with provider after {self.max_retries} retries")
 
-                    # Return the response if the API call succeeds
-                    return result
+        async def _send_messages_async(self, system_prompt: str, messages: list[str], temperature):
+            """
+            Make an asynchronous request to the LLM to provide a translation
+            """
+            for retry in range(self.max_retries + 1):
+                if self.aborted:
+                    return None
 
-                except (anthropic.APITimeoutError, anthropic.RateLimitError) as e:
-                    if retry < self.max_retries and not self.aborted:
-                        sleep_time = self.backoff_time * 2.0**retry
-                        logging.warning(f"{self._get_error_message(e)}, retrying in {sleep_time}...")
-                        time.sleep(sleep_time)
-                        continue
+                try:
+                    api_response = await self._get_async_client().messages.create(
+                        model=self.model,
+                        thinking=self.thinking,
+                        messages=messages,
+                        system=system_prompt,
+                        temperature=temperature if not self.allow_thinking else 1,
+                        max_tokens=self.max_tokens,
+                    )
 
-                except anthropic.APIError as e:
-                    raise TranslationImpossibleError(self._get_error_message(e), error=e) from e
+                    return self._process_response(api_response)
 
                 except Exception as e:
-                    raise TranslationError("Error communicating with provider", error=e) from e
+                    retry_delay = self._get_retry_delay(e, retry)
+
+                if retry_delay:
+                    await asyncio.sleep(retry_delay)
 
             raise TranslationImpossibleError(f"Failed to communicate with provider after {self.max_retries} retries")
 
+        def _process_response(self, api_response) -> dict:
+            """
+            Extract the text, reasoning and usage details from the API response
+            """
+            result = {}
+
+            if self.aborted:
+                return None
+
+            if not api_response.content:
+                raise TranslationResponseError("No choices returned in the response", response=api_response)
+
+            # response['response_time'] = getattr(response, 'response_ms', 0)
+
+            if api_response.stop_reason == "max_tokens":
+                result["finish_reason"] = "length"
+            else:
+                result["finish_reason"] = api_response.stop_reason
+
+            if api_response.usage:
+                result["prompt_tokens"] = api_response.usage.input_tokens
+                result["output_tokens"] = api_response.usage.output_tokens
+
+            for piece in api_response.content:
+                if piece.type == "thinking":
+                    result["reasoning"] = piece.thinking
+                elif piece.type == "redacted_thinking":
+                    result["reasoning"] = "Reasoning redacted by API"
+                elif piece.type == "text":
+                    result["text"] = piece.text
+                    break
+
+            return result
+
+        def _get_retry_delay(self, e: Exception, retry: int) -> float | None:
+            """
+            Decide whether a failed request should be retried, returning the delay before the next attempt.
+            Raises an exception if the error is not recoverable.
+            """
+            if isinstance(e, anthropic.RateLimitError):
+                retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+                self._report_rate_limit(ParseDelayFromHeader(retry_after) if retry_after else None)
+
+            if isinstance(e, (anthropic.APITimeoutError, anthropic.RateLimitError)):
+                if retry < self.max_retries and not self.aborted:
+                    sleep_time = self.backoff_time * 2.0**retry
+                    logging.warning(f"{self._get_error_message(e)}, retrying in {sleep_time}...")
+                    return sleep_time
+
+                return None
+
+            if isinstance(e, anthropic.APIError):
+                raise TranslationImpossibleError(self._get_error_message(e), error=e) from e
+
+            raise TranslationError("Error communicating with provider", error=e) from e
+
+        def _create_async_client(self):
+            try:
+                http_client = None
+                if self.settings.get("proxy"):
+                    http_client = anthropic.DefaultAsyncHttpxClient(proxy=self.settings.get("proxy"))
+
+                return anthropic.AsyncAnthropic(api_key=self.api_key, http_client=http_client)
+
+            except Exception as e:
+                raise TranslationImpossibleError("Failed to initialize Anthropic client", error=e) from e
+
         def _get_error_message(self, e: anthropic.APIError):
             return e.message or (e.body.get("error", {}).get("message", e.message) if hasattr(e, "body") else str(e))
 
@@ -1,11 +1,17 @@
 # ruff: noqa: C901
+import asyncio
+import importlib.util
+import json
 import logging
+import threading
 import time
+from collections.abc import Callable
 
 import httpx
 
 from PySubtitle.Helpers import FormatMessages
-from PySubtitle.SubtitleError import TranslationImpossibleError, TranslationResponseError
+from PySubtitle.Helpers.Parse import ParseDelayFromHeader
+from PySubtitle.SubtitleError import RateLimitedError, TranslationImpossibleError, TranslationResponseError
 from PySubtitle.Translation import Translation
 from PySubtitle.TranslationClient import TranslationClient
 from PySubtitle.TranslationPrompt import TranslationPrompt
@@ -19,6 +25,8 @@ class CustomClient(TranslationClient):
     def __init__(self, settings: dict):
         super().__init__(settings)
         self.client = None
+        self.async_requests = set()
+        self.lock = threading.Lock()
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
         if self.api_key:
             self.headers["Authorization"] = f"Bearer {self.api_key}"
@@ -53,6 +61,26 @@ class CustomClient(TranslationClient):
     def max_completion_tokens(self):
         return self.settings.get("max_completion_tokens", None)
 
+    @property
+    def supports_streaming(self):
+        return True
+
+    @property
+    def timeout(self):
+        return self.settings.get("timeout", 300.0)
+
+    @property
+    def max_connections(self):
+        return self.settings.get("max_connections") or 10
+
+    @property
+    def keepalive_expiry(self):
+        return self.settings.get("keepalive_expiry", 60.0)
+
+    @property
+    def use_http2(self):
+        return self.settings.get("use_http2", False)
+
     def _request_translation(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
         """
         Request a translation based on the provided prompt
@@ -66,106 +94,324 @@ class CustomClient(TranslationClient):
 
         return translation
 
+    def _request_streamed_translation(
+        self, prompt: TranslationPrompt, temperature: float, streaming_callback: Callable[[str], None]
+    ) -> Translation:
+        """
+        Request a translation, passing each fragment of the response to the callback as it arrives
+        """
+        logging.debug(f"Messages:\n{FormatMessages(prompt.messages)}")
+
+        temperature = temperature or self.temperature
+        response = self._make_request(prompt, temperature, streaming_callback)
+
+        translation = Translation(response) if response else None
+
+        return translation
+
+    async def _request_translation_async(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+        """
+        Request a translation based on the provided prompt without blocking the event loop
+        """
+        logging.debug(f"Messages:\n{FormatMessages(prompt.messages)}")
+
+        temperature = temperature or self.temperature
+        response = await self._make_request_async(prompt, temperature)
+
+        translation = Translation(response) if response else None
+
+        return translation
+
     def _abort(self):
-        if self.client:
-            self.client.close()
+        with self.lock:
+            if self.client:
+                self.client.close()
+                self.client = None
+
+            async_requests = list(self.async_requests)
+            self.async_requests.clear()
+
+        # Cancel requests in flight on the async client before it is closed
+        loop = self._async_client_loop
+        if async_requests and loop and not loop.is_closed():
+            for request in async_requests:
+                loop.call_soon_threadsafe(request.cancel)
+
         return super()._abort()
 
-    def _make_request(self, prompt: TranslationPrompt, temperature):
+    def _get_client(self) -> httpx.Client:
+        """
+        Get the pooled client, creating it if necessary. The client is shared by all requests so connections are reused.
+        """
+        with self.lock:
+            if self.client is None:
+                self.client = httpx.Client(**self._get_client_options())
+
+            return self.client
+
+    def _get_client_options(self) -> dict:
+        """
+        Options for constructing the sync or async httpx client
+        """
+        http2 = self.use_http2
+        if http2 and not importlib.util.find_spec("h2"):
+            logging.warning("HTTP/2 requires the h2 package (pip install httpx[http2]), falling back to HTTP/1.1")
+            http2 = False
+
+        return {
+            "base_url": self.server_address,
+            "follow_redirects": True,
+            "timeout": self.timeout,
+            "headers": self.headers,
+            "verify": self.settings.get("verify_ssl", True),
+            "http2": http2,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        }
+
+    def _make_request(self, prompt: TranslationPrompt, temperature, streaming_callback: Callable[[str], None] = None):
         """
         Make a request to the server to provide a translation
         """
-        response = {}
+        for retry in range(int(self.max_retries) + 1):
+            if self.aborted:
+                return None
+
+            retry_after = None
 
+            try:
+                request_body = self._generate_request_body(prompt, temperature, stream=streaming_callback is not None)
+                logging.debug(f"Request Body:\n{request_body}")
+
+                if streaming_callback:
+                    with self._get_client().stream("POST", self.endpoint, json=request_body) as result:
+                        if result.is_error:
+                            result.read()
+                            return self._process_response(result)
+
+                        return self._process_stream(result, streaming_callback)
+
+                result: httpx.Response = self._get_client().post(self.endpoint, json=request_body)
+
+                # Return the response if the API call succeeds
+                return self._process_response(result)
+
+            except RateLimitedError as e:
+                retry_after = e.retry_after
+                logging.warning(str(e))
+
+            except Exception as e:
+                self._handle_request_error(e)
+
+            if self.aborted:
+                return None
+
+            sleep_time = self._get_retry_delay(retry, retry_after)
+            logging.warning(f"Retrying in {sleep_time} seconds...")
+            time.sleep(sleep_time)
+
+    async def _make_request_async(self, prompt: TranslationPrompt, temperature):
+        """
+        Make an asynchronous request to the server to provide a translation
+        """
         for retry in range(int(self.max_retries) + 1):
             if self.aborted:
                 return None
 
+            retry_after = None
+
             try:
                 request_body = self._generate_request_body(prompt, temperature)
                 logging.debug(f"Request Body:\n{request_body}")
 
-                # Allow configurable timeout (seconds) via settings; default to 300s
-                timeout = self.settings.get("timeout", 300.0)
-                self.client = httpx.Client(
-                    base_url=self.server_address,
-                    follow_redirects=True,
-                    timeout=timeout,
-                    headers=self.headers,
-                    verify=self.settings.get("verify_ssl", True),
-                )
+                result: httpx.Response = await self._send_async_request(request_body)
 
-                result: httpx.Response = self.client.post(self.endpoint, json=request_body)
+                return self._process_response(result)
 
+            except asyncio.CancelledError:
                 if self.aborted:
                     return None
+                raise
 
-                if result.is_error:
-                    if result.is_client_error:
-                        raise TranslationResponseError(f"Client error: {result.status_code} {result.text}", response=result)
-                    else:
-                        raise TranslationResponseError(f"Server error: {result.status_code} {result.text}", response=result)
+            except RateLimitedError as e:
+                retry_after = e.retry_after
+                logging.warning(str(e))
 
-                logging.debug(f"Response:\n{result.text}")
+            except Exception as e:
+                self._handle_request_error(e)
 
-                content = result.json()
+            if self.aborted:
+                return None
 
-                response["model"] = content.get("model")
-                response["response_time"] = content.get("response_ms", 0)
+            sleep_time = self._get_retry_delay(retry, retry_after)
+            logging.warning(f"Retrying in {sleep_time} seconds...")
+            await asyncio.sleep(sleep_time)
 
-                usage = content.get("usage", {})
-                response["prompt_tokens"] = usage.get("prompt_tokens")
-                response["output_tokens"] = usage.get("completion_tokens")
-                response["total_tokens"] = usage.get("total_tokens")
+    def _create_async_client(self):
+        return httpx.AsyncClient(**self._get_client_options())
 
-                choices = content.get("choices")
-                if not choices:
-                    raise TranslationResponseError("No choices returned in the response", response=result)
+    async def _send_async_request(self, request_body: dict) -> httpx.Response:
+        """
+        Post a request on the async client, keeping track of it so that it can be cancelled if the translation is aborted
+        """
+        request = asyncio.ensure_future(self._get_async_client().post(self.endpoint, json=request_body))
+        with self.lock:
+            self.async_requests.add(request)
 
-                for choice in choices:
-                    if choice.get("text"):
-                        response["text"] = choice.get("text")
-                        response["finish_reason"] = choice.get("finish_reason")
-                        break
+        # The translation may have been aborted while the request was being prepared
+        if self.aborted:
+            request.cancel()
+
+        try:
+            return await request
+
+        finally:
+            with self.lock:
+                self.async_requests.discard(request)
 
-                    if choice.get("message"):
-                        response["text"] = choice.get("message", {}).get("content")
+    def _process_stream(self, result: httpx.Response, streaming_callback: Callable[[str], None]) -> dict:
+        """
+        Accumulate a streamed response from server-sent events, passing each fragment of text to the callback.
+        If the stream is interrupted after some text has been received the partial response is returned.
+        """
+        response = {}
+        fragments = []
+
+        try:
+            for line in result.iter_lines():
+                if self.aborted:
+                    return None
+
+                if not line.startswith("data:"):
+                    continue
+
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+
+                chunk = json.loads(data)
+
+                response["model"] = chunk.get("model") or response.get("model")
+
+                usage = chunk.get("usage")
+                if usage:
+                    response["prompt_tokens"] = usage.get("prompt_tokens")
+                    response["output_tokens"] = usage.get("completion_tokens")
+                    response["total_tokens"] = usage.get("total_tokens")
+
+                for choice in chunk.get("choices") or []:
+                    text = choice.get("text") or (choice.get("delta") or {}).get("content")
+                    if text:
+                        fragments.append(text)
+                        streaming_callback(text)
+
+                    if choice.get("finish_reason"):
                         response["finish_reason"] = choice.get("finish_reason")
-                        break
 
-                if not response.get("text"):
-                    raise TranslationResponseError("No text returned in the response", response=result)
+        except (httpx.NetworkError, httpx.TimeoutException, httpx.RemoteProtocolError) as e:
+            if not fragments:
+                raise
 
-                # Return the response if the API call succeeds
-                return response
+            logging.warning(f"Response stream was interrupted, keeping the partial response: {str(e)}")
+            response["finish_reason"] = "interrupted"
 
-            except httpx.ConnectError as e:
-                if not self.aborted:
-                    logging.error(f"Failed to connect to server at {self.server_address}{self.endpoint}: {e}")
+        if not fragments:
+            raise TranslationResponseError("No text returned in the response", response=result)
 
-            except httpx.NetworkError as e:
-                if not self.aborted:
-                    logging.error(f"Network error communicating with server: {str(e)}")
+        response["text"] = "".join(fragments)
+        logging.debug(f"Response:\n{response['text']}")
 
-            except httpx.ReadTimeout as e:
-                if not self.aborted:
-                    logging.error(f"Request to server timed out: {str(e)}")
+        return response
 
-            except Exception as e:
-                raise TranslationImpossibleError("Unexpected error communicating with server", error=e) from e
+    def _process_response(self, result: httpx.Response) -> dict:
+        """
+        Extract the translation and usage details from the server's response
+        """
+        response = {}
 
-            if self.aborted:
-                return None
+        if self.aborted:
+            return None
 
-            if retry == self.max_retries:
-                raise TranslationImpossibleError(f"Failed to communicate with server after {self.max_retries} retries")
+        if result.is_error:
+            retry_after = result.headers.get("retry-after")
+            if result.status_code == 429 or (result.status_code == 503 and retry_after):
+                retry_delay = ParseDelayFromHeader(retry_after) if retry_after else None
+                self._report_rate_limit(retry_delay)
+                raise RateLimitedError(
+                    f"Rate limited by server: {result.status_code}", response=result, retry_after=retry_delay
+                )
 
-            sleep_time = self.backoff_time * 2.0**retry
-            logging.warning(f"Retrying in {sleep_time} seconds...")
-            time.sleep(sleep_time)
+            if result.is_client_error:
+                raise TranslationResponseError(f"Client error: {result.status_code} {result.text}", response=result)
+            else:
+                raise TranslationResponseError(f"Server error: {result.status_code} {result.text}", response=result)
+
+        logging.debug(f"Response:\n{result.text}")
+
+        content = result.json()
+
+        response["model"] = content.get("model")
+        response["response_time"] = content.get("response_ms", 0)
+
+        usage = content.get("usage", {})
+        response["prompt_tokens"] = usage.get("prompt_tokens")
+        response["output_tokens"] = usage.get("completion_tokens")
+        response["total_tokens"] = usage.get("total_tokens")
+
+        choices = content.get("choices")
+        if not choices:
+            raise TranslationResponseError("No choices returned in the response", response=result)
+
+        for choice in choices:
+            if choice.get("text"):
+                response["text"] = choice.get("text")
+                response["finish_reason"] = choice.get("finish_reason")
+                break
+
+            if choice.get("message"):
+                response["text"] = choice.get("message", {}).get("content")
+                response["finish_reason"] = choice.get("finish_reason")
+                break
+
+        if not response.get("text"):
+            raise TranslationResponseError("No text returned in the response", response=result)
+
+        return response
+
+    def _handle_request_error(self, e: Exception):
+        """
+        Log recoverable network errors, raise an exception for anything else
+        """
+        if isinstance(e, httpx.ConnectError):
+            if not self.aborted:
+                logging.error(f"Failed to connect to server at {self.server_address}{self.endpoint}: {e}")
+
+        elif isinstance(e, httpx.NetworkError):
+            if not self.aborted:
+                logging.error(f"Network error communicating with server: {str(e)}")
+
+        elif isinstance(e, httpx.ReadTimeout):
+            if not self.aborted:
+                logging.error(f"Request to server timed out: {str(e)}")
+
+        else:
+            raise TranslationImpossibleError("Unexpected error communicating with server", error=e) from e
+
+    def _get_retry_delay(self, retry: int, retry_after: float = None) -> float:
+        """
+        Get the delay before retrying a request, or raise an exception if there are no retries left.
+        The server's suggested delay is used if it gave one.
+        """
+        if retry == self.max_retries:
+            raise TranslationImpossibleError(f"Failed to communicate with server after {self.max_retries} retries")
+
+        return retry_after if retry_after is not None else self.backoff_time * 2.0**retry
 
-    def _generate_request_body(self, prompt, temperature):
-        request_body = {"temperature": temperature, "stream": False}
+    def _generate_request_body(self, prompt, temperature, stream: bool = False):
+        request_body = {"temperature": temperature, "stream": stream}
 
         if self.max_tokens:
             request_body["max_tokens"] = self.max_tokens
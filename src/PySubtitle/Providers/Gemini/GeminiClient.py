@@ -1,5 +1,7 @@
 # ruff: noqa: C901
+import asyncio
 import logging
+import threading
 import time
 
 from google import genai
@@ -11,6 +13,7 @@ from google.genai.types import (
     GenerateContentResponseUsageMetadata,
     HarmBlockThreshold,
     HarmCategory,
+    HttpOptions,
     Part,
     SafetySetting,
 )
@@ -42,6 +45,10 @@ class GeminiClient(TranslationClient):
 
         self.automatic_function_calling = AutomaticFunctionCallingConfig(disable=True, maximum_remote_calls=None)
 
+        self.client = None
+        self.async_parent = None
+        self.lock = threading.Lock()
+
     @property
     def api_key(self):
         return self.settings.get("api_key")
@@ -54,6 +61,10 @@ class GeminiClient(TranslationClient):
     def rate_limit(self):
         return self.settings.get("rate_limit")
 
+    @property
+    def reuse_client(self):
+        return self.settings.get("reuse_client", True)
+
     def _request_translation(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
         """
         Request a translation based on the provided prompt
@@ -65,96 +76,58 @@ class GeminiClient(TranslationClient):
 
         return Translation(response) if response else None
 
+    async def _request_translation_async(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+        """
+        Request a translation based on the provided prompt using the async client
+        """
+        logging.debug(f"Messages:\n{FormatMessages(prompt.messages)}")
+
+        temperature = temperature or self.temperature
+        response = await self._send_messages_async(prompt.system_prompt, prompt.content, temperature)
+
+        return Translation(response) if response else None
+
     def _abort(self):
         # TODO cancel any ongoing requests
         return super()._abort()
 
+    def _get_client(self) -> genai.Client:
+        """
+        Get the SDK client, creating it if necessary. The client is shared by all requests so connections are reused.
+        """
+        with self.lock:
+            if not self.client or not self.reuse_client:
+                self.client = self._create_client()
+
+            return self.client
+
+    def _create_client(self) -> genai.Client:
+        http_options = HttpOptions(api_version="v1beta")
+
+        proxy = self.settings.get("proxy")
+        if proxy:
+            http_options.client_args = {"proxy": proxy}
+            http_options.async_client_args = {"proxy": proxy}
+
+        return genai.Client(api_key=self.api_key, http_options=http_options)
+
     def _send_messages(self, system_instruction: str, completion: str, temperature):
         """
         Make a request to the Gemini API to provide a translation
         """
-        response = {}
-
         for retry in range(1 + self.max_retries):
             try:
-                gemini_client = genai.Client(api_key=self.api_key, http_options={"api_version": "v1beta"})
-                config = GenerateContentConfig(
-                    candidate_count=1,
-                    temperature=temperature,
-                    system_instruction=system_instruction,
-                    automatic_function_calling=self.automatic_function_calling,
-                    max_output_tokens=None,
-                    response_modalities=[],
-                )
-                gcr: GenerateContentResponse = gemini_client.models.generate_content(
+                config = self._get_generate_content_config(system_instruction, temperature)
+                gcr: GenerateContentResponse = self._get_client().models.generate_content(
                     model=self.model, contents=Part.from_text(text=completion), config=config
                 )
 
-                if self.aborted:
-                    return None
-
-                if not gcr:
-                    raise TranslationImpossibleError("No response from Gemini")
-
-                if gcr.prompt_feedback and gcr.prompt_feedback.block_reason:
-                    raise TranslationResponseError(
-                        f"Request was blocked by Gemini: {str(gcr.prompt_feedback.block_reason)}", response=gcr
-                    )
-
-                # Try to find a validate candidate
-                candidates = [candidate for candidate in gcr.candidates if candidate.content]
-                candidates = [
-                    candidate for candidate in candidates if candidate.finish_reason == FinishReason.STOP
-                ] or candidates
-
-                if not candidates:
-                    raise TranslationResponseError("No valid candidates returned in the response", response=gcr)
-
-                candidate = candidates[0]
-                response["token_count"] = candidate.token_count
-
-                finish_reason = candidate.finish_reason
-                if finish_reason == "STOP" or finish_reason == FinishReason.STOP:
-                    response["finish_reason"] = "complete"
-                elif finish_reason == "MAX_TOKENS" or finish_reason == FinishReason.MAX_TOKENS:
-                    response["finish_reason"] = "length"
-                    raise TranslationResponseError("Gemini response exceeded token limit", response=candidate)
-                elif finish_reason == "SAFETY" or finish_reason == FinishReason.SAFETY:
-                    response["finish_reason"] = "blocked"
-                    raise TranslationResponseError("Gemini response was blocked for safety reasons", response=candidate)
-                elif finish_reason == "RECITATION" or finish_reason == FinishReason.RECITATION:
-                    response["finish_reason"] = "recitation"
-                    raise TranslationResponseError("Gemini response was blocked for recitation", response=candidate)
-                elif finish_reason == "FINISH_REASON_UNSPECIFIED" or finish_reason == FinishReason.FINISH_REASON_UNSPECIFIED:
-                    response["finish_reason"] = "unspecified"
-                    raise TranslationResponseError("Gemini response was incomplete", response=candidate)
-                else:
-                    # Probably a failure
-                    response["finish_reason"] = finish_reason
-
-                usage_metadata: GenerateContentResponseUsageMetadata = gcr.usage_metadata
-                if usage_metadata:
-                    response["prompt_tokens"] = usage_metadata.prompt_token_count
-                    response["output_tokens"] = usage_metadata.candidates_token_count
-                    response["total_tokens"] = usage_metadata.total_token_count
-
-                if not candidate.content.parts:
-                    raise TranslationResponseError("Gemini response has no valid content parts", response=candidate)
-
-                response_text = "\n".join(part.text for part in candidate.content.parts)
-
-                if not response_text:
-                    raise TranslationResponseError("Gemini response is empty", response=candidate)
-
-                response["text"] = response_text
-
-                thoughts = "\n".join(part.thought for part in candidate.content.parts if part.thought)
-                if thoughts:
-                    response["reasoning"] = thoughts
-
-                return response
+                return self._process_response(gcr)
 
             except Exception as e:
+                if getattr(e, "code", None) == 429:
+                    self._report_rate_limit()
+
                 if retry == self.max_retries:
                     raise TranslationImpossibleError(
                         f"Failed to communicate with provider after {self.max_retries} retries"
@@ -164,3 +137,121 @@ class GeminiClient(TranslationClient):
                     sleep_time = self.backoff_time * 2.0**retry
                     logging.warning(f"Gemini request failure {str(e)}, retrying in {sleep_time} seconds...")
                     time.sleep(sleep_time)
+
+    async def _send_messages_async(self, system_instruction: str, completion: str, temperature):
+        """
+        Make an asynchronous request to the Gemini API to provide a translation
+        """
+        for retry in range(1 + self.max_retries):
+            try:
+                config = self._get_generate_content_config(system_instruction, temperature)
+                gcr: GenerateContentResponse = await self._get_async_client().models.generate_content(
+                    model=self.model, contents=Part.from_text(text=completion), config=config
+                )
+
+                return self._process_response(gcr)
+
+            except Exception as e:
+                if getattr(e, "code", None) == 429:
+                    self._report_rate_limit()
+
+                if retry == self.max_retries:
+                    raise TranslationImpossibleError(
+                        f"Failed to communicate with provider after {self.max_retries} retries"
+                    ) from e
+
+                if not self.aborted:
+                    sleep_time = self.backoff_time * 2.0**retry
+                    logging.warning(f"Gemini request failure {str(e)}, retrying in {sleep_time} seconds...")
+                    await asyncio.sleep(sleep_time)
+
+    def _create_async_client(self):
+        """
+        Use the async interface of the shared SDK client, so that one client owns both transports.
+        The async transport cannot be reopened once it has been closed, so the SDK client is replaced for each event loop.
+        """
+        with self.lock:
+            if not self.client or self.client is self.async_parent:
+                self.client = self._create_client()
+
+            self.async_parent = self.client
+            return self.client.aio
+
+    def _get_generate_content_config(self, system_instruction: str, temperature) -> GenerateContentConfig:
+        return GenerateContentConfig(
+            candidate_count=1,
+            temperature=temperature,
+            system_instruction=system_instruction,
+            automatic_function_calling=self.automatic_function_calling,
+            max_output_tokens=None,
+            response_modalities=[],
+        )
+
+    def _process_response(self, gcr: GenerateContentResponse) -> dict:
+        """
+        Extract the translation and metadata from the Gemini response
+        """
+        response = {}
+
+        if self.aborted:
+            return None
+
+        if not gcr:
+            raise TranslationImpossibleError("No response from Gemini")
+
+        if gcr.prompt_feedback and gcr.prompt_feedback.block_reason:
+            raise TranslationResponseError(
+                f"Request was blocked by Gemini: {str(gcr.prompt_feedback.block_reason)}", response=gcr
+            )
+
+        # Try to find a validate candidate
+        candidates = [candidate for candidate in gcr.candidates if candidate.content]
+        candidates = [candidate for candidate in candidates if candidate.finish_reason == FinishReason.STOP] or candidates
+
+        if not candidates:
+            raise TranslationResponseError("No valid candidates returned in the response", response=gcr)
+
+        candidate = candidates[0]
+        response["token_count"] = candidate.token_count
+
+        finish_reason = candidate.finish_reason
+        if finish_reason == "STOP" or finish_reason == FinishReason.STOP:
+            response["finish_reason"] = "complete"
+        elif finish_reason == "MAX_TOKENS" or finish_reason == FinishReason.MAX_TOKENS:
+            # The translator can salvage the complete lines and request the rest
+            response["finish_reason"] = "length"
+            logging.warning("Gemini response was truncated at the token limit")
+        elif finish_reason == "SAFETY" or finish_reason == FinishReason.SAFETY:
+            response["finish_reason"] = "blocked"
+            raise TranslationResponseError("Gemini response was blocked for safety reasons", response=candidate)
+        elif finish_reason == "RECITATION" or finish_reason == FinishReason.RECITATION:
+            response["finish_reason"] = "recitation"
+            raise TranslationResponseError("Gemini response was blocked for recitation", response=candidate)
+        elif finish_reason == "FINISH_REASON_UNSPECIFIED" or finish_reason == FinishReason.FINISH_REASON_UNSPECIFIED:
+            response["finish_reason"] = "unspecified"
+            raise TranslationResponseError("Gemini response was incomplete", response=candidate)
+        else:
+            # Probably a failure
+            response["finish_reason"] = finish_reason
+
+        usage_metadata: GenerateContentResponseUsageMetadata = gcr.usage_metadata
+        if usage_metadata:
+            response["prompt_tokens"] = usage_metadata.prompt_token_count
+            response["output_tokens"] = usage_metadata.candidates_token_count
+            response["total_tokens"] = usage_metadata.total_token_count
+
+        if not candidate.content.parts:
+            raise TranslationResponseError("Gemini response has no valid content parts", response=candidate)
+
+        response_text = "\n".join(part.text for part in candidate.content.parts)
+
+        if not response_text:
+            raise TranslationResponseError("Gemini response is empty", response=candidate)
+
+        response["text"] = response_text
+
+        thoughts = "\n".join(part.thought for part in candidate.content.parts if part.thought)
+        if thoughts:
+            response["reasoning"] = thoughts
+
+        return response
@@ -8,7 +8,7 @@ try:
     from mistralai.models import ChatCompletionResponse as ChatCompletion
 
     from PySubtitle.Helpers import FormatMessages
-    from PySubtitle.SubtitleError import TranslationError, TranslationImpossibleError
+    from PySubtitle.SubtitleError import TranslationImpossibleError
     from PySubtitle.Translation import Translation
     from PySubtitle.TranslationClient import TranslationClient
     from PySubtitle.TranslationPrompt import TranslationPrompt
@@ -51,6 +51,20 @@ try:
             temperature = temperature or self.temperature
             response = self._send_messages(prompt.content, temperature)
 
+            return self._create_translation(response)
+
+        async def _request_translation_async(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+            """
+            Request a translation based on the provided prompt without blocking the event loop
+            """
+            logging.debug(f"Messages:\n{FormatMessages(prompt.messages)}")
+
+            temperature = temperature or self.temperature
+            response = await self._send_messages_async(prompt.content, temperature)
+
+            return self._create_translation(response)
+
+        def _create_translation(self, response: dict) -> Translation:
             translation = Translation(response) if response else None
 
             if translation:
@@ -60,7 +74,8 @@ try:
                     )
 
                 if translation.reached_token_limit:
-                    raise TranslationError("Too many tokens in translation", translation=translation)
+                    # The translator can salvage the complete lines and request the rest
+                    logging.warning("Response was truncated at the token limit")
 
             return translation
 
@@ -68,8 +83,6 @@ try:
             """
             Make a request to an Mistralai-compatible API to provide a translation
             """
-            response = {}
-
             for _retry in range(self.max_retries + 1):
                 if self.aborted:
                     return None
@@ -82,39 +95,67 @@ try:
                         server_url=self.server_url if self.server_url else None,
                     )
 
-                    if self.aborted:
-                        return None
-
-                    if not isinstance(result, ChatCompletion):
-                        raise TranslationResponseError(f"Unexpected response type: {type(result).__name__}", response=result)
-
-                    if not result.choices:
-                        raise TranslationResponseError("No choices returned in the response", response=result)
+                    # Return the response if the API call succeeds
+                    return self._process_response(result)
 
-                    response["response_time"] = getattr(result, "response_ms", 0)
+                except Exception as e:
+                    # TODO: find out what specific exceptions mistralai raises
+                    raise TranslationImpossibleError("Unexpected error communicating with the provider", error=e) from e
 
-                    if hasattr(result, "usage"):
-                        response["prompt_tokens"] = result.usage.prompt_tokens
-                        response["output_tokens"] = result.usage.completion_tokens
-                        response["total_tokens"] = result.usage.total_tokens
+            raise TranslationImpossibleError(f"Failed to communicate with provider after {self.max_retries} retries")
 
-                    if result.choices:
-                        choice = result.choices[0]
-                        reply = result.choices[0].message
+        async def _send_messages_async(self, messages: list[str], temperature):
+            """
+            Make an asynchronous request to an Mistralai-compatible API to provide a translation
+            """
+            for _retry in range(self.max_retries + 1):
+                if self.aborted:
+                    return None
 
-                        response["finish_reason"] = getattr(choice, "finish_reason", None)
-                        response["text"] = getattr(reply, "content", None)
-                    else:
-                        raise TranslationResponseError("No choices returned in the response", response=result)
+                try:
+                    result: ChatCompletion = await self.client.chat.complete_async(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature,
+                        server_url=self.server_url if self.server_url else None,
+                    )
 
-                    # Return the response if the API call succeeds
-                    return response
+                    return self._process_response(result)
 
                 except Exception as e:
-                    # TODO: find out what specific exceptions mistralai raises
                     raise TranslationImpossibleError("Unexpected error communicating with the provider", error=e) from e
 
             raise TranslationImpossibleError(f"Failed to communicate with provider after {self.max_retries} retries")
 
+        def _process_response(self, result: ChatCompletion) -> dict:
+            """
+            Extract the translation and usage details from the API response
+            """
+            response = {}
+
+            if self.aborted:
+                return None
+
+            if not isinstance(result, ChatCompletion):
+                raise TranslationResponseError(f"Unexpected response type: {type(result).__name__}", response=result)
+
+            if not result.choices:
+                raise TranslationResponseError("No choices returned in the response", response=result)
+
+            response["response_time"] = getattr(result, "response_ms", 0)
+
+            if hasattr(result, "usage"):
+                response["prompt_tokens"] = result.usage.prompt_tokens
+                response["output_tokens"] = result.usage.completion_tokens
+                response["total_tokens"] = result.usage.total_tokens
+
+            choice = result.choices[0]
+            reply = result.choices[0].message
+
+            response["finish_reason"] = getattr(choice, "finish_reason", None)
+            response["text"] = getattr(reply, "content", None)
+
+            return response
+
 except ImportError as e:
     logging.debug(f"Failed to import mistralai: {e}")
@@ -1,3 +1,8 @@
+import logging
+from collections.abc import Callable
+
+import httpx
+import openai
 from openai.types.chat import ChatCompletion
 
 from PySubtitle.Providers.OpenAI.OpenAIClient import OpenAIClient
@@ -18,11 +23,14 @@ class ChatGPTClient(OpenAIClient):
         settings["supports_conversation"] = True
         super().__init__(settings)
 
+    @property
+    def supports_streaming(self):
+        return True
+
     def _send_messages(self, prompt: TranslationPrompt, temperature):
         """
         Make a request to an OpenAI-compatible API to provide a translation
         """
-        response = {}
         messages: list[dict] = prompt.content
 
         result: ChatCompletion = self.client.chat.completions.create(
@@ -31,6 +39,80 @@ class ChatGPTClient(OpenAIClient):
             temperature=temperature,
         )
 
+        return self._process_response(result)
+
+    async def _send_messages_async(self, prompt: TranslationPrompt, temperature):
+        """
+        Make an asynchronous request to an OpenAI-compatible API to provide a translation
+        """
+        messages: list[dict] = prompt.content
+
+        result: ChatCompletion = await self._get_async_client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+        )
+
+        return self._process_response(result)
+
+    def _send_streamed_messages(self, prompt: TranslationPrompt, temperature, streaming_callback: Callable[[str], None]):
+        """
+        Make a streaming request to an OpenAI-compatible API, passing each fragment of text to the callback.
+        If the stream is interrupted after some text has been received the partial response is returned.
+        """
+        messages: list[dict] = prompt.content
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        response = {}
+        fragments = []
+
+        try:
+            for chunk in stream:
+                if self.aborted:
+                    stream.close()
+                    return None
+
+                if chunk.usage:
+                    response["prompt_tokens"] = chunk.usage.prompt_tokens
+                    response["output_tokens"] = chunk.usage.completion_tokens
+                    response["total_tokens"] = chunk.usage.total_tokens
+
+                for choice in chunk.choices:
+                    text = choice.delta.content if choice.delta else None
+                    if text:
+                        fragments.append(text)
+                        streaming_callback(text)
+
+                    if choice.finish_reason:
+                        response["finish_reason"] = choice.finish_reason
+
+        except (openai.APIConnectionError, httpx.TransportError) as e:
+            if not fragments:
+                raise
+
+            logging.warning(f"Response stream was interrupted, keeping the partial response: {str(e)}")
+            response["finish_reason"] = "interrupted"
+
+        if not fragments:
+            raise TranslationResponseError("No text returned in the response", response=response)
+
+        response["text"] = "".join(fragments)
+
+        return response
+
+    def _process_response(self, result: ChatCompletion):
+        """
+        Extract the response details from a chat completion
+        """
+        response = {}
+
         if self.aborted:
             return None
 
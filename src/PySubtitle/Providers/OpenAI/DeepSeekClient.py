@@ -27,13 +27,32 @@ class DeepSeekClient(OpenAIClient):
         """
         Make a request to DeepSeek's OpenAI-compatible API to provide a translation
         """
-        response = {}
         messages: list[dict] = prompt.content
 
         result: ChatCompletion = self.client.chat.completions.create(
             model=self.model, messages=messages, temperature=temperature, max_tokens=self.max_tokens
         )
 
+        return self._process_response(result)
+
+    async def _send_messages_async(self, prompt: TranslationPrompt, temperature):
+        """
+        Make an asynchronous request to DeepSeek's OpenAI-compatible API to provide a translation
+        """
+        messages: list[dict] = prompt.content
+
+        result: ChatCompletion = await self._get_async_client().chat.completions.create(
+            model=self.model, messages=messages, temperature=temperature, max_tokens=self.max_tokens
+        )
+
+        return self._process_response(result)
+
+    def _process_response(self, result: ChatCompletion):
+        """
+        Extract the response details, including any reasoning content, from a chat completion
+        """
+        response = {}
+
         if self.aborted:
             return None
 
@@ -1,6 +1,8 @@
 # ruff: noqa: C901
+import asyncio
 import logging
 import time
+from collections.abc import Callable
 from json import JSONDecodeError
 
 from PySubtitle.Helpers.Parse import ParseDelayFromHeader
@@ -66,6 +68,38 @@ try:
 
             response = self._try_send_messages(prompt, temperature)
 
+            return self._create_translation(response)
+
+        def _request_streamed_translation(
+            self, prompt: TranslationPrompt, temperature: float, streaming_callback: Callable[[str], None]
+        ) -> Translation:
+            """
+            Request a translation, passing each fragment of the response to the callback as it arrives
+            """
+            logging.debug(f"Messages:\n{FormatMessages(prompt.messages)}")
+
+            temperature = temperature or self.temperature
+
+            response = self._try_send_messages(prompt, temperature, streaming_callback)
+
+            return self._create_translation(response)
+
+        async def _request_translation_async(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+            """
+            Request a translation based on the provided prompt using the async client
+            """
+            logging.debug(f"Messages:\n{FormatMessages(prompt.messages)}")
+
+            temperature = temperature or self.temperature
+
+            response = await self._try_send_messages_async(prompt, temperature)
+
+            return self._create_translation(response)
+
+        def _create_translation(self, response: dict) -> Translation:
+            """
+            Construct a translation from the response, raising an error if it is unusable
+            """
             translation = Translation(response) if response else None
 
             if translation:
@@ -73,76 +107,124 @@ try:
                     raise TranslationImpossibleError("Account quota reached, please upgrade your plan or wait until it renews")
 
                 if translation.reached_token_limit:
-                    raise TranslationError("Too many tokens in translation", translation=translation)
+                    # The translator can salvage the complete lines and request the rest
+                    logging.warning("Response was truncated at the token limit")
 
             return translation
 
-        def _send_messages(self, messages: list[str], temperature: float):
+        def _send_messages(self, prompt: TranslationPrompt, temperature: float):
             """
             Communicate with the API
             """
             raise NotImplementedError
 
+        async def _send_messages_async(self, prompt: TranslationPrompt, temperature: float):
+            """
+            Communicate with the API using the async client
+            """
+            raise NotImplementedError
+
+        def _send_streamed_messages(
+            self, prompt: TranslationPrompt, temperature: float, streaming_callback: Callable[[str], None]
+        ):
+            """
+            Communicate with the API, passing each fragment of the response to the callback as it arrives
+            """
+            raise NotImplementedError
+
         def _abort(self):
-            self.client.close()
+            if self.client:
+                self.client.close()
             return super()._abort()
 
-        def _try_send_messages(self, prompt: TranslationPrompt, temperature: float):
+        def _try_send_messages(
+            self, prompt: TranslationPrompt, temperature: float, streaming_callback: Callable[[str], None] = None
+        ):
             for retry in range(self.max_retries + 1):
                 if self.aborted:
                     return None
 
-                backoff_time = self.backoff_time * 2.0**retry
-
                 try:
                     if not self.client or not self.reuse_client:
                         self._create_client()
 
-                    response = self._send_messages(prompt, temperature)
+                    if streaming_callback:
+                        response = self._send_streamed_messages(prompt, temperature, streaming_callback)
+                    else:
+                        response = self._send_messages(prompt, temperature)
 
                     return response
 
-                except TranslationResponseError as e:
-                    if retry < self.max_retries and not self.aborted:
-                        logging.warning(f"{str(e)}, retrying in {backoff_time} seconds...")
-                        time.sleep(backoff_time)
-                        continue
-
-                except openai.RateLimitError as e:
-                    if not self.aborted:
-                        retry_after = e.response.headers.get("x-ratelimit-reset-requests") or e.response.headers.get(
-                            "Retry-After"
-                        )
-                        if retry_after:
-                            backoff_time = ParseDelayFromHeader(retry_after)
-                            logging.warning(f"Rate limit hit, retrying in {backoff_time} seconds...")
-                            time.sleep(backoff_time)
-                            continue
-                        else:
-                            raise TranslationImpossibleError("Account quota reached, please upgrade your plan") from e
-
-                except openai.APITimeoutError:
-                    if retry < self.max_retries and not self.aborted:
-                        logging.warning(f"API Timeout, retrying in {backoff_time} seconds...")
-                        time.sleep(backoff_time)
-                        continue
-
-                except JSONDecodeError:
-                    if retry < self.max_retries and not self.aborted:
-                        logging.warning(f"Invalid response received, retrying in {backoff_time} seconds...")
-                        time.sleep(backoff_time)
-                        continue
-
-                except openai.APIConnectionError as e:
-                    if not self.aborted:
-                        raise TranslationError(str(e), error=e) from e
+                except Exception as e:
+                    retry_delay = self._get_retry_delay(e, retry)
+
+                if retry_delay:
+                    time.sleep(retry_delay)
+
+            if not self.aborted:
+                raise TranslationImpossibleError(f"Failed to communicate with provider after {self.max_retries} retries")
+
+        async def _try_send_messages_async(self, prompt: TranslationPrompt, temperature: float):
+            for retry in range(self.max_retries + 1):
+                if self.aborted:
+                    return None
+
+                try:
+                    response = await self._send_messages_async(prompt, temperature)
+
+                    return response
 
                 except Exception as e:
-                    raise TranslationImpossibleError("Unexpected error communicating with the provider", error=e) from e
+                    retry_delay = self._get_retry_delay(e, retry)
+
+                if retry_delay:
+                    await asyncio.sleep(retry_delay)
 
             if not self.aborted:
                 raise TranslationImpossibleError(f"Failed to communicate with provider after {self.max_retries} retries")
 
+        def _get_retry_delay(self, e: Exception, retry: int) -> float | None:
+            """
+            Decide whether a failed request should be retried, returning the delay before the next attempt.
+            Raises an exception if the error is not recoverable.
+            """
+            backoff_time = self.backoff_time * 2.0**retry
+
+            if isinstance(e, TranslationResponseError):
+                if retry < self.max_retries and not self.aborted:
+                    logging.warning(f"{str(e)}, retrying in {backoff_time} seconds...")
+                    return backoff_time
+
+            elif isinstance(e, openai.RateLimitError):
+                if not self.aborted:
+                    retry_after = e.response.headers.get("x-ratelimit-reset-requests") or e.response.headers.get("Retry-After")
+                    if retry_after:
+                        backoff_time = ParseDelayFromHeader(retry_after)
+                        self._report_rate_limit(backoff_time)
+                        logging.warning(f"Rate limit hit, retrying in {backoff_time} seconds...")
+                        return backoff_time
+                    else:
+                        raise TranslationImpossibleError("Account quota reached, please upgrade your plan") from e
+
+            elif isinstance(e, openai.APITimeoutError):
+                if retry < self.max_retries and not self.aborted:
+                    logging.warning(f"API Timeout, retrying in {backoff_time} seconds...")
+                    return backoff_time
+
+            elif isinstance(e, JSONDecodeError):
+                if retry < self.max_retries and not self.aborted:
+                    logging.warning(f"Invalid response received, retrying in {backoff_time} seconds...")
+                    return backoff_time
+
+            elif isinstance(e, openai.APIConnectionError):
+                if not self.aborted:
+                    raise TranslationError(str(e), error=e) from e
+
+            else:
+                raise TranslationImpossibleError("Unexpected error communicating with the provider", error=e) from e
+
+            return None
+
         def _create_client(self):
             http_client = None
             if self.settings.get("proxy"):
@@ -154,5 +236,14 @@ try:
 
             self.client = openai.OpenAI(api_key=openai.api_key, base_url=self.api_base or None, http_client=http_client)
 
+        def _create_async_client(self):
+            http_client = None
+            if self.settings.get("proxy"):
+                http_client = httpx.AsyncClient(proxy=self.settings.get("proxy"))
+            elif self.settings.get("use_httpx"):
+                http_client = httpx.AsyncClient(base_url=self.api_base, follow_redirects=True)
+
+            return openai.AsyncOpenAI(api_key=openai.api_key, base_url=self.api_base or None, http_client=http_client)
+
 except ImportError as e:
     logging.debug(f"Failed to import openai: {e}")
@@ -38,6 +38,25 @@ class OpenAIReasoningClient(OpenAIClient):
             reasoning={"effort": self.reasoning_effort},
         )
 
+        return self._process_response(result)
+
+    async def _send_messages_async(self, prompt: TranslationPrompt, temperature):
+        """
+        Make an asynchronous request to OpenAI Responses API for translation
+        """
+        result = await self._get_async_client().responses.create(
+            model=self.model,
+            input=prompt.content,
+            instructions=prompt.system_prompt,
+            reasoning={"effort": self.reasoning_effort},
+        )
+
+        return self._process_response(result)
+
+    def _process_response(self, result):
+        """
+        Build the response from a Responses API result
+        """
         if self.aborted:
             return None
 
@@ -47,6 +47,9 @@ class ProviderCustomServer(TranslationProvider):
                     "max_completion_tokens", GetEnvInteger("CUSTOM_MAX_COMPLETION_TOKENS", 0)
                 ),
                 "timeout": settings.get("timeout", GetEnvFloat("CUSTOM_TIMEOUT", 300.0)),
+                "max_connections": settings.get("max_connections", GetEnvInteger("CUSTOM_MAX_CONNECTIONS", 10)),
+                "keepalive_expiry": settings.get("keepalive_expiry", GetEnvFloat("CUSTOM_KEEPALIVE_EXPIRY", 60.0)),
+                "use_http2": settings.get("use_http2", GetEnvBool("CUSTOM_USE_HTTP2", False)),
                 "api_key": settings.get("api_key", os.getenv("CUSTOM_API_KEY")),
                 "model": settings.get("model", os.getenv("CUSTOM_MODEL")),
                 "supports_parallel_threads": settings.get(
@@ -135,6 +138,9 @@ class ProviderCustomServer(TranslationProvider):
                         float,
                         "Request timeout in seconds for server calls (default 300s)",
                     ),
+                    "max_connections": (int, "Maximum number of pooled connections to the server (default 10)"),
+                    "keepalive_expiry": (float, "Seconds to keep idle connections to the server open (default 60s)"),
+                    "use_http2": (bool, "Use HTTP/2 if the server supports it (requires the h2 package)"),
                 }
             )
 
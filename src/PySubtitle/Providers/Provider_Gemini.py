@@ -39,6 +39,7 @@ else:
                         "model": settings.get("model") or os.getenv("GEMINI_MODEL"),
                         "temperature": settings.get("temperature", GetEnvFloat("GEMINI_TEMPERATURE", 0.0)),
                         "rate_limit": settings.get("rate_limit", GetEnvFloat("GEMINI_RATE_LIMIT", 60.0)),
+                        "proxy": settings.get("proxy") or os.getenv("GEMINI_PROXY"),
                     },
                 )
 
@@ -85,6 +86,7 @@ else:
                                         "Amount of random variance to add to translations. Generally speaking, none is best",
                                     ),
                                     "rate_limit": (float, "Maximum API requests per minute."),
+                                    "proxy": (str, "Optional proxy server to use for requests"),
                                 }
                             )
 
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+try:
+    import fcntl
+
+    def _lock_file(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+except ImportError:
+    import msvcrt
+
+    def _lock_file(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class RateLimiter:
+    """
+    Token buckets enforcing a requests-per-minute and/or a tokens-per-minute budget.
+
+    Callers reserve capacity before sending a request and wait for the returned delay, so concurrent workers
+    queue up behind each other rather than all sending at once. If a state file is provided the buckets are
+    stored in it, so that sibling processes draw on the same budget.
+    """
+
+    # Seconds of budget that can be used in a burst
+    burst_seconds = 10.0
+
+    def __init__(self, key: str, requests_per_minute: float = None, tokens_per_minute: float = None, state_file: str = None):
+        self.key = key
+        self.requests_per_minute = requests_per_minute or 0.0
+        self.tokens_per_minute = tokens_per_minute or 0.0
+        self.state_file = state_file
+        self.lock = threading.Lock()
+
+        self.requests = self.request_capacity
+        self.tokens = self.token_capacity
+        self.updated = time.time()
+
+    @property
+    def request_capacity(self) -> float:
+        return max(1.0, self.requests_per_minute * self.burst_seconds / 60.0)
+
+    @property
+    def token_capacity(self) -> float:
+        return self.tokens_per_minute * self.burst_seconds / 60.0
+
+    def Reserve(self, tokens: int = 0) -> float:
+        """
+        Take a request and the estimated number of tokens from the budget, returning how long to wait before sending
+        """
+        with self._shared_state():
+            self._refill()
+
+            delay = 0.0
+            if self.requests_per_minute > 0:
+                self.requests -= 1
+                if self.requests < 0:
+                    delay = max(delay, -self.requests * 60.0 / self.requests_per_minute)
+
+            if self.tokens_per_minute > 0 and tokens:
+                self.tokens -= tokens
+                if self.tokens < 0:
+                    delay = max(delay, -self.tokens * 60.0 / self.tokens_per_minute)
+
+            return delay
+
+    def Reconcile(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Correct the token budget once the actual usage of a request is known
+        """
+        if self.tokens_per_minute <= 0 or not actual_tokens:
+            return
+
+        with self._shared_state():
+            self._refill()
+            self.tokens = min(self.tokens + (estimated_tokens or 0) - actual_tokens, self.token_capacity)
+
+    def _refill(self):
+        """
+        Top up the buckets for the time elapsed since they were last updated
+        """
+        now = time.time()
+        elapsed = max(now - self.updated, 0.0)
+        self.updated = now
+
+        if self.requests_per_minute > 0:
+            self.requests = min(self.requests + elapsed * self.requests_per_minute / 60.0, self.request_capacity)
+
+        if self.tokens_per_minute > 0:
+            self.tokens = min(self.tokens + elapsed * self.tokens_per_minute / 60.0, self.token_capacity)
+
+    @contextmanager
+    def _shared_state(self):
+        """
+        Hold the lock for the buckets, loading and saving them if they are shared through a state file
+        """
+        with self.lock:
+            if not self.state_file:
+                yield
+                return
+
+            fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT)
+            with os.fdopen(fd, "r+", encoding="utf-8") as file:
+                _lock_file(file)
+                try:
+                    state = self._read_state(file)
+                    bucket = state.get(self.key)
+                    if bucket:
+                        self.requests = bucket.get("requests", self.requests)
+                        self.tokens = bucket.get("tokens", self.tokens)
+                        self.updated = bucket.get("updated", self.updated)
+
+                    yield
+
+                    state[self.key] = {"requests": self.requests, "tokens": self.tokens, "updated": self.updated}
+                    file.seek(0)
+                    file.truncate()
+                    json.dump(state, file)
+                    file.flush()
+
+                finally:
+                    _unlock_file(file)
+
+    def _read_state(self, file) -> dict:
+        file.seek(0)
+        content = file.read()
+        if not content:
+            return {}
+
+        try:
+            return json.loads(content)
+
+        except json.JSONDecodeError as e:
+            logging.warning(f"Ignoring invalid rate limit state in {self.state_file}: {e}")
+            return {}
+
+
+_rate_limiters: dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def GetRateLimiter(key: str, requests_per_minute: float = None, tokens_per_minute: float = None, state_file: str = None):
+    """
+    Get the rate limiter shared by every client with the same key, creating it if necessary
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(key, requests_per_minute, tokens_per_minute, state_file)
+            _rate_limiters[key] = limiter
+        else:
+            with limiter.lock:
+                limiter.requests_per_minute = requests_per_minute or 0.0
+                limiter.tokens_per_minute = tokens_per_minute or 0.0
+                limiter.state_file = state_file
+
+        return limiter
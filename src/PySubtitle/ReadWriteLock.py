@@ -0,0 +1,115 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    Allows any number of threads to read at once, while a writer has exclusive access.
+
+    Both kinds of lock are reentrant, and a thread holding the write lock can also take the read lock, but a thread
+    holding only a read lock cannot upgrade to a write lock. Waiting writers take priority over new readers so that
+    they are not starved. Using the lock itself as a context manager takes the write lock, so it can replace an RLock.
+
+    The number of times a thread had to wait for the lock, and the total time spent waiting, are recorded for profiling.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.read_contention = 0
+        self.write_contention = 0
+        self.wait_time = 0.0
+        self._readers = 0
+        self._writer = None
+        self._write_count = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    @property
+    def contention_count(self) -> int:
+        return self.read_contention + self.write_contention
+
+    def AcquireRead(self):
+        """
+        Wait until no thread is writing, then take a shared lock
+        """
+        thread_reads = getattr(self._local, "reads", 0)
+        with self.condition:
+            # A thread that already holds a lock must not queue behind waiting writers, or it would deadlock
+            already_locked = thread_reads > 0 or self._writer == threading.get_ident()
+            if not already_locked and (self._writer is not None or self._writers_waiting):
+                self.read_contention += 1
+                self._wait(lambda: self._writer is None and not self._writers_waiting)
+
+            self._readers += 1
+
+        self._local.reads = thread_reads + 1
+
+    def ReleaseRead(self):
+        with self.condition:
+            self._readers -= 1
+            self._local.reads -= 1
+            if not self._readers:
+                self.condition.notify_all()
+
+    def AcquireWrite(self):
+        """
+        Wait until no other thread is reading or writing, then take an exclusive lock
+        """
+        thread = threading.get_ident()
+        with self.condition:
+            if self._writer == thread:
+                self._write_count += 1
+                return
+
+            if getattr(self._local, "reads", 0):
+                raise RuntimeError("A read lock cannot be upgraded to a write lock")
+
+            if self._writer is not None or self._readers:
+                self.write_contention += 1
+                self._writers_waiting += 1
+                try:
+                    self._wait(lambda: self._writer is None and not self._readers)
+                finally:
+                    self._writers_waiting -= 1
+
+            self._writer = thread
+            self._write_count = 1
+
+    def ReleaseWrite(self):
+        with self.condition:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("Write lock released by a thread that does not hold it")
+
+            self._write_count -= 1
+            if not self._write_count:
+                self._writer = None
+                self.condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.AcquireRead()
+        try:
+            yield self
+        finally:
+            self.ReleaseRead()
+
+    @contextmanager
+    def write(self):
+        self.AcquireWrite()
+        try:
+            yield self
+        finally:
+            self.ReleaseWrite()
+
+    def __enter__(self):
+        self.AcquireWrite()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.ReleaseWrite()
+
+    def _wait(self, predicate):
+        start = time.monotonic()
+        self.condition.wait_for(predicate)
+        self.wait_time += time.monotonic() - start
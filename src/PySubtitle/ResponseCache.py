@@ -0,0 +1,176 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    On-disk cache of provider responses, keyed by a hash of the request.
+
+    Entries expire after a time-to-live, and the least recently used entries are evicted to keep the cache within its size limit.
+    """
+
+    def __init__(self, directory: str, max_size: int = 100 * 1024 * 1024, ttl: float = 30 * 24 * 3600):
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._index = None
+
+    @staticmethod
+    def GetKey(provider: str, model: str, temperature: float, messages: list[dict], system_prompt: str = None) -> str:
+        """
+        Calculate the cache key for a request
+        """
+        request = {
+            "provider": provider,
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "system_prompt": system_prompt,
+        }
+        serialised = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serialised.encode("utf-8")).hexdigest()
+
+    def Get(self, key: str) -> dict | None:
+        """
+        Retrieve a cached response, or None if there is no unexpired entry for the key
+        """
+        with self.lock:
+            path = self._get_path(key)
+            try:
+                with open(path, encoding="utf-8") as file:
+                    entry = json.load(file)
+
+            except FileNotFoundError:
+                return None
+
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Discarding unreadable cache entry {key}: {e}")
+                self._remove(key)
+                return None
+
+            if self.ttl and time.time() - entry.get("created", 0) > self.ttl:
+                self._remove(key)
+                return None
+
+            # Update the access time so that the entry counts as recently used
+            now = time.time()
+            with contextlib.suppress(OSError):
+                os.utime(path, (now, now))
+
+            index = self._get_index()
+            if key in index:
+                index[key] = (index[key][0], now)
+
+            return entry.get("response")
+
+    def Put(self, key: str, response: dict):
+        """
+        Store a response in the cache, evicting the least recently used entries if it is full
+        """
+        entry = {"created": time.time(), "response": response}
+
+        with self.lock:
+            path = self._get_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as file:
+                    json.dump(entry, file, ensure_ascii=False, default=str)
+
+                os.replace(temp_path, path)
+
+            except OSError as e:
+                logging.warning(f"Unable to write response to cache: {e}")
+                return
+
+            index = self._get_index()
+            index[key] = (os.path.getsize(path), time.time())
+
+            self._evict(index)
+
+    def Clear(self):
+        """
+        Remove every entry from the cache
+        """
+        with self.lock:
+            for key in list(self._get_index().keys()):
+                self._remove(key)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _get_index(self) -> dict[str, tuple[int, float]]:
+        """
+        Size and last access time of each entry, scanned from disk on first use
+        """
+        if self._index is None:
+            self._index = {}
+            if os.path.isdir(self.directory):
+                for root, _, files in os.walk(self.directory):
+                    for filename in files:
+                        if not filename.endswith(".json"):
+                            continue
+
+                        try:
+                            stat = os.stat(os.path.join(root, filename))
+                            self._index[filename[:-5]] = (stat.st_size, stat.st_mtime)
+                        except OSError:
+                            pass
+
+        return self._index
+
+    def _evict(self, index: dict[str, tuple[int, float]]):
+        """
+        Remove the least recently used entries until the cache is within its size limit
+        """
+        if not self.max_size:
+            return
+
+        total_size = sum(size for size, _ in index.values())
+        if total_size <= self.max_size:
+            return
+
+        for key, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            if total_size <= self.max_size:
+                break
+
+            self._remove(key)
+            total_size -= size
+
+    def _remove(self, key: str):
+        with contextlib.suppress(OSError):
+            os.remove(self._get_path(key))
+
+        if self._index is not None:
+            self._index.pop(key, None)
+
+
+_response_caches: dict[str, ResponseCache] = {}
+_response_caches_lock = threading.Lock()
+
+
+def GetResponseCache(directory: str, max_size: int = None, ttl: float = None) -> ResponseCache:
+    """
+    Get the cache shared by every client using the same directory, creating it if necessary
+    """
+    with _response_caches_lock:
+        cache = _response_caches.get(directory)
+        if cache is None:
+            cache = ResponseCache(directory)
+            _response_caches[directory] = cache
+
+        if max_size is not None:
+            cache.max_size = max_size
+
+        if ttl is not None:
+            cache.ttl = ttl
+
+        return cache
@@ -18,6 +18,7 @@ class SubtitleBatch:
         self.errors = dct.get("errors", [])
         self._originals: list[SubtitleLine] = dct.get("originals", []) or dct.get("subtitles", [])
         self._translated: list[SubtitleLine] = dct.get("translated", [])
+        self._deferred: dict = {}
         self.translation: Translation = dct.get("translation")
         self.prompt: TranslationPrompt = dct.get("prompt")
 
@@ -27,6 +28,29 @@ class SubtitleBatch:
     def __repr__(self) -> str:
         return str(self)
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name != "dirty":
+            super().__setattr__("dirty", True)
+
+    def Defer(self, name: str, loader):
+        """
+        Load a field (translation or prompt) the first time it is accessed, rather than when the batch is created
+        """
+        self._deferred[name] = loader
+
+    def _load_deferred(self, name: str):
+        loader = self._deferred.pop(name, None)
+        if loader:
+            # Loading a deferred field does not change the batch
+            super().__setattr__(f"_{name}", loader())
+
+    def MarkDirty(self):
+        """
+        Flag that the batch has changed since it was last serialised, e.g. after modifying its lines in place
+        """
+        self.dirty = True
+
     @property
     def originals(self) -> list[SubtitleLine]:
         return self._originals
@@ -39,6 +63,26 @@ class SubtitleBatch:
     def translated(self) -> list[SubtitleLine]:
         return self._translated
 
+    @property
+    def translation(self) -> Translation:
+        self._load_deferred("translation")
+        return self._translation
+
+    @translation.setter
+    def translation(self, value: Translation):
+        self._deferred.pop("translation", None)
+        self._translation = value
+
+    @property
+    def prompt(self) -> TranslationPrompt:
+        self._load_deferred("prompt")
+        return self._prompt
+
+    @prompt.setter
+    def prompt(self, value: TranslationPrompt):
+        self._deferred.pop("prompt", None)
+        self._prompt = value
+
     @property
     def untranslated(self) -> list[SubtitleLine]:
         return [sub for sub in self.originals if not sub.translated]
@@ -100,12 +144,14 @@ class SubtitleBatch:
         Insert a line into the batch or replace an existing line
         """
         AddOrUpdateLine(self._originals, SubtitleLine(line))
+        self.MarkDirty()
 
     def AddTranslatedLine(self, line):
         """
         Insert a translated line into the batch or replace an existing translation
         """
         AddOrUpdateLine(self._translated, SubtitleLine(line))
+        self.MarkDirty()
 
     def HasTranslatedLine(self, line_number):
         if line_number < self.first_line_number or line_number > self.last_line_number:
@@ -121,6 +167,7 @@ class SubtitleBatch:
 
     def AddContext(self, key, value):
         self.context[key] = value
+        self.MarkDirty()
 
     def GetContext(self, key):
         return self.context.get(key)
@@ -143,6 +190,9 @@ class SubtitleBatch:
                 self.context[key] = update[key]
                 updated = True
 
+        if updated:
+            self.MarkDirty()
+
         return updated
 
     def PerformInputSubstitutions(self, substitutions: Substitutions):
@@ -158,6 +208,7 @@ class SubtitleBatch:
                 self.AddContext("input_replacements", replacements)
                 for item in self.originals:
                     item.text = replacements.get(item.text) or item.text
+                self.MarkDirty()
 
             return replacements
 
@@ -174,6 +225,7 @@ class SubtitleBatch:
                 self.AddContext("output_replacements", replacements)
                 for item in self.translated:
                     item.text = replacements.get(item.text) or item.text
+                self.MarkDirty()
 
             return replacements
 
@@ -231,6 +283,8 @@ class SubtitleBatch:
         if not line:
             raise SubtitleError("No line provided to insert")
 
+        self.MarkDirty()
+
         if not self.originals:
             self.originals = [line]
 
@@ -253,6 +307,8 @@ class SubtitleBatch:
         if not line:
             raise SubtitleError("No line provided to insert")
 
+        self.MarkDirty()
+
         if not self.translated:
             self.translated = [line]
 
@@ -1,22 +1,43 @@
+from collections.abc import Callable
 from datetime import timedelta
+from itertools import accumulate
 
 from PySubtitle.SubtitleBatch import SubtitleBatch
-from PySubtitle.SubtitleLine import SubtitleLine
+from PySubtitle.SubtitleLine import GetLineTimes, SubtitleLine
 from PySubtitle.SubtitleScene import SubtitleScene
+from PySubtitle.SubtitleTimeline import HasLineTimes, IsTimelineAvailable, SubtitleTimeline
+from PySubtitle.TokenEstimator import CreateTokenEstimator, TokenEstimator
+from PySubtitle.TranslationPrompt import default_line_template
 
 
 class SubtitleBatcher:
-    def __init__(self, settings):
+    def __init__(self, settings, max_output_tokens: int = 0, estimator: TokenEstimator = None):
         self.min_batch_size = settings.get("min_batch_size", 0)
         self.max_batch_size = settings.get("max_batch_size", 99)
 
+        # If a token budget is set, batches are sized by estimated tokens instead of line count
+        self.max_batch_tokens = settings.get("max_batch_tokens", 0) or 0
+        self.max_output_tokens = max_output_tokens or 0
+        self.estimator = estimator
+        if self.max_batch_tokens and not self.estimator:
+            self.estimator = CreateTokenEstimator(settings.get("token_estimator"), settings.get("model"))
+
         scene_threshold_seconds = settings.get("scene_threshold", 30.0)
         self.scene_threshold = timedelta(seconds=scene_threshold_seconds)
 
+        # Scenes with no more than this many lines can share a translation request with adjacent small scenes
+        self.coalesce_scene_size = settings.get("coalesce_scene_size", 0) or 0
+
+        # Use a columnar timeline for batching if numpy is available
+        self.use_timeline = IsTimelineAvailable()
+
     def BatchSubtitles(self, lines: list[SubtitleLine]):
         if self.min_batch_size > self.max_batch_size:
             raise ValueError("min_batch_size must be less than max_batch_size.")
 
+        if self.use_timeline and HasLineTimes(lines):
+            return self._batch_timeline(lines)
+
         scenes = []
         current_lines = []
         last_endtime = None
@@ -45,41 +66,180 @@ class SubtitleBatcher:
         """
         Create a scene and lines to it in batches
         """
+        return self._add_scene(scenes, self._split_lines(current_lines))
+
+    def _batch_timeline(self, lines: list[SubtitleLine]):
+        """
+        Divide the lines into scenes and batches using vectorised operations on a columnar timeline
+        """
+        timeline = SubtitleTimeline(lines)
+        timeline.FixOverlaps(timedelta(milliseconds=10))
+
+        batch_fits = self._get_batch_test(lines)
+
+        scenes = []
+        for first, last in timeline.GetScenes(self.scene_threshold):
+            parts = timeline.SplitRange(first, last, self.min_batch_size, batch_fits)
+            self._add_scene(scenes, [lines[start:end] for start, end in parts])
+
+        return scenes
+
+    def _add_scene(self, scenes: list[SubtitleScene], split_lines: list[list[SubtitleLine]]):
+        """
+        Add a scene with a batch for each group of lines
+        """
         scene = SubtitleScene()
         scenes.append(scene)
         scene.number = len(scenes)
 
-        split_lines = self._split_lines(current_lines)
-
         for lines in split_lines:
             batch: SubtitleBatch = scene.AddNewBatch()
             batch.originals = lines
 
         return scene
 
+    def CoalesceScenes(self, scenes: list[SubtitleScene]) -> list[list[SubtitleScene]]:
+        """
+        Group adjacent small scenes that can be translated together, as long as their lines would fit in one batch.
+        Other scenes are returned in a group of their own.
+        """
+        groups = []
+        group_lines = []
+        for scene in scenes:
+            is_small = self.coalesce_scene_size and len(scene.batches) == 1 and scene.linecount <= self.coalesce_scene_size
+            if is_small and groups and group_lines:
+                lines = group_lines + scene.batches[0].originals
+                if self._get_batch_test(lines)(0, len(lines)):
+                    groups[-1].append(scene)
+                    group_lines = lines
+                    continue
+
+            groups.append([scene])
+            group_lines = list(scene.batches[0].originals) if is_small else []
+
+        return groups
+
+    def EstimateLineTokens(self, line: SubtitleLine) -> tuple[int, int]:
+        """
+        Estimate the prompt and response tokens needed to translate a line.
+        The response repeats the line's prompt with the translation added.
+        """
+        prompt_tokens = self.estimator.EstimateTokens(default_line_template.format(number=line.number, text=line.text))
+        return prompt_tokens, prompt_tokens + self.estimator.EstimateTokens(line.text)
+
+    def _get_batch_test(self, lines: list[SubtitleLine]) -> Callable[[int, int], bool]:
+        """
+        Create a test for whether the lines in the range [first, last) are small enough to form a batch
+        """
+        if not self.max_batch_tokens:
+            return lambda first, last: last - first <= self.max_batch_size
+
+        line_tokens = [self.EstimateLineTokens(line) for line in lines]
+        total_tokens = [0] + list(accumulate(prompt + response for prompt, response in line_tokens))
+        response_tokens = [0] + list(accumulate(response for _, response in line_tokens))
+
+        # Ranges that cannot be split any further always fit
+        min_lines = max(self.min_batch_size, 1)
+
+        def batch_fits(first: int, last: int) -> bool:
+            if last - first <= min_lines:
+                return True
+
+            if self.max_output_tokens and response_tokens[last] - response_tokens[first] > self.max_output_tokens:
+                return False
+
+            return total_tokens[last] - total_tokens[first] <= self.max_batch_tokens
+
+        return batch_fits
+
     def _split_lines(self, lines: list[SubtitleLine]):
         """
-        Recursively divide the lines at the largest gap until there is no batch larger than the maximum batch size
+        Divide the lines at the largest gap until every batch is within the maximum batch size or token budget
         """
+        batch_fits = self._get_batch_test(lines)
+
         # If the batch is small enough, we're done
-        if len(lines) <= self.max_batch_size:
+        if batch_fits(0, len(lines)):
             return [lines]
 
-        # Find the longest gap starting from the min_batch_size index
-        longest_gap = timedelta(seconds=0)
-        split_index = self.min_batch_size
-        last_split_index = len(lines) - self.min_batch_size
+        gap_table = _GapTable(lines)
+
+        split_lines = []
+        pending = [(0, len(lines))]
+        while pending:
+            first, last = pending.pop()
+            if batch_fits(first, last):
+                split_lines.append(lines[first:last])
+                continue
+
+            split_index = self._find_split(gap_table, first, last)
+
+            # Process the left part first, to keep the batches in order
+            pending.append((split_index, last))
+            pending.append((first, split_index))
+
+        return split_lines
+
+    def _find_split(self, gap_table: "_GapTable", first: int, last: int) -> int:
+        """
+        Find the first of the longest gaps that leaves at least min_batch_size lines either side of the split
+        """
+        split_index = first + self.min_batch_size
+        last_split_index = last - self.min_batch_size
 
         if last_split_index > split_index:
-            for i in range(split_index, last_split_index):
-                gap = lines[i].start - lines[i - 1].end
-                if gap > longest_gap:
-                    longest_gap = gap
-                    split_index = i
-
-        # Split the batch into two
-        left = lines[:split_index]
-        right = lines[split_index:]
-
-        # Recursively split the batches and concatenate the lists
-        return self._split_lines(left) + self._split_lines(right)
+            if split_index == first:
+                # The first line of a range is measured against the last line (for consistency with list indexing)
+                best_gap = gap_table.GetGap(first, last - 1)
+                best_index = first
+                if last_split_index > first + 1:
+                    index = gap_table.GetLargestGap(first + 1, last_split_index)
+                    if gap_table.gaps[index] > best_gap:
+                        best_gap, best_index = gap_table.gaps[index], index
+            else:
+                best_index = gap_table.GetLargestGap(split_index, last_split_index)
+                best_gap = gap_table.gaps[best_index]
+
+            if best_gap > 0:
+                split_index = best_index
+
+        # Always make progress, even if no split point leaves min_batch_size lines on the left
+        return max(split_index, first + 1)
+
+
+class _GapTable:
+    """
+    A sparse table of the gaps between lines, which finds the first largest gap in any range in constant time
+    """
+
+    def __init__(self, lines: list[SubtitleLine]):
+        self.starts, self.ends = GetLineTimes(lines)
+        self.gaps = [0] + [self.starts[i] - self.ends[i - 1] for i in range(1, len(lines))]
+
+        # Each level holds the index of the largest gap in the range of 2^level lines starting at each line
+        gaps = self.gaps
+        self.levels = [list(range(len(gaps)))]
+        width = 1
+        while width * 2 <= len(gaps):
+            previous = self.levels[-1]
+            level = []
+            for i in range(len(gaps) - width * 2 + 1):
+                left, right = previous[i], previous[i + width]
+                level.append(left if gaps[left] >= gaps[right] else right)
+            self.levels.append(level)
+            width *= 2
+
+    def GetGap(self, index: int, previous: int) -> int:
+        """
+        Get the gap between the end of one line and the start of another
+        """
+        return self.starts[index] - self.ends[previous]
+
+    def GetLargestGap(self, first: int, last: int) -> int:
+        """
+        Get the index of the first largest gap in the range [first, last)
+        """
+        level = (last - first).bit_length() - 1
+        left = self.levels[level][first]
+        right = self.levels[level][last - (1 << level)]
+        return left if self.gaps[left] >= self.gaps[right] else right
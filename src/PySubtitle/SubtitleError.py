@@ -54,6 +54,14 @@ class TranslationResponseError(TranslationError):
         self.response = response
 
 
+class RateLimitedError(TranslationResponseError):
+    """The provider rejected the request for exceeding a rate limit, retry after a delay"""
+
+    def __init__(self, message, response, retry_after: float = None):
+        super().__init__(message, response)
+        self.retry_after = retry_after
+
+
 class NoTranslationError(TranslationError):
     def __init__(self, message, translation=None):
         super().__init__(message=message, translation=translation)
@@ -2,7 +2,8 @@ import bisect
 import json
 import logging
 import os
-import threading
+import uuid
+from collections import deque
 from copy import deepcopy
 
 import srt
@@ -12,6 +13,8 @@ from PySubtitle.Helpers.Parse import ParseNames
 from PySubtitle.Helpers.Text import IsRightToLeftText
 from PySubtitle.Instructions import DEFAULT_TASK_TYPE
 from PySubtitle.Options import Options
+from PySubtitle.ProjectCompression import OpenProjectFile
+from PySubtitle.ReadWriteLock import ReadWriteLock
 from PySubtitle.Substitutions import Substitutions
 from PySubtitle.SubtitleBatch import SubtitleBatch
 from PySubtitle.SubtitleBatcher import SubtitleBatcher
@@ -53,7 +56,8 @@ class SubtitleFile:
         self.translated: list[SubtitleLine] = None
         self.start_line_number = 1
         self._scenes: list[SubtitleScene] = []
-        self.lock = threading.RLock()
+        self.lock = ReadWriteLock()
+        self._invalidate_indexes()
 
         self.sourcepath = GetInputPath(filepath)
         self.outputpath = outputpath or None
@@ -78,12 +82,12 @@ class SubtitleFile:
 
     @property
     def linecount(self):
-        with self.lock:
+        with self.lock.read():
             return len(self.originals) if self.originals else 0
 
     @property
     def scenecount(self):
-        with self.lock:
+        with self.lock.read():
             return len(self.scenes) if self.scenes else 0
 
     @property
@@ -96,6 +100,7 @@ class SubtitleFile:
             self._scenes = scenes
             self.originals, self.translated, _ = UnbatchScenes(scenes)
             self.start_line_number = (self.originals[0].number if self.originals else 1) or 1
+            self._invalidate_indexes()
 
     def GetScene(self, scene_number: int) -> SubtitleScene:
         """
@@ -104,8 +109,8 @@ class SubtitleFile:
         if not self.scenes:
             raise SubtitleError("Subtitles have not been batched")
 
-        with self.lock:
-            matches = [scene for scene in self.scenes if scene.number == scene_number]
+        with self.lock.read():
+            matches = self._lookup_scenes(scene_number)
 
         if not matches:
             raise SubtitleError(f"Scene {scene_number} does not exist")
@@ -119,27 +124,28 @@ class SubtitleFile:
         """
         Get a batch by scene and batch number
         """
-        with self.lock:
-            scene = self.GetScene(scene_number)
-            for batch in scene.batches:
-                if batch.number == batch_number:
-                    return batch
+        with self.lock.read():
+            self.GetScene(scene_number)
+            batch = self._lookup_batch(scene_number, batch_number)
+
+        if not batch:
+            raise SubtitleError(f"Scene {scene_number} batch {batch_number} doesn't exist")
 
-        raise SubtitleError(f"Scene {scene_number} batch {batch_number} doesn't exist")
+        return batch
 
     def GetOriginalLine(self, line_number: int) -> SubtitleLine:
         """
         Get a line by number
         """
-        with self.lock:
-            return next((line for line in self.originals if line.number == line_number), None)
+        with self.lock.read():
+            return self._lookup_line(line_number, translated=False)
 
     def GetTranslatedLine(self, line_number: int) -> SubtitleLine:
         """
         Get a translated line by number
         """
-        with self.lock:
-            return next((line for line in self.translated if line.number == line_number), None)
+        with self.lock.read():
+            return self._lookup_line(line_number, translated=True)
 
     def GetBatchContainingLine(self, line_number: int):
         """
@@ -148,17 +154,8 @@ class SubtitleFile:
         if not self.scenes:
             raise SubtitleError("Subtitles have not been batched yet")
 
-        for scene in self.scenes:
-            if scene.first_line_number > line_number:
-                break
-
-            if scene.last_line_number >= line_number:
-                for batch in scene.batches:
-                    if batch.first_line_number > line_number:
-                        break
-
-                    if batch.last_line_number >= line_number:
-                        return batch
+        with self.lock.read():
+            return self._lookup_batch_containing_line(line_number)
 
     def GetBatchesContainingLines(self, line_numbers: list[int]):
         """
@@ -208,7 +205,7 @@ class SubtitleFile:
         """
         Get context for a batch of subtitles, by extracting summaries from previous scenes and batches
         """
-        with self.lock:
+        with self.lock.read():
             scene = self.GetScene(scene_number)
             if not scene:
                 raise SubtitleError(f"Failed to find scene {scene_number}")
@@ -282,9 +279,21 @@ class SubtitleFile:
         projectfile = os.path.normpath(projectfile)
         logging.info(f"Writing project data to {str(projectfile)}")
 
-        with self.lock, open(projectfile, "w", encoding=default_encoding) as f:
-            project_json = json.dumps(self, cls=encoder_class, ensure_ascii=False, indent=4)
-            f.write(project_json)
+        # Write to a temporary file and move it into place, so that an interrupted write cannot corrupt the project.
+        # The name keeps the extension, which determines whether the project is compressed.
+        directory, filename = os.path.split(projectfile)
+        temppath = os.path.join(directory, f".{uuid.uuid4().hex[:8]}-{filename}")
+
+        try:
+            # Stream the encoded project to the file rather than building the whole string
+            with self.lock.read(), OpenProjectFile(temppath, "w") as f:
+                json.dump(self, f, cls=encoder_class, ensure_ascii=False, indent=4)
+
+            os.replace(temppath, projectfile)
+
+        finally:
+            if os.path.exists(temppath):
+                os.remove(temppath)
 
     def SaveOriginal(self, path: str = None):
         """
@@ -294,7 +303,7 @@ class SubtitleFile:
         if not path:
             raise ValueError("No file path set")
 
-        with self.lock:
+        with self.lock.read():
             srtfile = srt.compose([line.item for line in self.originals], reindex=False)
             with open(path, "w", encoding=default_encoding) as f:
                 f.write(srtfile)
@@ -397,6 +406,7 @@ class SubtitleFile:
     def AddScene(self, scene):
         with self.lock:
             self.scenes.append(scene)
+            self._invalidate_indexes()
             logging.debug("Added a new scene")
 
     def UpdateScene(self, scene_number, update):
@@ -417,10 +427,14 @@ class SubtitleFile:
 
     def UpdateLineText(self, line_number: int, original_text: str, translated_text: str):
         with self.lock:
-            original_line = next((original for original in self.originals if original.number == line_number), None)
+            original_line = self.GetOriginalLine(line_number) if self.originals else None
             if not original_line:
                 raise ValueError(f"Line {line_number} not found")
 
+            batch = self.GetBatchContainingLine(line_number) if self.scenes else None
+            if batch:
+                batch.MarkDirty()
+
             if original_text:
                 original_line.text = original_text
                 original_line.translation = translated_text
@@ -428,11 +442,7 @@ class SubtitleFile:
             if not translated_text:
                 return
 
-            translated_line = (
-                next((translated for translated in self.translated if translated.number == line_number), None)
-                if self.translated
-                else None
-            )
+            translated_line = self.GetTranslatedLine(line_number) if self.translated else None
             if translated_line:
                 translated_line.text = translated_text
                 return
@@ -442,8 +452,9 @@ class SubtitleFile:
             if not self.translated:
                 self.translated = []
 
-            insertIndex = bisect.bisect_left([line.number for line in self.translated], line_number)
+            insertIndex = bisect.bisect_left(self.translated, line_number, key=lambda line: line.number)
             self.translated.insert(insertIndex, translated_line)
+            self._translated_index = None
 
     def DeleteLines(self, line_numbers: list[int]):
         """
@@ -462,6 +473,8 @@ class SubtitleFile:
             if not deletions:
                 raise ValueError("No lines were deleted from any batches")
 
+            self._invalidate_indexes()
+
         return deletions
 
     def MergeScenes(self, scene_numbers: list[int]):
@@ -506,6 +519,7 @@ class SubtitleFile:
                 raise ValueError(f"Scene {str(scene_number)} not found")
 
             scene.MergeBatches(batch_numbers)
+            self._invalidate_indexes()
 
     def MergeLinesInBatch(self, scene_number: int, batch_number: int, line_numbers: list[int]):
         """
@@ -513,7 +527,9 @@ class SubtitleFile:
         """
         with self.lock:
             batch: SubtitleBatch = self.GetBatch(scene_number, batch_number)
-            return batch.MergeLines(line_numbers)
+            merged_lines = batch.MergeLines(line_numbers)
+            self._invalidate_indexes()
+            return merged_lines
 
     def SplitScene(self, scene_number: int, batch_number: int):
         """
@@ -578,29 +594,161 @@ class SubtitleFile:
                 batch.scene = scene.number
                 batch.number = batch_number
 
+        self._invalidate_indexes()
+
+    def _invalidate_indexes(self):
+        """
+        Discard the lookup indexes after a structural change, so that they are rebuilt when they are next used
+        """
+        self._scene_index: dict[int, list[SubtitleScene]] = None
+        self._batch_index: dict[tuple[int, int], tuple[SubtitleScene, SubtitleBatch]] = None
+        self._line_index: dict[int, tuple[SubtitleBatch, int]] = None
+        self._original_index: tuple[list[SubtitleLine], int, dict[int, SubtitleLine]] = None
+        self._translated_index: tuple[list[SubtitleLine], int, dict[int, SubtitleLine]] = None
+
+    def _lookup_scenes(self, scene_number: int) -> list[SubtitleScene]:
+        """
+        Find the scenes with a number, rebuilding the index if the scenes have changed since it was built
+        """
+        if self._scene_index is not None:
+            matches = self._scene_index.get(scene_number)
+            if matches and all(scene.number == scene_number for scene in matches):
+                return matches
+
+        # Build the index before publishing it, because readers may be looking up scenes concurrently
+        scene_index = {}
+        for scene in self.scenes:
+            scene_index.setdefault(scene.number, []).append(scene)
+
+        self._scene_index = scene_index
+        return scene_index.get(scene_number)
+
+    def _lookup_batch(self, scene_number: int, batch_number: int) -> SubtitleBatch:
+        """
+        Find a batch by scene and batch number, rebuilding the index if the batches have changed since it was built
+        """
+        key = (scene_number, batch_number)
+        if self._batch_index is not None:
+            scene, batch = self._batch_index.get(key, (None, None))
+            if batch and scene.number == scene_number and batch.number == batch_number:
+                return batch
+
+        self._batch_index = {
+            (scene.number, batch.number): (scene, batch)
+            for scene in reversed(self.scenes)
+            for batch in reversed(scene.batches)
+        }
+
+        _, batch = self._batch_index.get(key, (None, None))
+        return batch
+
+    def _lookup_batch_containing_line(self, line_number: int) -> SubtitleBatch:
+        """
+        Find the batch containing an original line, rebuilding the index if the lines have moved since it was built
+        """
+        if self._line_index is not None:
+            batch, index = self._line_index.get(line_number, (None, None))
+            if batch and batch.originals and index < len(batch.originals) and batch.originals[index].number == line_number:
+                return batch
+
+        self._line_index = {
+            line.number: (batch, index)
+            for scene in reversed(self.scenes)
+            for batch in reversed(scene.batches)
+            for index, line in enumerate(batch.originals or [])
+        }
+
+        batch, _ = self._line_index.get(line_number, (None, None))
+        if batch:
+            return batch
+
+        # Fall back to the batch whose range includes the line number, e.g. if the line has been deleted
+        for scene in self.scenes:
+            if scene.first_line_number > line_number:
+                break
+
+            if scene.last_line_number >= line_number:
+                for batch in scene.batches:
+                    if batch.first_line_number > line_number:
+                        break
+
+                    if batch.last_line_number >= line_number:
+                        return batch
+
+        return None
+
+    def _lookup_line(self, line_number: int, translated: bool) -> SubtitleLine:
+        """
+        Find an original or translated line by number, rebuilding the index if the list of lines has been replaced
+        """
+        lines = self.translated if translated else self.originals
+        if not lines:
+            return None
+
+        cached = self._translated_index if translated else self._original_index
+        if cached is not None:
+            source, count, index = cached
+            if source is lines and count == len(lines):
+                line = index.get(line_number)
+                if line is None or line.number == line_number:
+                    return line
+
+        index = {line.number: line for line in reversed(lines)}
+        if translated:
+            self._translated_index = (lines, len(lines), index)
+        else:
+            self._original_index = (lines, len(lines), index)
+
+        return index.get(line_number)
+
     def _get_history(self, scene_number: int, batch_number: int, max_lines: int):
         """
-        Get a list of historical summaries up to a given scene and batch number
+        Get a list of historical summaries up to a given scene and batch number.
+
+        The history is collected backwards from the batch, so only as many scenes and batches are visited as are needed
+        to fill max_lines. Consecutive repeats of a summary are listed once, at their first occurrence.
         """
-        history_lines = []
-        last_summary = ""
+        history_lines = deque()
+        run_summary = None
+        run_line = None
+
+        for summary, line in self._get_preceding_summaries(scene_number, batch_number):
+            if summary == run_summary:
+                # An earlier occurrence of the same summary replaces the later one
+                run_line = line
+                continue
 
-        scenes = [scene for scene in self.scenes if scene.number < scene_number]
-        for scene in [scene for scene in scenes if scene.summary]:
-            if scene.summary != last_summary:
-                history_lines.append(f"scene {scene.number}: {scene.summary}")
-                last_summary = scene.summary
+            if run_line:
+                history_lines.appendleft(run_line)
+                if max_lines and len(history_lines) >= max_lines:
+                    return list(history_lines)
 
-        batches = [batch for batch in self.GetScene(scene_number).batches if batch.number < batch_number]
-        for batch in [batch for batch in batches if batch.summary]:
-            if batch.summary != last_summary:
-                history_lines.append(f"scene {batch.scene} batch {batch.number}: {batch.summary}")
-                last_summary = batch.summary
+            run_summary = summary
+            run_line = line
 
-        if max_lines:
-            history_lines = history_lines[-max_lines:]
+        if run_line:
+            history_lines.appendleft(run_line)
+
+        return list(history_lines)
+
+    def _get_preceding_summaries(self, scene_number: int, batch_number: int):
+        """
+        Generate the summaries of the batches and scenes before a batch, most recent first
+        """
+        scene = self.GetScene(scene_number)
+        batches = scene.batches
+        batch_index = bisect.bisect_left(batches, batch_number, key=lambda batch: batch.number)
+        for index in range(batch_index - 1, -1, -1):
+            batch = batches[index]
+            if batch.summary:
+                yield batch.summary, f"scene {batch.scene} batch {batch.number}: {batch.summary}"
 
-        return history_lines
+        scenes = self.scenes
+        scene_index = bisect.bisect_left(scenes, scene_number, key=lambda scene: scene.number)
+        for index in range(scene_index - 1, -1, -1):
+            scene = scenes[index]
+            if scene.summary:
+                yield scene.summary, f"scene {scene.number}: {scene.summary}"
 
     def _merge_original_and_translated(self, originals: list[SubtitleLine], translated: list[SubtitleLine]):
         lines = {item.key: SubtitleLine(item.line) for item in originals if item.key}
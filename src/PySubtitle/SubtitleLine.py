@@ -11,12 +11,18 @@ class SubtitleLine:
     """
     Represents a single line, with a number and start and end times plus original text
     and (optionally) an associated translation.
+
+    Times are stored as integer microseconds (the resolution of a timedelta, so nothing is lost), and an srt.Subtitle
+    is only created when one is needed to compose SRT output. The timedelta properties and the item property are kept
+    for compatibility, and the _ms properties give whole milliseconds as they appear in an SRT file.
     """
 
+    # The fields of an invalid line are all None
+    __slots__ = ("_valid", "_number", "_start", "_end", "_text", "_proprietary", "translation", "original")
+
     def __init__(self, line: srt.Subtitle | str, translation: str = None, original: str = None):
         if isinstance(line, SubtitleLine):
-            self._item = line._item
-            self._duration = line._duration
+            self._copy_fields(line)
             self.translation = translation or line.translation
             self.original = original or line.original
         else:
@@ -25,13 +31,13 @@ class SubtitleLine:
             self.original = original
 
     def __str__(self):
-        return self.item.to_srt() if self.item else None
+        return self.item.to_srt() if self._valid else None
 
     def __repr__(self):
         return f"[Line {self.number}] {TimeDeltaToText(self.start)}, {repr(self.text)}"
 
     def __eq__(self, other):
-        return self._item == other._item if isinstance(other, SubtitleLine) else False
+        return self._get_fields() == other._get_fields() if isinstance(other, SubtitleLine) else False
 
     @property
     def key(self) -> int | str:
@@ -39,11 +45,11 @@ class SubtitleLine:
 
     @property
     def number(self) -> int:
-        return self._item.index if self._item else None
+        return self._number
 
     @property
     def text(self) -> str:
-        return self._item.content if self._item else None
+        return self._text
 
     @property
     def text_normalized(self) -> str:
@@ -51,11 +57,15 @@ class SubtitleLine:
 
     @property
     def start(self) -> timedelta:
-        return self._item.start if self._item else None
+        return _one_microsecond * self._start if self._start is not None else None
+
+    @property
+    def start_ms(self) -> int:
+        return self._start // 1000 if self._start is not None else None
 
     @property
     def srt_start(self) -> str:
-        return srt.timedelta_to_srt_timestamp(self.start) if self.start is not None else None
+        return _get_srt_timestamp(self._start) if self._start is not None else None
 
     @property
     def txt_start(self) -> str:
@@ -63,11 +73,15 @@ class SubtitleLine:
 
     @property
     def end(self) -> timedelta:
-        return self._item.end if self._item else None
+        return _one_microsecond * self._end if self._end is not None else None
+
+    @property
+    def end_ms(self) -> int:
+        return self._end // 1000 if self._end is not None else None
 
     @property
     def srt_end(self) -> str:
-        return srt.timedelta_to_srt_timestamp(self.end) if self.end else None
+        return _get_srt_timestamp(self._end) if self._end else None
 
     @property
     def txt_end(self) -> str:
@@ -75,15 +89,16 @@ class SubtitleLine:
 
     @property
     def duration(self) -> timedelta:
-        if not self._duration:
-            self._duration = self.end - self.start if self.start is not None and self.end else timedelta(seconds=0)
-        return self._duration
+        return _one_microsecond * self._get_duration()
 
     @duration.setter
     def duration(self, duration):
-        if self._item and self._item.start is not None:
-            self._duration = GetTimeDelta(duration)
-            self._item.end = self._item.start + self._duration
+        if self._valid and self._start is not None:
+            self._end = self._start + _get_microseconds(duration)
+
+    @property
+    def duration_ms(self) -> int:
+        return self._get_duration() // 1000
 
     @property
     def srt_duration(self) -> str:
@@ -91,52 +106,90 @@ class SubtitleLine:
 
     @property
     def line(self) -> str | None:
-        if not self._item or self._item.start is None or self._item.end is None:
+        if not self._valid or self._start is None or self._end is None:
             return None
 
-        return self._item.to_srt(strict=False)
+        # Equivalent to srt.Subtitle.to_srt(strict=False), without creating the subtitle
+        proprietary = f" {self._proprietary}" if self._proprietary else ""
+        start = _get_srt_timestamp(self._start)
+        end = _get_srt_timestamp(self._end)
+        return f"{self._number or 0}\n{start} --> {end}{proprietary}\n{self._text}\n\n"
 
     @property
     def translated(self) -> srt.Subtitle | None:
-        if self._item is None or self.translation is None:
+        if not self._valid or self.translation is None:
             return None
         return SubtitleLine.Construct(self.number, self.start, self.end, self.translation)
 
     @property
     def item(self) -> srt.Subtitle:
-        return self._item
+        if not self._valid:
+            return None
+
+        return srt.Subtitle(self._number, self.start, self.end, self._text, self._proprietary)
 
     @item.setter
     def item(self, item: srt.Subtitle | str):
-        self._item: srt.Subtitle = CreateSrtSubtitle(item)
-        self._duration = None
+        if isinstance(item, SubtitleLine):
+            self._copy_fields(item)
+            return
+
+        item = CreateSrtSubtitle(item)
+        self._valid = isinstance(item, srt.Subtitle)
+        if self._valid:
+            self._number = item.index
+            self._start = _get_microseconds(item.start)
+            self._end = _get_microseconds(item.end)
+            self._text = item.content
+            self._proprietary = item.proprietary
+        else:
+            self._number = self._start = self._end = self._text = None
+            self._proprietary = ""
 
     @number.setter
     def number(self, value: int):
-        if self._item:
-            self._item.index = value
+        if self._valid:
+            self._number = value
 
     @text.setter
     def text(self, text: str):
-        if self._item:
-            self._item.content = text
+        if self._valid:
+            self._text = text
 
     @start.setter
     def start(self, time: timedelta | str):
-        if self._item:
-            self._item.start = GetTimeDelta(time)
-            self._duration = None
+        if self._valid:
+            self._start = _get_microseconds(time)
+
+    @start_ms.setter
+    def start_ms(self, value: int):
+        if self._valid:
+            self._start = value * 1000 if value is not None else None
 
     @end.setter
     def end(self, time: timedelta | str):
-        if self._item:
-            self._item.end = GetTimeDelta(time)
-            self._duration = None
+        if self._valid:
+            self._end = _get_microseconds(time)
+
+    @end_ms.setter
+    def end_ms(self, value: int):
+        if self._valid:
+            self._end = value * 1000 if value is not None else None
 
     @translated.setter
     def translated(self, translated):
         self.translation = SubtitleLine(translated).text
 
+    def _get_duration(self) -> int:
+        # A line that ends at zero has no duration
+        return self._end - self._start if self._start is not None and self._end else 0
+
+    def _copy_fields(self, line: "SubtitleLine"):
+        self._valid, self._number, self._start, self._end, self._text, self._proprietary = line._get_fields()
+
+    def _get_fields(self) -> tuple:
+        return (self._valid, self._number, self._start, self._end, self._text, self._proprietary)
+
     @classmethod
     def Construct(cls, number: int, start: timedelta | str, end: timedelta | str, text: str, original: str = None):
         number = int(number) if number else None
@@ -196,3 +249,34 @@ def CreateSrtSubtitle(item: srt.Subtitle | SubtitleLine | str) -> srt.Subtitle:
             logging.warning(f"Failed to parse line: {line}")
 
     return item
+
+
+def GetLineTimes(lines: list[SubtitleLine]) -> tuple[list[int], list[int]]:
+    """
+    Get the start and end times of a list of lines in microseconds, without creating a timedelta for each one
+    """
+    return [line._start for line in lines], [line._end for line in lines]
+
+
+def _get_microseconds(time: timedelta | str | None) -> int | None:
+    """
+    Convert a time to integer microseconds
+    """
+    time = GetTimeDelta(time)
+    return time // _one_microsecond if time is not None else None
+
+
+def _get_srt_timestamp(microseconds: int) -> str:
+    """
+    Format microseconds as an SRT timestamp, matching srt.timedelta_to_srt_timestamp
+    """
+    if microseconds < 0:
+        return srt.timedelta_to_srt_timestamp(timedelta(microseconds=microseconds))
+
+    seconds, microseconds = divmod(microseconds, 1_000_000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{microseconds // 1000:03d}"
+
+
+_one_microsecond = timedelta(microseconds=1)
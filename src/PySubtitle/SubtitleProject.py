@@ -1,10 +1,14 @@
 import json
 import logging
 import os
-import threading
 
-from PySubtitle.Helpers import GetOutputPath
+from PySubtitle.Helpers import GetInputPath, GetOutputPath
 from PySubtitle.Options import Options
+from PySubtitle.ProjectAutosave import ProjectAutosave
+from PySubtitle.ProjectCompression import IsCompressedProject, OpenProjectReader
+from PySubtitle.ProjectJournal import ProjectJournal
+from PySubtitle.ProjectStore import IsProjectStore, ProjectStore
+from PySubtitle.ReadWriteLock import ReadWriteLock
 from PySubtitle.SubtitleBatch import SubtitleBatch
 from PySubtitle.SubtitleError import SubtitleError, TranslationAbortedError
 from PySubtitle.SubtitleFile import SubtitleFile
@@ -25,7 +29,15 @@ class SubtitleProject:
         self.read_project = False
         self.write_project = False
         self.needs_writing = False
-        self.lock = threading.RLock()
+        self.use_journal = options.get("project_journal")
+        self.journal_compact_threshold = options.get("journal_compact_threshold") or 0
+        self.journal: ProjectJournal = None
+        self.store: ProjectStore = None
+        self.use_autosave = options.get("autosave")
+        self.autosave_interval = options.get("autosave_interval") or 0.0
+        self.autosave_batches = options.get("autosave_batches") or 0
+        self.autosave: ProjectAutosave = None
+        self.lock = ReadWriteLock()
 
         if subtitles:
             self.UpdateProjectSettings(options)
@@ -46,7 +58,7 @@ class SubtitleProject:
 
     @property
     def any_translated(self):
-        with self.lock:
+        with self.lock.read():
             return bool(self.subtitles and self.subtitles.translated)
 
     def InitialiseProject(self, filepath: str, outputpath: str = None, reload_subtitles: bool = False):
@@ -72,6 +84,11 @@ class SubtitleProject:
             self.read_project = False
             self.load_subtitles = True
 
+            # Create the project from the subtitle file it is named after
+            if self.projectfile == filepath:
+                sourcepath = GetInputPath(filepath)
+                logging.info(f"Creating project from {sourcepath}")
+
         if self.read_project:
             # Try to load the project file
             subtitles = self.ReadProjectFile(self.projectfile)
@@ -134,6 +151,9 @@ class SubtitleProject:
             logging.error(f"Unable to save translation: {e}")
 
     def GetProjectFilepath(self, filepath):
+        if IsProjectStore(filepath) or IsCompressedProject(filepath):
+            return os.path.normpath(filepath)
+
         path, ext = os.path.splitext(filepath)
         filepath = filepath if ext == ".subtrans" else f"{path}.subtrans"
         return os.path.normpath(filepath)
@@ -179,10 +199,26 @@ class SubtitleProject:
                 raise Exception("No file path provided")
 
             self.subtitles.outputpath = GetOutputPath(projectfile, self.subtitles.target_language)
-            self.subtitles.SaveProjectFile(projectfile, encoder_class=SubtitleEncoder)
 
+            # Clear the flag before writing, so that changes made while the project is written are not forgotten
             self.needs_writing = False
 
+            try:
+                if IsProjectStore(projectfile):
+                    logging.info(f"Writing project data to {str(projectfile)}")
+                    self._get_store(projectfile).Save(self.subtitles)
+                    return
+
+                self.subtitles.SaveProjectFile(projectfile, encoder_class=SubtitleEncoder)
+
+            except Exception:
+                self.needs_writing = True
+                raise
+
+            # The project file now includes every change in the journal
+            if self.use_journal:
+                self._get_journal(projectfile).Reset()
+
     def WriteBackupFile(self):
         """
         Save a backup copy of the project
@@ -201,8 +237,26 @@ class SubtitleProject:
             with self.lock:
                 logging.info(f"Reading project data from {str(filepath)}")
 
-                with open(filepath, encoding=default_encoding, newline="") as f:
-                    subtitles: SubtitleFile = json.load(f, cls=SubtitleDecoder)
+                if IsProjectStore(filepath):
+                    if not os.path.exists(filepath):
+                        raise FileNotFoundError(filepath)
+
+                    subtitles = self._get_store(filepath).Load()
+                    subtitles.Sanitise()
+                    self.subtitles = subtitles
+                    return subtitles
+
+                # The project file is hashed as it is read, to check that the journal applies to it
+                digest = ProjectJournal.CreateSnapshotDigest() if self.use_journal else None
+                with OpenProjectReader(filepath, digest) as f:
+                    subtitles: SubtitleFile = json.load(f, cls=SubtitleDecoder, lazy=True)
+
+                # Apply any changes that were journaled since the project file was last written
+                if self.use_journal:
+                    journal = self._get_journal(filepath)
+                    replayed = journal.Replay(subtitles, digest.hexdigest())
+                    if replayed:
+                        logging.info(f"Replayed {replayed} changes from {journal.path}")
 
                 subtitles.Sanitise()
                 self.subtitles = subtitles
@@ -224,6 +278,13 @@ class SubtitleProject:
             if self.needs_writing and self.subtitles and self.subtitles.scenes:
                 self.WriteProjectFile()
 
+    def FlushProjectFile(self):
+        """
+        Wait for the autosave worker to save any pending changes to the project
+        """
+        if self.autosave:
+            self.autosave.Stop()
+
     def GetProjectSettings(self):
         """
         Return a dictionary of non-empty settings from the project file
@@ -264,21 +325,34 @@ class SubtitleProject:
         try:
             translator.events.preprocessed += self._on_preprocessed
             translator.events.batch_translated += self._on_batch_translated
+            translator.events.lines_translated += self._on_lines_translated
             translator.events.scene_translated += self._on_scene_translated
 
             translator.TranslateSubtitles(self.subtitles)
 
+            lock = self.subtitles.lock
+            logging.debug(
+                f"Subtitle lock contention: {lock.read_contention} reads and {lock.write_contention} writes waited "
+                f"{lock.wait_time:.3f}s in total"
+            )
+
             translator.events.preprocessed -= self._on_preprocessed
             translator.events.batch_translated -= self._on_batch_translated
+            translator.events.lines_translated -= self._on_lines_translated
             translator.events.scene_translated -= self._on_scene_translated
 
+            self.FlushProjectFile()
+
             if self.save_subtitles and not translator.aborted:
                 self.SaveTranslation()
 
         except TranslationAbortedError:
             logging.info("Translation aborted")
+            self.FlushProjectFile()
 
         except Exception as e:
+            self.FlushProjectFile()
+
             if self.subtitles and self.save_subtitles and translator.stop_on_error:
                 self.SaveTranslation()
 
@@ -300,6 +374,7 @@ class SubtitleProject:
 
         translator.events.preprocessed += self._on_preprocessed
         translator.events.batch_translated += self._on_batch_translated
+        translator.events.lines_translated += self._on_lines_translated
 
         try:
             scene: SubtitleScene = self.subtitles.GetScene(scene_number)
@@ -319,6 +394,8 @@ class SubtitleProject:
         finally:
             translator.events.preprocessed -= self._on_preprocessed
             translator.events.batch_translated -= self._on_batch_translated
+            translator.events.lines_translated -= self._on_lines_translated
+            self.FlushProjectFile()
 
     def ReparseBatchTranslation(
         self, translator: SubtitleTranslator, scene_number: int, batch_number: int, line_numbers: list[int] = None
@@ -359,6 +436,95 @@ class SubtitleProject:
         options.add("reparse", project_mode in ["reparse"])
         options.add("retranslate", project_mode in ["retranslate"])
 
+    def _get_journal(self, projectfile: str) -> ProjectJournal:
+        projectfile = os.path.normpath(projectfile)
+        if not self.journal or self.journal.projectfile != projectfile:
+            self.journal = ProjectJournal(projectfile)
+        return self.journal
+
+    def _get_store(self, projectfile: str) -> ProjectStore:
+        projectfile = os.path.normpath(projectfile)
+        if not self.store or self.store.path != projectfile:
+            if self.store:
+                self.store.Close()
+            self.store = ProjectStore(projectfile)
+        return self.store
+
+    def _queue_update(self, batch: SubtitleBatch = None, scene: SubtitleScene = None):
+        """
+        Save a change to the project, on the autosave worker if it is enabled
+        """
+        if not (self.write_project and self.projectfile and self.subtitles):
+            self.needs_writing = self.write_project
+            return
+
+        if self.use_autosave:
+            if not self.autosave:
+                self.autosave = ProjectAutosave(self._save_changes, self.autosave_interval, self.autosave_batches)
+
+            if not (self.use_journal or IsProjectStore(self.projectfile)):
+                self.needs_writing = True
+
+            self.autosave.RequestSave(batch=batch, scene=scene)
+
+        elif not self._save_changes([batch] if batch else [], [scene] if scene else []):
+            self.needs_writing = self.write_project
+
+    def _save_changes(self, batches: list[SubtitleBatch], scenes: list[SubtitleScene]) -> bool:
+        """
+        Save changes to the project by appending them to the journal or updating the store if possible,
+        or by writing the project file. Returns False if the changes were not saved.
+        """
+        with self.lock:
+            if not (self.write_project and self.projectfile and self.subtitles):
+                return False
+
+            if IsProjectStore(self.projectfile):
+                return self._store_update(batches, scenes)
+
+            if not self.use_journal:
+                if not self.use_autosave:
+                    return False
+
+                self.WriteProjectFile()
+                return True
+
+            journal = self._get_journal(self.projectfile)
+
+            # Changes to the structure of the project need a full write before they can be journaled
+            if self.needs_writing or journal.snapshot_hash is None or not os.path.exists(self.projectfile):
+                self.WriteProjectFile()
+                return True
+
+            for batch in batches:
+                journal.AppendBatch(batch)
+            for scene in scenes:
+                journal.AppendScene(scene)
+
+            if self.journal_compact_threshold and journal.record_count >= self.journal_compact_threshold:
+                logging.debug(f"Compacting {journal.record_count} journaled changes into the project file")
+                self.WriteProjectFile()
+
+            return True
+
+    def _store_update(self, batches: list[SubtitleBatch], scenes: list[SubtitleScene]) -> bool:
+        """
+        Save changes to the project with point updates of the project store
+        """
+        store = self._get_store(self.projectfile)
+
+        # Changes to the structure of the project need a full write
+        if self.needs_writing or not store.has_project:
+            self.WriteProjectFile()
+            return True
+
+        for batch in batches:
+            store.SaveBatch(batch)
+        for scene in scenes:
+            store.SaveScene(scene)
+
+        return True
+
     def _on_preprocessed(self, scenes):
         logging.debug("Pre-processing finished")
         self.needs_writing = self.write_project
@@ -366,10 +532,17 @@ class SubtitleProject:
 
     def _on_batch_translated(self, batch):
         logging.debug("Batch translated")
-        self.needs_writing = self.write_project
+        self._queue_update(batch=batch)
         self.events.batch_translated(batch)
 
+    def _on_lines_translated(self, batch, lines):
+        logging.debug(f"{len(lines)} lines translated")
+        # The batch is journaled when it has been translated
+        if not (self.use_journal or IsProjectStore(self.projectfile)):
+            self.needs_writing = self.write_project
+        self.events.lines_translated(batch, lines)
+
     def _on_scene_translated(self, scene):
         logging.debug("Scene translated")
-        self.needs_writing = self.write_project
+        self._queue_update(scene=scene)
         self.events.scene_translated(scene)
@@ -1,7 +1,6 @@
 import logging
-from datetime import timedelta
 
-from PySubtitle.Helpers.Subtitles import ResyncTranslatedLines
+from PySubtitle.Helpers.Subtitles import FindBestSplitIndex, ResyncTranslatedLines
 from PySubtitle.SubtitleBatch import SubtitleBatch
 from PySubtitle.SubtitleLine import SubtitleLine
 
@@ -199,22 +198,11 @@ class SubtitleScene:
         if not batch:
             raise ValueError("Invalid batch number")
 
-        midpoint = len(batch.originals) // 2
-        if midpoint < min_size:
+        if len(batch.originals) // 2 < min_size:
             raise ValueError("Batch is too small to split")
 
-        best_split_index = None
-        best_split_score = 0
-
         # Split lines according to the largest gap weighted towards the middle of the batch
-        for i in range(min_size, len(batch.originals) - min_size):
-            gap = batch.originals[i].start - batch.originals[i - 1].end
-            proximity_to_midpoint = midpoint - abs(i - midpoint)
-            split_score = proximity_to_midpoint * (gap / timedelta(milliseconds=1))
-
-            if split_score > best_split_score:
-                best_split_score = split_score
-                best_split_index = i
+        best_split_index = FindBestSplitIndex(batch.originals, min_size)
 
         if best_split_index:
             split_line = batch.originals[best_split_index].number
@@ -1,4 +1,8 @@
 import json
+import uuid
+from weakref import WeakKeyDictionary
+
+import regex
 
 from PySubtitle.SubtitleBatch import SubtitleBatch
 from PySubtitle.SubtitleError import TranslationError
@@ -16,9 +20,58 @@ def classname(obj):
     return type(obj).__name__
 
 
+# Encoded JSON for each batch, which is reused until the batch is modified
+_batch_fragments: WeakKeyDictionary = WeakKeyDictionary()
+
+
 # Convert our custom types to JSON
 class SubtitleEncoder(json.JSONEncoder):
+    """
+    Serialises subtitles to JSON.
+
+    Each batch is encoded separately and cached until it is marked as dirty, so that saving a project only has to
+    re-encode the batches that have changed. The cached fragments are spliced into the encoded project.
+    """
+
+    def __init__(self, *args, cache_batches: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_batches = cache_batches
+        self._fragments: list[str] = None
+        self._placeholder = None
+
+    def iterencode(self, obj, _one_shot=False):
+        """
+        Encode the object in chunks, so that it can be written to a stream without building the whole string
+        """
+        if not self.cache_batches or self._fragments is not None or isinstance(obj, SubtitleBatch):
+            yield from super().iterencode(obj, _one_shot)
+            return
+
+        self._fragments = []
+        self._placeholder = f"@@batch-{uuid.uuid4().hex}-"
+        try:
+            # The outline of the project is small, since every batch is replaced by a placeholder
+            text = "".join(super().iterencode(obj, _one_shot))
+            fragments = self._fragments
+            pattern = regex.compile(rf'([ \t]*)"{self._placeholder}(\d+)"')
+        finally:
+            self._fragments = None
+
+        # Replace the placeholders with the encoded batches, indented to match their position
+        position = 0
+        for match in pattern.finditer(text):
+            indent = match.group(1)
+            yield text[position : match.start()]
+            yield indent + fragments[int(match.group(2))].replace("\n", "\n" + indent)
+            position = match.end()
+
+        yield text[position:]
+
     def default(self, obj):
+        if self._fragments is not None and isinstance(obj, SubtitleBatch):
+            self._fragments.append(self._get_batch_fragment(obj))
+            return f"{self._placeholder}{len(self._fragments) - 1}"
+
         if isinstance(obj, TranslationError):
             # Don't bother trying to serialise all the error types (why not?)
             return {"__class": classname(TranslationError), "type": classname(obj), "problem": str(obj)}
@@ -90,13 +143,58 @@ class SubtitleEncoder(json.JSONEncoder):
 
         return super().default(obj)
 
+    def _get_batch_fragment(self, batch: SubtitleBatch) -> str:
+        """
+        Get the encoded JSON for a batch, encoding it only if it has changed
+        """
+        fragments = None if batch.dirty else _batch_fragments.get(batch)
+        if fragments is None:
+            fragments = {}
+            _batch_fragments[batch] = fragments
+            # Clear the flag first, so that changes made while encoding are picked up next time
+            batch.dirty = False
+
+        key = (self.indent, self.ensure_ascii, self.sort_keys, self.item_separator, self.key_separator)
+        fragment = fragments.get(key)
+        if fragment is None:
+            encoder = type(self)(
+                cache_batches=False,
+                skipkeys=self.skipkeys,
+                ensure_ascii=self.ensure_ascii,
+                check_circular=self.check_circular,
+                allow_nan=self.allow_nan,
+                sort_keys=self.sort_keys,
+                indent=self.indent,
+                separators=(self.item_separator, self.key_separator),
+            )
+            fragment = encoder.encode(batch)
+            fragments[key] = fragment
+
+        return fragment
+
 
 # Reconstruct our custom types from JSON
 class SubtitleDecoder(json.JSONDecoder):
-    def __init__(self, **kwargs):
+    """
+    Reconstructs subtitles from JSON.
+
+    If lazy is True, the translation and prompt for each batch are kept as plain dictionaries and only turned into
+    objects when they are first accessed, since most operations on a loaded project do not need them.
+    """
+
+    lazy_classes = [classname(Translation), "GPTTranslation", classname(TranslationPrompt)]
+
+    def __init__(self, lazy: bool = False, **kwargs):
+        self.lazy = lazy
         super().__init__(object_hook=self.object_hook, **kwargs)
 
     def object_hook(self, dct):
+        if self.lazy and dct.get("_class") in self.lazy_classes:
+            return dct
+
+        return self._decode_object(dct)
+
+    def _decode_object(self, dct):
         if "_class" in dct:
             class_name = dct.pop("_class")
             if class_name == classname(SubtitleFile):
@@ -111,7 +209,14 @@ class SubtitleDecoder(json.JSONDecoder):
                 obj = SubtitleScene(dct)
                 return obj
             elif class_name == classname(SubtitleBatch):
+                deferred = {}
+                for field in ["translation", "prompt"]:
+                    if isinstance(dct.get(field), dict):
+                        deferred[field] = dct.pop(field)
+
                 obj = SubtitleBatch(dct)
+                for field, value in deferred.items():
+                    obj.Defer(field, lambda value=value: self._decode_object(value))
                 return obj
             elif class_name == classname(SubtitleLine) or class_name == "Subtitle":  # TEMP backward compatibility
                 return SubtitleLine(dct.get("line"), translation=dct.get("translation"), original=dct.get("original"))
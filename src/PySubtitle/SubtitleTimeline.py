@@ -0,0 +1,128 @@
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+
+from PySubtitle.SubtitleLine import GetLineTimes, SubtitleLine
+
+
+try:
+    import numpy
+
+except ImportError as e:
+    logging.debug(f"Failed to import numpy: {e}")
+    numpy = None
+
+
+def IsTimelineAvailable() -> bool:
+    """
+    Check whether numpy is installed, which is required for a columnar timeline
+    """
+    return numpy is not None
+
+
+def HasLineTimes(lines: list[SubtitleLine]) -> bool:
+    """
+    Check that every line has a start and end time, so that the lines can be represented as a timeline
+    """
+    starts, ends = GetLineTimes(lines)
+    return None not in starts and None not in ends
+
+
+class SubtitleTimeline:
+    """
+    The start and end times of a list of lines, held as columns of int64 microseconds.
+
+    This allows the batcher to fix overlaps, measure gaps, find scene boundaries and choose split points with vectorised
+    operations over the whole timeline instead of timedelta arithmetic line by line.
+    """
+
+    def __init__(self, lines: list[SubtitleLine]):
+        if numpy is None:
+            raise ImportError("numpy is required for a columnar timeline")
+
+        self.lines = lines
+        starts, ends = GetLineTimes(lines)
+        self.starts = numpy.array(starts, dtype=numpy.int64)
+        self.ends = numpy.array(ends, dtype=numpy.int64)
+        self.gaps = None
+
+    def FixOverlaps(self, min_gap: timedelta):
+        """
+        Move the start of each line that overlaps the previous line to just after it ends, updating the lines as well
+        """
+        previous_ends = self.ends[:-1]
+        overlapping = (self.starts[1:] < previous_ends) & (previous_ends != 0)
+        indices = numpy.flatnonzero(overlapping) + 1
+        if len(indices):
+            self.starts[indices] = self.ends[indices - 1] + _get_microseconds(min_gap)
+            for index, start in zip(indices.tolist(), self.starts[indices].tolist(), strict=True):
+                self.lines[index].start = timedelta(microseconds=start)
+
+        self.gaps = None
+
+    def GetGaps(self):
+        """
+        Get the gap between each line and the previous line (the first gap is zero)
+        """
+        if self.gaps is None:
+            self.gaps = numpy.zeros(len(self.starts), dtype=numpy.int64)
+            self.gaps[1:] = self.starts[1:] - self.ends[:-1]
+        return self.gaps
+
+    def GetScenes(self, threshold: timedelta) -> list[tuple[int, int]]:
+        """
+        Divide the timeline into scenes wherever the gap between lines is greater than the threshold,
+        returning the (first, last) index range of each scene
+        """
+        if not len(self.starts):
+            return []
+
+        boundaries = (numpy.flatnonzero(self.GetGaps()[1:] > _get_microseconds(threshold)) + 1).tolist()
+        firsts = [0] + boundaries
+        lasts = boundaries + [len(self.starts)]
+        return list(zip(firsts, lasts, strict=True))
+
+    def SplitRange(self, first: int, last: int, min_size: int, fits: Callable[[int, int], bool]) -> list[tuple[int, int]]:
+        """
+        Divide a range of lines at the largest gaps until every part fits, returning the parts in order
+        """
+        parts = []
+        pending = [(first, last)]
+        while pending:
+            first, last = pending.pop()
+            if fits(first, last):
+                parts.append((first, last))
+                continue
+
+            split_index = self._find_split(first, last, min_size)
+
+            # Process the left part first, to keep the parts in order
+            pending.append((split_index, last))
+            pending.append((first, split_index))
+
+        return parts
+
+    def _find_split(self, first: int, last: int, min_size: int) -> int:
+        """
+        Find the first of the longest gaps that leaves at least min_size lines either side of the split
+        """
+        split_index = first + min_size
+        last_split_index = last - min_size
+
+        if last_split_index > split_index:
+            gaps = self.GetGaps()[split_index:last_split_index]
+            if split_index == first:
+                # The first line of a range is measured against the last line (for consistency with list indexing)
+                gaps = gaps.copy()
+                gaps[0] = self.starts[first] - self.ends[last - 1]
+
+            best_index = int(numpy.argmax(gaps))
+            if gaps[best_index] > 0:
+                split_index += best_index
+
+        # Always make progress, even if no split point leaves min_size lines on the left
+        return max(split_index, first + 1)
+
+
+def _get_microseconds(time: timedelta) -> int:
+    return time // timedelta(microseconds=1)
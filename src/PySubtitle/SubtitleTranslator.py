@@ -1,11 +1,16 @@
+import asyncio
 import logging
 import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from os import linesep
 
+from PySubtitle.ConcurrencyController import ConcurrencyController
 from PySubtitle.Helpers import FormatErrorMessages
-from PySubtitle.Helpers.Subtitles import MergeTranslations
+from PySubtitle.Helpers.Subtitles import FindBestSplitIndex, MergeTranslations
 from PySubtitle.Helpers.Text import Linearise, SanitiseSummary
-from PySubtitle.Instructions import DEFAULT_TASK_TYPE, Instructions
+from PySubtitle.Instructions import DEFAULT_TASK_TYPE, Instructions, default_summary_instructions
 from PySubtitle.Options import Options
 from PySubtitle.Substitutions import Substitutions
 from PySubtitle.SubtitleBatch import SubtitleBatch
@@ -17,14 +22,18 @@ from PySubtitle.SubtitleError import (
     TranslationAbortedError,
     TranslationError,
     TranslationImpossibleError,
+    TranslationValidationError,
+    UntranslatedLinesError,
 )
 from PySubtitle.SubtitleFile import SubtitleFile
+from PySubtitle.SubtitleLine import SubtitleLine
 from PySubtitle.SubtitleProcessor import SubtitleProcessor
 from PySubtitle.SubtitleScene import SubtitleScene, UnbatchScenes
+from PySubtitle.SubtitleValidator import SubtitleValidator
 from PySubtitle.Translation import Translation
 from PySubtitle.TranslationClient import TranslationClient
 from PySubtitle.TranslationEvents import TranslationEvents
-from PySubtitle.TranslationParser import TranslationParser
+from PySubtitle.TranslationParser import TranslationParser, line_boundary_pattern
 from PySubtitle.TranslationPrompt import TranslationPrompt
 from PySubtitle.TranslationProvider import TranslationProvider
 
@@ -45,15 +54,21 @@ class SubtitleTranslator:
 
         self.lines_processed = 0
         self.max_lines = options.get("max_lines")
+        self.max_threads = options.get("max_threads") or 1
         self.max_history = options.get("max_context_summaries")
         self.stop_on_error = options.get("stop_on_error")
         self.retry_on_error = options.get("retry_on_error")
+        self.targeted_retry = options.get("targeted_retry")
+        self.retry_context_lines = options.get("retry_context_lines") or 0
         # self.split_on_error = options.get('autosplit_incomplete')
         self.max_summary_length = options.get("max_summary_length")
         self.resume = options.get("resume")
         self.retranslate = options.get("retranslate")
         self.reparse = options.get("reparse")
         self.preview = options.get("preview")
+        self.summary_prepass = options.get("scene_summary_prepass")
+        self.summary_model = options.get("summary_model")
+        self.stream_responses = options.get("stream_responses")
 
         self.instructions: Instructions = options.GetInstructions()
         self.task_type = self.instructions.task_type or DEFAULT_TASK_TYPE
@@ -80,75 +95,221 @@ class SubtitleTranslator:
         if not self.client:
             raise ProviderError("Unable to create translation client")
 
-        self.batcher = SubtitleBatcher(options)
+        self.summary_client: TranslationClient = None
+
+        self.multithreaded = self.max_threads > 1 and self.translation_provider.allow_multithreaded_translation
+
+        self.concurrency: ConcurrencyController = None
+        if self.multithreaded and options.get("adaptive_concurrency"):
+            self.concurrency = ConcurrencyController(self.max_threads)
+            self.client.events.rate_limited += self.concurrency.OnRateLimited
+
+        self.batcher = SubtitleBatcher(options, max_output_tokens=self._get_max_output_tokens())
 
         self.postprocessor = SubtitleProcessor(options) if options.get("postprocess_translation") else None
 
+    def _get_scene_groups(self, subtitles: SubtitleFile) -> list[list[SubtitleScene]]:
+        """
+        Group small scenes to be translated together, if scene coalescing is enabled and each batch gets its own request
+        """
+        if not self.batcher.coalesce_scene_size or self.max_lines or self.reparse or self.retranslate:
+            return [[scene] for scene in subtitles.scenes]
+
+        return self.batcher.CoalesceScenes(subtitles.scenes)
+
+    def _get_max_output_tokens(self) -> int:
+        """
+        Get the provider's limit on response tokens, so that token-based batches can avoid truncated translations.
+        The limit is a provider setting, so it is read from the client rather than the translator's settings.
+        """
+        client_settings = self.client.settings or {}
+        max_tokens = getattr(self.client, "max_tokens", None) or client_settings.get("max_tokens")
+        max_tokens = max_tokens or client_settings.get("max_completion_tokens")
+        try:
+            return int(max_tokens or 0)
+        except (TypeError, ValueError):
+            return 0
+
     def StopTranslating(self):
         self.aborted = True
         self.client.AbortTranslation()
 
+        if self.concurrency:
+            self.concurrency.Stop()
+
+        if self.summary_client and self.summary_client is not self.client:
+            self.summary_client.AbortTranslation()
+
     def TranslateSubtitles(self, subtitles: SubtitleFile):
         """
         Translate a SubtitleFile
         """
-        if not subtitles:
-            raise TranslationImpossibleError("No subtitles to translate")
+        self._begin_translation(subtitles)
 
-        if subtitles.scenes and self.resume:
-            logging.info("Resuming translation")
+        if self.summary_prepass and not (self.preview or self.reparse):
+            self.SummariseScenes(subtitles)
+            self.TranslateScenesConcurrently(subtitles)
+        elif self.multithreaded:
+            self.TranslateConcurrently(subtitles)
+        else:
+            self.TranslateSequentially(subtitles)
 
-        if not subtitles.scenes:
-            if self.retranslate or self.resume:
-                logging.warning("Previous subtitles not found, starting fresh...")
+        self._end_translation(subtitles)
 
-            subtitles.AutoBatch(self.batcher)
+    async def TranslateSubtitlesAsync(self, subtitles: SubtitleFile):
+        """
+        Translate a SubtitleFile from an asyncio event loop, with up to max_threads requests in flight
+        """
+        self._begin_translation(subtitles)
 
-        if not subtitles.scenes:
-            raise TranslationImpossibleError("No scenes to translate")
+        await self.TranslateConcurrentlyAsync(subtitles)
 
-        logging.info(f"Translating {subtitles.linecount} lines in {subtitles.scenecount} scenes")
+        self._end_translation(subtitles)
 
-        self.events.preprocessed(subtitles.scenes)
-
-        # Iterate over each subtitle scene and request translation
-        for scene in subtitles.scenes:
+    def TranslateSequentially(self, subtitles: SubtitleFile):
+        """
+        Translate each scene in turn, carrying context forward from one batch to the next
+        """
+        for scenes in self._get_scene_groups(subtitles):
             if self.aborted:
                 break
 
             if self.max_lines and self.lines_processed >= self.max_lines:
                 break
 
-            if self.resume and scene.all_translated:
-                logging.info(f"Scene {scene.number} already translated {scene.linecount} lines...")
+            if self.resume:
+                for scene in scenes:
+                    if scene.all_translated:
+                        logging.info(f"Scene {scene.number} already translated {scene.linecount} lines...")
+
+                scenes = [scene for scene in scenes if not scene.all_translated]
+
+            if not scenes:
                 continue
 
-            logging.debug(f"Translating scene {scene.number} of {subtitles.scenecount}")
-            batch_numbers = [batch.number for batch in scene.batches if not batch.translated] if self.resume else None
+            if len(scenes) > 1:
+                logging.debug(f"Translating scenes {scenes[0].number} to {scenes[-1].number} of {subtitles.scenecount}")
+                self.TranslateSceneGroup(subtitles, scenes)
+            else:
+                scene = scenes[0]
+                logging.debug(f"Translating scene {scene.number} of {subtitles.scenecount}")
+                batch_numbers = [batch.number for batch in scene.batches if not batch.translated] if self.resume else None
 
-            self.TranslateScene(subtitles, scene, batch_numbers=batch_numbers)
+                self.TranslateScene(subtitles, scene, batch_numbers=batch_numbers)
 
             if self.errors and self.stop_on_error:
-                logging.error(f"Failed to translate scene {scene.number}... stopping translation")
+                logging.error(f"Failed to translate scene {scenes[-1].number}... stopping translation")
                 return
 
-        if self.aborted:
-            logging.info("Translation aborted")
+    def TranslateConcurrently(self, subtitles: SubtitleFile):
+        """
+        Dispatch batches to a pool of worker threads and apply the results in batch order.
+
+        Prompts are built up front, so each batch receives the context that is available when it is dispatched
+        rather than the summary of the batch before it.
+        """
+        logging.info(f"Translating with up to {self.max_threads} concurrent requests")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="SubtitleTranslator")
+        try:
+            pending = self._dispatch_batches(
+                subtitles,
+                lambda batch: executor.submit(self._request_translation, batch.prompt, self._get_streaming_callback(batch)),
+            )
+
+            self._apply_concurrent_results(pending)
+
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def TranslateConcurrentlyAsync(self, subtitles: SubtitleFile):
+        """
+        Dispatch batches as asyncio tasks and apply the results in batch order.
+
+        The number of requests in flight is limited to max_threads if the provider supports concurrent requests.
+        """
+        max_requests = self.max_threads if self.multithreaded else 1
+        logging.info(f"Translating with up to {max_requests} concurrent requests")
+
+        semaphore = asyncio.Semaphore(max_requests)
+
+        async def request_translation(prompt: TranslationPrompt) -> Translation:
+            async with semaphore:
+                if self.aborted:
+                    return None
+                return await self._request_translation_async(prompt)
+
+        pending = self._dispatch_batches(subtitles, lambda batch: asyncio.create_task(request_translation(batch.prompt)))
+        try:
+            await self._apply_async_results(pending)
+
+        finally:
+            tasks = [task for _, _, _, task in pending if task is not None and not task.done()]
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            # The async client is bound to this event loop, so close it before the loop ends
+            await self.client.CloseAsyncClient()
+
+    def TranslateScenesConcurrently(self, subtitles: SubtitleFile):
+        """
+        Translate scenes in parallel, with the batches in each scene translated sequentially.
+
+        Scenes should already have a summary (see SummariseScenes) so that each scene receives the history
+        of the scenes before it without waiting for them to be translated.
+        """
+        max_workers = self.max_threads if self.multithreaded else 1
+        logging.info(f"Translating up to {max_workers} scenes concurrently")
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SubtitleTranslator")
+        try:
+            futures = [executor.submit(self._translate_scene_task, subtitles, scene) for scene in subtitles.scenes]
+
+            for future in futures:
+                future.result()
+
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def SummariseScenes(self, subtitles: SubtitleFile):
+        """
+        Request a synopsis of each scene from its original lines, to seed the context for concurrent translation
+        """
+        scenes = [scene for scene in subtitles.scenes if not scene.summary and not (self.resume and scene.all_translated)]
+        if not scenes:
             return
 
-        # Linearise the translated scenes
-        originals, translations, untranslated = UnbatchScenes(subtitles.scenes)
+        client = self._get_summary_client()
+        max_workers = self.max_threads if self.multithreaded else 1
 
-        if translations:
-            logging.info(f"Successfully translated {len(translations)} lines!")
+        logging.info(f"Summarising {len(scenes)} scenes before translation")
 
-        if untranslated and not self.max_lines:
-            logging.warning(f"Failed to translate {len(untranslated)} lines:")
-            for line in untranslated:
-                logging.info(f"Untranslated > {line.number}. {line.text}")
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SubtitleTranslator")
+        try:
+            futures = [(scene, executor.submit(self._request_scene_summary, client, subtitles, scene)) for scene in scenes]
 
-        subtitles.originals = originals
-        subtitles.translated = translations
+            for scene, future in futures:
+                if self.aborted:
+                    return
+
+                try:
+                    summary = future.result()
+
+                except TranslationImpossibleError:
+                    raise
+
+                except TranslationError as e:
+                    logging.warning(f"Unable to summarise scene {scene.number}: {str(e)}")
+                    continue
+
+                if summary:
+                    logging.debug(f"Scene {scene.number} summary: {summary}")
+                    scene.summary = summary
+
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def TranslateScene(self, subtitles: SubtitleFile, scene: SubtitleScene, batch_numbers=None, line_numbers=None):
         """
@@ -169,6 +330,7 @@ class SubtitleTranslator:
                 except TranslationError as e:
                     logging.warning(f"Error translating scene {batch.scene} batch {batch.number}: {str(e)}")
                     batch.errors.append(e)
+                    batch.MarkDirty()
 
                 if self.aborted:
                     return
@@ -196,67 +358,75 @@ class SubtitleTranslator:
         except (TranslationAbortedError, TranslationImpossibleError):
             raise
 
-    def TranslateBatch(self, batch: SubtitleBatch, line_numbers: list[int], context: dict):
+    def TranslateSceneGroup(self, subtitles: SubtitleFile, scenes: list[SubtitleScene]):
         """
-        Send batches of subtitles for translation, building up context.
+        Translate several small scenes with a single request, then apply the response to the batch in each scene.
+
+        Any batch that the response does not fully translate is sent again on its own.
         """
-        if self.aborted:
-            return
+        batches: list[SubtitleBatch] = [scene.batches[0] for scene in scenes]
+        context = subtitles.GetBatchContext(scenes[0].number, batches[0].number, self.max_history)
 
-        if self.resume and batch.all_translated:
-            logging.info(f"Scene {batch.scene} batch {batch.number} already translated {batch.size} lines...")
+        prompt = self._prepare_scene_group(scenes, batches, context)
+        if self.preview:
             return
 
-        if self.reparse and batch.translation:
-            logging.info(f"Reparsing scene {batch.scene} batch {batch.number} with {len(batch.originals)} lines...")
-            self.ProcessBatchTranslation(batch, batch.translation, line_numbers)
-            return
+        translation: Translation = self._request_scene_group_translation(scenes, prompt)
 
-        originals, context = self.PreprocessBatch(batch, context)
+        scene_translations = self.client.GetParser(self.task_type).SplitScenes(translation) if translation else {}
 
-        logging.debug(f"Translating scene {batch.scene} batch {batch.number} with {len(originals)} lines...")
+        for scene, batch in zip(scenes, batches, strict=True):
+            if self.aborted:
+                return
 
-        # Build summaries context
-        context["batch"] = f"Scene {batch.scene} batch {batch.number}"
-        if batch.summary:
-            context["summary"] = batch.summary
+            scene_translation = scene_translations.get(scene.number, translation)
 
-        instructions = self.instructions.instructions
-        batch.prompt = self.client.BuildTranslationPrompt(self.user_prompt, instructions, originals, context)
+            try:
+                if scene_translation:
+                    self.ProcessBatchTranslation(batch, scene_translation, None)
 
-        if self.preview:
-            return
+                if batch.errors or not batch.all_translated:
+                    logging.info(f"Translating scene {scene.number} batch {batch.number} separately")
+                    batch_context = subtitles.GetBatchContext(scene.number, batch.number, self.max_history)
+                    self.TranslateBatch(batch, None, batch_context)
+                else:
+                    self._update_context(batch, scene_translation, context)
 
-        # Ask the client to do the translation
-        translation: Translation = self.client.RequestTranslation(batch.prompt)
+            except TranslationImpossibleError:
+                raise
+
+            except TranslationError as e:
+                logging.warning(f"Error translating scene {batch.scene} batch {batch.number}: {str(e)}")
+                batch.errors.append(e)
+                batch.MarkDirty()
 
-        if (translation and translation.reached_token_limit) and not self.aborted:
-            # Try again without the context to keep the tokens down
-            # TODO: better to split the batch into smaller chunks
-            logging.warning("Hit API token limit, retrying batch without context...")
-            batch.prompt.GenerateMessages(self.instructions.instructions, batch.originals, {})
+            if self.aborted:
+                return
 
-            translation = self.client.RequestTranslation(batch.prompt)
+            self.events.batch_translated(batch)
 
-        if not self.aborted:
-            if not translation:
-                raise TranslationError(f"Unable to translate scene {batch.scene} batch {batch.number}")
+            if batch.errors:
+                logging.warning(f"Errors encountered translating scene {batch.scene} batch {batch.number}")
+                scene.errors.extend(batch.errors)
+                self.errors.extend(batch.errors)
+                if self.stop_on_error:
+                    return
 
-            # Process the response
-            self.ProcessBatchTranslation(batch, translation, line_numbers)
+            scene.summary = self._get_best_summary([scene.summary, batch.summary])
+            self.events.scene_translated(scene)
+
+    def TranslateBatch(self, batch: SubtitleBatch, line_numbers: list[int], context: dict):
+        """
+        Send batches of subtitles for translation, building up context.
+        """
+        if not self._prepare_batch(batch, line_numbers, context):
+            return
 
-            # Consider retrying if there were errors
-            if batch.errors and self.retry_on_error:
-                logging.warning(f"Scene {batch.scene} batch {batch.number} failed validation, requesting retranslation")
-                self.RequestRetranslation(batch, line_numbers=line_numbers, context=context)
+        # Ask the client to do the translation
+        streaming_callback = self._get_streaming_callback(batch, line_numbers)
+        translation: Translation = self._request_translation(batch.prompt, streaming_callback)
 
-            # Update the context, unless it's a retranslation pass
-            if not self.retranslate and not self.aborted:
-                context["summary"] = self._get_best_summary([translation.summary, batch.summary])
-                context["scene"] = self._get_best_summary([translation.scene, context.get("scene")])
-                context["synopsis"] = translation.synopsis or context.get("synopsis", "")
-                # context['names'] = translation.names or context.get('names', []) or options.get('names')
-                batch.UpdateContext(context)
+        self._process_batch_response(batch, translation, line_numbers, context)
 
     def PreprocessBatch(self, batch: SubtitleBatch, context: dict):
         """
@@ -352,6 +522,11 @@ class SubtitleTranslator:
         if not translation:
             raise TranslationError("No translation to retranslate")
 
+        if self.targeted_retry:
+            retry_lines = self._get_retry_lines(batch, line_numbers)
+            if retry_lines:
+                return self._request_targeted_retranslation(batch, retry_lines, line_numbers, context)
+
         prompt: TranslationPrompt = batch.prompt
         if not prompt or not prompt.messages:
             raise TranslationError("No prompt to retranslate")
@@ -379,6 +554,604 @@ class SubtitleTranslator:
         else:
             logging.info("Retry passed validation")
 
+    def _get_retry_lines(self, batch: SubtitleBatch, line_numbers: list[int] = None) -> list[SubtitleLine]:
+        """
+        Find the original lines that failed validation or were not translated
+        """
+        failed_numbers = set(line.number for line in batch.untranslated)
+        for error in batch.errors:
+            if not isinstance(error, TranslationValidationError):
+                return None
+
+            failed_numbers.update(line.number for line in error.lines if line.number)
+
+        if line_numbers:
+            failed_numbers.intersection_update(line_numbers)
+
+        return [line for line in batch.originals if line.number in failed_numbers and line.text and line.text.strip()]
+
+    def _request_targeted_retranslation(
+        self, batch: SubtitleBatch, retry_lines: list[SubtitleLine], line_numbers: list[int], context: dict
+    ):
+        """
+        Ask the client to retranslate just the lines that failed, with a few surrounding lines for context
+        """
+        retry_keys = set(line.key for line in retry_lines)
+        indexes = [index for index, line in enumerate(batch.originals) if line.key in retry_keys]
+        window = set()
+        for index in indexes:
+            window.update(range(max(index - self.retry_context_lines, 0), index + self.retry_context_lines + 1))
+
+        lines = [batch.originals[index] for index in sorted(window) if index < len(batch.originals)]
+        lines = [line for line in lines if line.text and line.text.strip()]
+
+        logging.info(f"Retranslating {len(retry_lines)} lines of scene {batch.scene} batch {batch.number}")
+
+        error_messages = "\n".join(sorted(set(f"- {str(e).strip()}" for e in batch.errors)))
+        instructions = f"{self.instructions.instructions}\n\n{self.instructions.retry_instructions}"
+        if error_messages:
+            instructions = f"{instructions}\n\nThere were some problems with the translation:\n{error_messages}"
+
+        prompt: TranslationPrompt = self.client.BuildTranslationPrompt(self.user_prompt, instructions, lines, context)
+
+        # Let's raise the temperature a little bit
+        temperature = self.client.temperature or 0.0
+        retry_temperature = min(temperature + 0.1, 1.0)
+
+        retranslation: Translation = self.client.RequestTranslation(prompt, retry_temperature)
+
+        if self.aborted:
+            return None
+
+        if not isinstance(retranslation, Translation):
+            raise TranslationError("Retranslation is not the expected type", translation=retranslation)
+
+        logging.debug(f"Scene {batch.scene} batch {batch.number} retranslation:\n{retranslation.text}\n")
+
+        if not retranslation.has_translation:
+            raise TranslationError("Retranslation contains no translated text", translation=retranslation)
+
+        parser: TranslationParser = self.client.GetParser(self.task_type)
+        parser.ProcessTranslation(retranslation)
+
+        # Only replace the lines that failed, the surrounding lines are just for context
+        previous_translations = {line.key: line.translation for line in retry_lines}
+        translated, unmatched = parser.MatchTranslations(retry_lines)
+
+        # Keep the previous translation of any line that is missing from the retry
+        for line in unmatched:
+            line.translation = previous_translations.get(line.key)
+
+        batch.translated = MergeTranslations(batch.translated or [], translated)
+
+        replacements = batch.PerformOutputSubstitutions(self.substitutions)
+        if replacements:
+            replaced = [f"{k} -> {v}" for k, v in replacements.items()]
+            logging.info(f"Made substitutions in output:\n{linesep.join(replaced)}")
+
+        if self.postprocessor:
+            batch.translated = self.postprocessor.PostprocessSubtitles(batch.translated)
+
+        batch.errors = SubtitleValidator(self.settings).ValidateTranslations(batch.translated)
+        if batch.untranslated:
+            batch.errors.append(
+                UntranslatedLinesError(f"No translation found for {len(batch.untranslated)} lines", lines=batch.untranslated)
+            )
+
+        if batch.errors:
+            logging.warning(f"Retry failed validation: {FormatErrorMessages(batch.errors)}")
+        else:
+            logging.info("Retry passed validation")
+
+    def _begin_translation(self, subtitles: SubtitleFile):
+        """
+        Check there is something to translate and batch the subtitles if necessary
+        """
+        if not subtitles:
+            raise TranslationImpossibleError("No subtitles to translate")
+
+        if subtitles.scenes and self.resume:
+            logging.info("Resuming translation")
+
+        if not subtitles.scenes:
+            if self.retranslate or self.resume:
+                logging.warning("Previous subtitles not found, starting fresh...")
+
+            subtitles.AutoBatch(self.batcher)
+
+        if not subtitles.scenes:
+            raise TranslationImpossibleError("No scenes to translate")
+
+        logging.info(f"Translating {subtitles.linecount} lines in {subtitles.scenecount} scenes")
+
+        self.events.preprocessed(subtitles.scenes)
+
+    def _end_translation(self, subtitles: SubtitleFile):
+        """
+        Collect the translated lines once all the scenes have been translated
+        """
+        if self.errors and self.stop_on_error:
+            return
+
+        if self.aborted:
+            logging.info("Translation aborted")
+            return
+
+        # Linearise the translated scenes
+        originals, translations, untranslated = UnbatchScenes(subtitles.scenes)
+
+        if translations:
+            logging.info(f"Successfully translated {len(translations)} lines!")
+
+        if untranslated and not self.max_lines:
+            logging.warning(f"Failed to translate {len(untranslated)} lines:")
+            for line in untranslated:
+                logging.info(f"Untranslated > {line.number}. {line.text}")
+
+        subtitles.originals = originals
+        subtitles.translated = translations
+
+    def _prepare_batch(self, batch: SubtitleBatch, line_numbers: list[int], context: dict) -> bool:
+        """
+        Build the translation prompt for a batch, returning True if a request should be sent
+        """
+        if self.aborted:
+            return False
+
+        if self.resume and batch.all_translated:
+            logging.info(f"Scene {batch.scene} batch {batch.number} already translated {batch.size} lines...")
+            return False
+
+        if self.reparse and batch.translation:
+            logging.info(f"Reparsing scene {batch.scene} batch {batch.number} with {len(batch.originals)} lines...")
+            self.ProcessBatchTranslation(batch, batch.translation, line_numbers)
+            return False
+
+        originals, context = self.PreprocessBatch(batch, context)
+
+        logging.debug(f"Translating scene {batch.scene} batch {batch.number} with {len(originals)} lines...")
+
+        # Build summaries context
+        context["batch"] = f"Scene {batch.scene} batch {batch.number}"
+        if batch.summary:
+            context["summary"] = batch.summary
+
+        instructions = self.instructions.instructions
+        batch.prompt = self.client.BuildTranslationPrompt(self.user_prompt, instructions, originals, context)
+
+        return not self.preview
+
+    def _prepare_scene_group(
+        self, scenes: list[SubtitleScene], batches: list[SubtitleBatch], context: dict
+    ) -> TranslationPrompt | None:
+        """
+        Build a translation prompt for the batches of several scenes, with a marker where each scene begins
+        """
+        if self.aborted:
+            return None
+
+        lines = []
+        scene_markers = {}
+        for scene, batch in zip(scenes, batches, strict=True):
+            originals, context = self.PreprocessBatch(batch, context)
+            if originals:
+                scene_markers[originals[0].number] = scene.number
+                lines.extend(originals)
+
+        if not lines:
+            return None
+
+        logging.debug(f"Translating scenes {scenes[0].number} to {scenes[-1].number} with {len(lines)} lines...")
+
+        context["batch"] = f"Scenes {scenes[0].number} to {scenes[-1].number}"
+        context["scene_markers"] = scene_markers
+
+        instructions = self.instructions.instructions
+        prompt = self.client.BuildTranslationPrompt(self.user_prompt, instructions, lines, context)
+        del context["scene_markers"]
+
+        for batch in batches:
+            batch.prompt = prompt
+
+        return prompt
+
+    def _request_scene_group_translation(self, scenes: list[SubtitleScene], prompt: TranslationPrompt) -> Translation | None:
+        """
+        Request the translation of a group of scenes, returning None if their batches should be translated separately
+        """
+        if not prompt or self.aborted:
+            return None
+
+        try:
+            translation: Translation = self._request_translation(prompt)
+
+        except (TranslationAbortedError, TranslationImpossibleError):
+            raise
+
+        except TranslationError as e:
+            logging.warning(f"Error translating scenes {scenes[0].number} to {scenes[-1].number}: {str(e)}")
+            return None
+
+        if translation and (not translation.has_translation or translation.incomplete):
+            return None
+
+        return translation
+
+    def _process_batch_response(self, batch: SubtitleBatch, translation: Translation, line_numbers: list[int], context: dict):
+        """
+        Apply the provider's response to a batch, retrying if necessary, and update the context
+        """
+        if (translation and translation.incomplete) and not self.aborted:
+            translation = self._complete_truncated_translation(batch, translation, line_numbers, context)
+
+        if self.aborted:
+            return
+
+        if not translation:
+            raise TranslationError(f"Unable to translate scene {batch.scene} batch {batch.number}")
+
+        # Process the response
+        self.ProcessBatchTranslation(batch, translation, line_numbers)
+
+        # Consider retrying if there were errors
+        if batch.errors and self.retry_on_error:
+            logging.warning(f"Scene {batch.scene} batch {batch.number} failed validation, requesting retranslation")
+            self.RequestRetranslation(batch, line_numbers=line_numbers, context=context)
+
+        # Update the context, unless it's a retranslation pass
+        if not self.retranslate and not self.aborted:
+            self._update_context(batch, translation, context)
+
+    def _update_context(self, batch: SubtitleBatch, translation: Translation, context: dict):
+        """
+        Carry the summaries from a translation forward in the context
+        """
+        context["summary"] = self._get_best_summary([translation.summary, batch.summary])
+        context["scene"] = self._get_best_summary([translation.scene, context.get("scene")])
+        context["synopsis"] = translation.synopsis or context.get("synopsis", "")
+        # context['names'] = translation.names or context.get('names', []) or options.get('names')
+        batch.UpdateContext(context)
+
+    def _complete_truncated_translation(
+        self, batch: SubtitleBatch, translation: Translation, line_numbers: list[int], context: dict
+    ) -> Translation:
+        """
+        Keep the complete lines of a response that hit the token limit or was interrupted, and request a continuation for
+        the remaining lines.
+
+        The remaining lines are split at the largest gaps into chunks no bigger than the response managed to complete.
+        """
+        text = self._trim_incomplete_line(translation.text)
+        translated_keys = self._get_translated_keys(text)
+
+        originals = [line for line in batch.originals if line.text and line.text.strip()]
+        if line_numbers:
+            originals = [line for line in originals if line.number in line_numbers]
+
+        remaining = [line for line in originals if line.key not in translated_keys]
+        if not remaining:
+            return translation
+
+        reason = "Response was interrupted" if translation.interrupted else "Hit API token limit"
+        logging.warning(
+            f"{reason}, requesting the remaining {len(remaining)} lines of scene {batch.scene} batch {batch.number}..."
+        )
+
+        texts = [text] if text else []
+        metadata = {key: translation.content.get(key) for key in ["summary", "scene", "synopsis", "names"]}
+        finish_reason = "stop"
+
+        max_chunk_size = len(translated_keys) or max(len(remaining) // 2, 1)
+        pending = [remaining]
+
+        while pending and not self.aborted:
+            lines = pending.pop(0)
+
+            if len(lines) > max_chunk_size:
+                split_index = FindBestSplitIndex(lines) or len(lines) // 2
+                pending[0:0] = [lines[:split_index], lines[split_index:]]
+                continue
+
+            instructions = self.instructions.instructions
+            prompt = self.client.BuildTranslationPrompt(self.user_prompt, instructions, lines, context)
+            continuation: Translation = self._request_translation(prompt)
+
+            if not continuation or not continuation.has_translation:
+                finish_reason = "length"
+                break
+
+            continuation_text = continuation.text
+
+            if continuation.incomplete:
+                continuation_text = self._trim_incomplete_line(continuation_text)
+                completed_keys = self._get_translated_keys(continuation_text)
+                unfinished = [line for line in lines if line.key not in completed_keys]
+                completed_count = len(lines) - len(unfinished)
+
+                if completed_count:
+                    max_chunk_size = completed_count
+                    pending.insert(0, unfinished)
+                elif len(lines) > 1:
+                    max_chunk_size = max(len(lines) // 2, 1)
+                    pending.insert(0, unfinished)
+                else:
+                    logging.warning(f"Unable to translate line {lines[0].number} within the token limit")
+                    finish_reason = "length"
+
+            if continuation_text:
+                texts.append(continuation_text)
+
+            for key, value in metadata.items():
+                metadata[key] = value or continuation.content.get(key)
+
+        content = {**translation.content, "text": "\n\n".join(texts), "finish_reason": finish_reason}
+        completed = Translation(content)
+        completed.content.update({key: value for key, value in metadata.items() if value})
+        return completed
+
+    def _trim_incomplete_line(self, text: str) -> str:
+        """
+        Remove the last line of a truncated response, since it may have been cut off part way through
+        """
+        boundaries = list(line_boundary_pattern.finditer(text or ""))
+        return text[: boundaries[-1].start()].strip() if boundaries else ""
+
+    def _get_translated_keys(self, text: str) -> set:
+        """
+        Find which lines are translated in the text of a response
+        """
+        if not text:
+            return set()
+
+        parser: TranslationParser = self.client.GetParser(self.task_type)
+        parser.ProcessTranslation(Translation({"text": text}))
+        return set(parser.translations.keys())
+
+    def _request_translation(self, prompt: TranslationPrompt, streaming_callback: Callable[[str], None] = None) -> Translation:
+        """
+        Send a prompt to the client, waiting for a free slot if the number of concurrent requests is adaptive
+        """
+        if not self.concurrency:
+            return self.client.RequestTranslation(prompt, streaming_callback=streaming_callback)
+
+        if not self.concurrency.Acquire():
+            return None
+
+        start_time = time.monotonic()
+        translation = None
+        try:
+            translation = self.client.RequestTranslation(prompt, streaming_callback=streaming_callback)
+            return translation
+
+        finally:
+            self.concurrency.Release(time.monotonic() - start_time, success=translation is not None)
+
+    async def _request_translation_async(self, prompt: TranslationPrompt) -> Translation:
+        """
+        Send a prompt to the client without blocking the event loop, waiting for a free slot if concurrency is adaptive
+        """
+        if not self.concurrency:
+            return await self.client.RequestTranslationAsync(prompt)
+
+        if not await asyncio.to_thread(self.concurrency.Acquire):
+            return None
+
+        start_time = time.monotonic()
+        translation = None
+        try:
+            translation = await self.client.RequestTranslationAsync(prompt)
+            return translation
+
+        finally:
+            self.concurrency.Release(time.monotonic() - start_time, success=translation is not None)
+
+    def _get_streaming_callback(self, batch: SubtitleBatch, line_numbers: list[int] = None) -> Callable[[str], None]:
+        """
+        Create a callback that applies translated lines to the batch as soon as they are streamed, if streaming is enabled
+        """
+        if not self.stream_responses or not self.client.supports_streaming:
+            return None
+
+        parser: TranslationParser = self.client.GetParser(self.task_type)
+        originals = {line.key: line for line in batch.originals if not line_numbers or line.number in line_numbers}
+
+        def on_text_streamed(text: str):
+            lines = [line for line in parser.ProcessStreamedText(text) if line.key in originals]
+            if not lines:
+                return
+
+            for line in lines:
+                original = originals[line.key]
+                line.start = original.start
+                line.end = original.end
+
+            batch.translated = MergeTranslations(batch.translated or [], lines)
+
+            # Notify observers that lines have been translated
+            self.events.lines_translated(batch, lines)
+
+        return on_text_streamed
+
+    def _dispatch_batches(self, subtitles: SubtitleFile, submit: Callable[[SubtitleBatch], object]) -> list[tuple]:
+        """
+        Build the prompt for each batch in order and submit it for translation, returning the pending requests
+        """
+        pending = []
+        for scene in subtitles.scenes:
+            if self.aborted:
+                break
+
+            if self.max_lines and self.lines_processed >= self.max_lines:
+                break
+
+            if self.resume and scene.all_translated:
+                logging.info(f"Scene {scene.number} already translated {scene.linecount} lines...")
+                continue
+
+            batches = [batch for batch in scene.batches if not batch.translated] if self.resume else scene.batches
+
+            for batch in batches:
+                if self.max_lines and self.lines_processed >= self.max_lines:
+                    break
+
+                context = subtitles.GetBatchContext(scene.number, batch.number, self.max_history)
+
+                request = None
+                if self._prepare_batch(batch, None, context):
+                    request = submit(batch)
+
+                pending.append((scene, batch, context, request))
+
+        return pending
+
+    def _apply_concurrent_results(self, pending: list[tuple[SubtitleScene, SubtitleBatch, dict, Future | None]]):
+        """
+        Wait for each dispatched batch in order and apply the result as if it had been translated sequentially
+        """
+        for index, (_, batch, context, future) in enumerate(pending):
+            if self.aborted:
+                return
+
+            try:
+                if future is not None:
+                    translation: Translation = future.result()
+                    self._process_batch_response(batch, translation, None, context)
+
+            except TranslationImpossibleError:
+                raise
+
+            except TranslationError as e:
+                logging.warning(f"Error translating scene {batch.scene} batch {batch.number}: {str(e)}")
+                batch.errors.append(e)
+                batch.MarkDirty()
+
+            if not self._batch_completed(pending, index):
+                return
+
+    async def _apply_async_results(self, pending: list[tuple[SubtitleScene, SubtitleBatch, dict, asyncio.Task | None]]):
+        """
+        Await each dispatched batch in order and apply the result as if it had been translated sequentially
+        """
+        for index, (_, batch, context, task) in enumerate(pending):
+            if self.aborted:
+                return
+
+            try:
+                if task is not None:
+                    translation: Translation = await task
+                    # Processing the response may request a retranslation, so keep it off the event loop
+                    await asyncio.to_thread(self._process_batch_response, batch, translation, None, context)
+
+            except TranslationImpossibleError:
+                raise
+
+            except TranslationError as e:
+                logging.warning(f"Error translating scene {batch.scene} batch {batch.number}: {str(e)}")
+                batch.errors.append(e)
+                batch.MarkDirty()
+
+            if not self._batch_completed(pending, index):
+                return
+
+    def _batch_completed(self, pending: list[tuple], index: int) -> bool:
+        """
+        Notify observers that a dispatched batch has been translated, returns False if translation should stop
+        """
+        scene, batch, context, _ = pending[index]
+
+        if self.aborted:
+            return False
+
+        # Notify observers the batch was translated
+        self.events.batch_translated(batch)
+
+        if batch.errors:
+            logging.warning(f"Errors encountered translating scene {batch.scene} batch {batch.number}")
+            scene.errors.extend(batch.errors)
+            self.errors.extend(batch.errors)
+            if self.stop_on_error:
+                logging.error(f"Failed to translate scene {scene.number}... stopping translation")
+                return False
+
+        last_in_scene = index + 1 == len(pending) or pending[index + 1][0] is not scene
+        if last_in_scene:
+            # Update the scene summary based on the best available information (we hope)
+            scene.summary = self._get_best_summary([scene.summary, context.get("scene"), context.get("summary")])
+
+            # Notify observers the scene was translated
+            self.events.scene_translated(scene)
+
+        return True
+
+    def _translate_scene_task(self, subtitles: SubtitleFile, scene: SubtitleScene):
+        """
+        Translate a scene on a worker thread, unless translation has been stopped
+        """
+        if self.aborted or (self.errors and self.stop_on_error):
+            return
+
+        if self.max_lines and self.lines_processed >= self.max_lines:
+            return
+
+        if self.resume and scene.all_translated:
+            logging.info(f"Scene {scene.number} already translated {scene.linecount} lines...")
+            return
+
+        logging.debug(f"Translating scene {scene.number} of {subtitles.scenecount}")
+        batch_numbers = [batch.number for batch in scene.batches if not batch.translated] if self.resume else None
+
+        self.TranslateScene(subtitles, scene, batch_numbers=batch_numbers)
+
+        if scene.errors and self.stop_on_error:
+            logging.error(f"Failed to translate scene {scene.number}... stopping translation")
+
+    def _get_summary_client(self) -> TranslationClient:
+        """
+        Get a client for the summary pass, using the summary model if one is specified
+        """
+        if not self.summary_model:
+            return self.client
+
+        if not self.summary_client:
+            try:
+                self.summary_client = self.translation_provider.GetTranslationClient(
+                    {**self.settings, "model": self.summary_model}
+                )
+
+                if self.concurrency:
+                    self.summary_client.events.rate_limited += self.concurrency.OnRateLimited
+
+            except Exception as e:
+                raise ProviderError(f"Unable to create summary client: {str(e)}") from e
+
+        return self.summary_client
+
+    def _request_scene_summary(self, client: TranslationClient, subtitles: SubtitleFile, scene: SubtitleScene) -> str:
+        """
+        Ask the client for a short synopsis of a scene
+        """
+        if self.aborted:
+            return None
+
+        lines = [line for line in scene.originals or [] if line.text and line.text.strip()]
+        if not lines:
+            return None
+
+        context = {key: subtitles.settings.get(key) for key in ["description", "names"] if subtitles.settings.get(key)}
+        movie_name = f" of {subtitles.movie_name}" if subtitles.movie_name else ""
+        target_language = self.settings.get("target_language")
+        target_language = f" in {target_language}" if target_language else ""
+        user_prompt = f"Summarise scene {scene.number}{movie_name}{target_language}"
+
+        prompt = client.BuildSummaryPrompt(user_prompt, default_summary_instructions, lines, context)
+
+        translation: Translation = client.RequestTranslation(prompt)
+
+        if not translation:
+            return None
+
+        return self._get_best_summary([translation.summary, translation.scene, translation.text])
+
     def _get_best_summary(self, candidates: list[str]):
         """
         Generate a summary of the translated subtitles
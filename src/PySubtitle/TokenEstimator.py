@@ -0,0 +1,81 @@
+import logging
+import math
+
+from PySubtitle.SubtitleError import SubtitleError
+
+
+try:
+    import tiktoken
+
+except ImportError as e:
+    logging.debug(f"Failed to import tiktoken: {e}")
+    tiktoken = None
+
+
+def IsTiktokenAvailable() -> bool:
+    """
+    Check whether tiktoken is installed, for more accurate token estimates
+    """
+    return tiktoken is not None
+
+
+class TokenEstimator:
+    """
+    Estimates the number of tokens in a piece of text without calling the provider.
+
+    Latin text averages about four characters per token, while most other scripts use a token or more per character,
+    so characters outside the ASCII range are counted as a token each.
+    """
+
+    name = "characters"
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+
+    def EstimateTokens(self, text: str) -> int:
+        if not text:
+            return 0
+
+        wide_chars = sum(1 for char in text if ord(char) > 127)
+        return wide_chars + math.ceil((len(text) - wide_chars) / self.chars_per_token)
+
+
+class TiktokenEstimator(TokenEstimator):
+    """
+    Counts tokens with a tiktoken encoding, which is exact for OpenAI models and a close estimate for most others
+    """
+
+    name = "tiktoken"
+
+    def __init__(self, model: str = None, encoding_name: str = "cl100k_base"):
+        super().__init__()
+        if tiktoken is None:
+            raise SubtitleError("tiktoken is not installed")
+
+        try:
+            self.encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(encoding_name)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def EstimateTokens(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=())) if text else 0
+
+
+def CreateTokenEstimator(name: str = None, model: str = None) -> TokenEstimator:
+    """
+    Create a token estimator by name ("tiktoken", "characters" or "auto" to use tiktoken if it is available)
+    """
+    name = (name or "auto").lower()
+    if name not in ("auto", TokenEstimator.name, TiktokenEstimator.name):
+        raise SubtitleError(f"Unknown token estimator: {name}")
+
+    if name == TiktokenEstimator.name or (name == "auto" and IsTiktokenAvailable()):
+        try:
+            return TiktokenEstimator(model)
+
+        except Exception as e:
+            if name == TiktokenEstimator.name:
+                raise SubtitleError(f"Unable to create tiktoken estimator: {e}") from e
+            logging.warning(f"Unable to create tiktoken estimator, estimating tokens from characters: {e}")
+
+    return TokenEstimator()
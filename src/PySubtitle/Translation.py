@@ -74,6 +74,17 @@ class Translation:
     def reached_token_limit(self):
         return self.finish_reason == "length"
 
+    @property
+    def interrupted(self):
+        return self.finish_reason == "interrupted"
+
+    @property
+    def incomplete(self):
+        """
+        The response was cut off before the provider finished, by the token limit or a broken stream
+        """
+        return self.reached_token_limit or self.interrupted
+
     @property
     def quota_reached(self):
         return self.finish_reason == "quota_reached"
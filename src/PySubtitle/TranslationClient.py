@@ -1,14 +1,23 @@
+import asyncio
+import inspect
 import logging
+import os
 import time
+from collections.abc import Callable
 
+from PySubtitle.Helpers.Resources import config_dir
 from PySubtitle.Instructions import DEFAULT_TASK_TYPE
+from PySubtitle.RateLimiter import GetRateLimiter, RateLimiter
+from PySubtitle.ResponseCache import GetResponseCache, ResponseCache
 from PySubtitle.SubtitleError import TranslationError
 from PySubtitle.Translation import Translation
+from PySubtitle.TranslationEvents import SimpleEvents
 from PySubtitle.TranslationParser import TranslationParser
-from PySubtitle.TranslationPrompt import TranslationPrompt, default_prompt_template
+from PySubtitle.TranslationPrompt import TranslationPrompt, default_prompt_template, default_summary_line_template
 
 
 linesep = "\n"
+default_cache_dir = os.path.join(config_dir, "cache")
 
 
 class TranslationClient:
@@ -21,6 +30,10 @@ class TranslationClient:
         self.instructions = settings.get("instructions")
         self.retry_instructions = settings.get("retry_instructions")
         self.aborted = False
+        self.events = SimpleEvents()
+        self._async_client = None
+        self._async_client_loop = None
+        self._close_task = None
 
         if not self.instructions:
             raise TranslationError("No instructions provided for the translator")
@@ -41,6 +54,10 @@ class TranslationClient:
     def supports_system_messages_for_retry(self):
         return self.settings.get("supports_system_messages_for_retry", self.supports_system_messages)
 
+    @property
+    def supports_streaming(self):
+        return False
+
     @property
     def system_role(self):
         return self.settings.get("system_role", "system")
@@ -53,6 +70,26 @@ class TranslationClient:
     def rate_limit(self):
         return self.settings.get("rate_limit")
 
+    @property
+    def token_rate_limit(self):
+        return self.settings.get("token_rate_limit")
+
+    @property
+    def rate_limit_file(self):
+        return self.settings.get("rate_limit_file")
+
+    @property
+    def cache_responses(self):
+        return self.settings.get("cache_responses", False)
+
+    @property
+    def bypass_cache(self):
+        return self.settings.get("bypass_cache", False)
+
+    @property
+    def cache_dir(self):
+        return self.settings.get("cache_dir") or default_cache_dir
+
     @property
     def temperature(self):
         return self.settings.get("temperature", 0.0)
@@ -69,40 +106,96 @@ class TranslationClient:
         """
         Generate a translation prompt for the context
         """
-        prompt = TranslationPrompt(user_prompt, self.supports_conversation)
-        prompt.supports_system_prompt = self.supports_system_prompt
-        prompt.supports_system_messages = self.supports_conversation and self.supports_system_messages
-        prompt.supports_system_messages_for_retry = self.supports_system_messages_for_retry
-        prompt.system_role = self.system_role
-        prompt.prompt_template = self.prompt_template
+        prompt = self._create_prompt(user_prompt)
         prompt.GenerateMessages(instructions, lines, context)
         return prompt
 
-    def RequestTranslation(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+    def BuildSummaryPrompt(self, user_prompt: str, instructions: str, lines: list, context: dict):
+        """
+        Generate a prompt requesting a synopsis of the lines rather than a translation
         """
-        Generate the messages to request a translation
+        prompt = self._create_prompt(user_prompt)
+        prompt.line_template = default_summary_line_template
+        prompt.GenerateMessages(instructions, lines, context)
+        return prompt
+
+    def RequestTranslation(
+        self, prompt: TranslationPrompt, temperature: float = None, streaming_callback: Callable[[str], None] = None
+    ) -> Translation:
         """
-        start_time = time.monotonic()
+        Generate the messages to request a translation.
+
+        If a streaming callback is provided and the client supports streaming it is called with each fragment of the
+        response as it arrives.
+        """
+        cache, cache_key, cached_translation = self._get_cached_translation(prompt, temperature)
+        if cached_translation:
+            return cached_translation
+
+        # If there is a rate limit wait for our turn to send the request
+        limiter = self._get_rate_limiter()
+        estimated_tokens = self._estimate_prompt_tokens(prompt) if limiter else 0
+        if limiter:
+            sleep_time = limiter.Reserve(estimated_tokens)
+            if sleep_time:
+                logging.debug(f"Sleeping for {sleep_time:.2f} seconds to respect rate limit")
+                time.sleep(sleep_time)
+
+            if self.aborted:
+                return None
 
         # Perform the translation
-        translation: Translation = self._request_translation(prompt, temperature)
+        if streaming_callback and self.supports_streaming:
+            translation: Translation = self._request_streamed_translation(prompt, temperature, streaming_callback)
+        else:
+            translation: Translation = self._request_translation(prompt, temperature)
+
+        if limiter and translation:
+            limiter.Reconcile(estimated_tokens, self._get_token_usage(translation))
 
         if self.aborted or translation is None:
             return None
 
+        if cache:
+            self._cache_translation(cache, cache_key, translation)
+
         if translation.text:
             logging.debug(f"Response:\n{translation.text}")
 
-        # If a rate limit is replied ensure a minimum duration for each request
-        rate_limit = self.rate_limit
-        if rate_limit and rate_limit > 0.0:
-            minimum_duration = 60.0 / rate_limit
+        return translation
+
+    async def RequestTranslationAsync(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+        """
+        Request a translation without blocking the event loop
+        """
+        cache, cache_key, cached_translation = self._get_cached_translation(prompt, temperature)
+        if cached_translation:
+            return cached_translation
 
-            elapsed_time = time.monotonic() - start_time
-            if elapsed_time < minimum_duration:
-                sleep_time = minimum_duration - elapsed_time
+        limiter = self._get_rate_limiter()
+        estimated_tokens = self._estimate_prompt_tokens(prompt) if limiter else 0
+        if limiter:
+            sleep_time = limiter.Reserve(estimated_tokens)
+            if sleep_time:
                 logging.debug(f"Sleeping for {sleep_time:.2f} seconds to respect rate limit")
-                time.sleep(sleep_time)
+                await asyncio.sleep(sleep_time)
+
+            if self.aborted:
+                return None
+
+        translation: Translation = await self._request_translation_async(prompt, temperature)
+
+        if limiter and translation:
+            limiter.Reconcile(estimated_tokens, self._get_token_usage(translation))
+
+        if self.aborted or translation is None:
+            return None
+
+        if cache:
+            self._cache_translation(cache, cache_key, translation)
+
+        if translation.text:
+            logging.debug(f"Response:\n{translation.text}")
 
         return translation
 
@@ -117,12 +210,186 @@ class TranslationClient:
         self._abort()
         pass
 
+    def _create_prompt(self, user_prompt: str) -> TranslationPrompt:
+        """
+        Create a prompt configured for the capabilities of the client
+        """
+        prompt = TranslationPrompt(user_prompt, self.supports_conversation)
+        prompt.supports_system_prompt = self.supports_system_prompt
+        prompt.supports_system_messages = self.supports_conversation and self.supports_system_messages
+        prompt.supports_system_messages_for_retry = self.supports_system_messages_for_retry
+        prompt.system_role = self.system_role
+        prompt.prompt_template = self.prompt_template
+        return prompt
+
     def _request_translation(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
         """
         Make a request to the API to provide a translation
         """
         raise NotImplementedError
 
+    def _request_streamed_translation(
+        self, prompt: TranslationPrompt, temperature: float, streaming_callback: Callable[[str], None]
+    ) -> Translation:
+        """
+        Make a streaming request to the API, passing each fragment of text to the callback as it arrives
+        """
+        raise NotImplementedError
+
+    async def _request_translation_async(self, prompt: TranslationPrompt, temperature: float = None) -> Translation:
+        """
+        Make an asynchronous request to the API to provide a translation.
+
+        Clients without a native async implementation run the synchronous request on a worker thread.
+        """
+        return await asyncio.to_thread(self._request_translation, prompt, temperature)
+
+    def _get_async_client(self):
+        """
+        Get the SDK's async client, creating it if necessary. Async clients are bound to the event loop they were created on.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is not None and self._async_client_loop is not loop:
+            # Close the client from the previous event loop rather than leaking its connection pool
+            self._close_task = loop.create_task(_close_async_client(self._async_client))
+            self._async_client = None
+
+        if self._async_client is None:
+            self._async_client = self._create_async_client()
+            self._async_client_loop = loop
+
+        return self._async_client
+
+    async def CloseAsyncClient(self):
+        """
+        Close the SDK's async client, if one was created. It must be called from the event loop that is using it.
+        """
+        client = self._async_client
+        self._async_client = None
+        self._async_client_loop = None
+
+        if client is not None:
+            await _close_async_client(client)
+
+        close_task, self._close_task = self._close_task, None
+        if close_task and not close_task.done() and close_task.get_loop() is asyncio.get_running_loop():
+            await close_task
+
+    def _create_async_client(self):
+        """
+        Create an async client for the provider's SDK
+        """
+        raise NotImplementedError
+
+    def _schedule_async_client_close(self):
+        """
+        Close the async client on the event loop it belongs to, which may be running on another thread
+        """
+        client, loop = self._async_client, self._async_client_loop
+        self._async_client = None
+        self._async_client_loop = None
+
+        if client is None or loop is None or loop.is_closed():
+            return
+
+        def close():
+            self._close_task = loop.create_task(_close_async_client(client))
+
+        try:
+            loop.call_soon_threadsafe(close)
+        except RuntimeError as e:
+            logging.debug(f"Unable to close async client: {e}")
+
+    def _get_cached_translation(self, prompt: TranslationPrompt, temperature: float = None):
+        """
+        Look up the response to an identical request in the cache, if caching is enabled.
+        Returns the cache and key to store the response under as well as any cached translation.
+        """
+        if not self.cache_responses:
+            return None, None, None
+
+        cache = GetResponseCache(self.cache_dir, self.settings.get("cache_max_size"), self.settings.get("cache_ttl"))
+        cache_key = ResponseCache.GetKey(
+            self.settings.get("provider"),
+            self.settings.get("model"),
+            temperature or self.temperature,
+            prompt.messages,
+            prompt.system_prompt,
+        )
+
+        if self.bypass_cache:
+            return cache, cache_key, None
+
+        response = cache.Get(cache_key)
+        if not response:
+            return cache, cache_key, None
+
+        logging.debug("Using cached response")
+        translation = Translation(response)
+        if translation.text:
+            logging.debug(f"Response:\n{translation.text}")
+
+        return cache, cache_key, translation
+
+    def _cache_translation(self, cache: ResponseCache, cache_key: str, translation: Translation):
+        """
+        Store a successful response in the cache
+        """
+        if not translation.full_text or translation.incomplete or translation.quota_reached:
+            return
+
+        cache.Put(cache_key, dict(translation.content))
+
+    def _get_rate_limiter(self) -> RateLimiter:
+        """
+        Get the limiter shared by all clients for this provider and model, if there is a rate limit
+        """
+        if not self.rate_limit and not self.token_rate_limit:
+            return None
+
+        key = f"{self.settings.get('provider')}:{self.settings.get('model')}"
+        return GetRateLimiter(key, self.rate_limit, self.token_rate_limit, self.rate_limit_file)
+
+    def _estimate_prompt_tokens(self, prompt: TranslationPrompt) -> int:
+        """
+        Rough estimate of the number of tokens in a prompt, to reserve from the token budget before it is sent
+        """
+        characters = sum(len(message.get("content") or "") for message in prompt.messages)
+        return characters // 4
+
+    def _get_token_usage(self, translation: Translation) -> int:
+        """
+        Total number of tokens used by a request, as reported by the provider
+        """
+        total_tokens = translation.content.get("total_tokens")
+        if total_tokens:
+            return total_tokens
+
+        return (translation.content.get("prompt_tokens") or 0) + (translation.content.get("output_tokens") or 0)
+
+    def _report_rate_limit(self, retry_after: float = None):
+        """
+        Let observers know that the provider rejected a request for exceeding a rate limit
+        """
+        self.events.rate_limited(retry_after)
+
     def _abort(self):
         # Try to terminate ongoing requests
-        pass
+        self._schedule_async_client_close()
+
+
+async def _close_async_client(client):
+    """
+    Close an SDK or httpx async client, which may name its close method either aclose or close
+    """
+    close = getattr(client, "aclose", None) or getattr(client, "close", None)
+    if not close:
+        return
+
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+
+    except Exception as e:
+        logging.debug(f"Error closing async client: {e}")
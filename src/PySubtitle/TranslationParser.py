@@ -20,6 +20,12 @@ default_pattern = (
     r"(?=\n#\d|\Z)"
 )
 
+line_boundary_pattern = regex.compile(r"\n#\d")
+
+# Scene markers that separate the lines of small scenes translated together, which may be repeated in the response
+scene_marker_pattern = regex.compile(r"^[ \t]*\[Scene \d+\][ \t]*(?:\n|\Z)", regex.MULTILINE)
+scene_split_pattern = regex.compile(r"^[ \t]*\[Scene (\d+)\][ \t]*$", regex.MULTILINE)
+
 fallback_patterns = [
     r"#(?P<number>\d+)(?:[\s\r\n]+Original>[\s\r\n]+(?P<original>[\s\S]*?))?[\s\r\n]*(?:Translation>(?:[\s\r\n]+(?P<body>[\s\S]*?))?(?:(?=\n{2,})|\Z))",
     r"#(?P<number>\d+)(?:[\s\r\n]+Original[>:][\s\r\n]+(?P<original>[\s\S]*?))?[\s\r\n]*(?:Translation[>:](?:[\s\r\n]+(?P<body>[\s\S]*?))?(?:(?=\n{2,})|\Z))",
@@ -44,6 +50,8 @@ class TranslationParser:
         self.metatags = ["summary", "scene"]
         self.task_type = task_type
         self.regex_patterns = self.GetRegularExpressionPatterns(task_type)
+        self.streamed_text = ""
+        self.streamed_offset = 0
 
     def GetRegularExpressionPatterns(self, task_type: str = DEFAULT_TASK_TYPE):
         """
@@ -67,8 +75,10 @@ class TranslationParser:
         if not self.text:
             raise TranslationError("No translated text provided", translation=translation)
 
+        text = scene_marker_pattern.sub("", self.text)
+
         for template in self.regex_patterns:
-            matches = self.FindMatches(f"{self.text}\n\n", template)
+            matches = self.FindMatches(f"{text}\n\n", template)
 
             if matches:
                 break
@@ -91,6 +101,52 @@ class TranslationParser:
 
         return self.translated
 
+    def SplitScenes(self, translation: Translation) -> dict[int, Translation]:
+        """
+        Divide the response to a request for several scenes at the scene markers, so that each scene gets its own
+        translation and summary. Returns an empty dictionary if the response does not contain any scene markers.
+        """
+        parts = scene_split_pattern.split(translation.full_text or "")
+        if len(parts) < 3:
+            return {}
+
+        # Any text before the first marker belongs to the first scene
+        parts[2] = f"{parts[0]}\n\n{parts[2]}" if parts[0].strip() else parts[2]
+
+        scenes = {}
+        for number, text in zip(parts[1::2], parts[2::2], strict=True):
+            scenes[int(number)] = Translation({**translation.content, "text": text.strip()})
+
+        return scenes
+
+    def ProcessStreamedText(self, text: str) -> list[SubtitleLine]:
+        """
+        Add a fragment of a streamed response, returning any translated lines that are now complete.
+
+        A line is complete once the next line has started, so the last line is only extracted by ProcessTranslation.
+        """
+        self.streamed_text += text
+
+        boundary = None
+        for match in line_boundary_pattern.finditer(self.streamed_text, pos=self.streamed_offset):
+            boundary = match.start()
+
+        if boundary is None:
+            return []
+
+        segment = self.streamed_text[self.streamed_offset : boundary]
+        self.streamed_offset = boundary + 1
+
+        matches = self.FindMatches(f"{segment}\n\n", self.regex_patterns[0])
+
+        lines = [SubtitleLine.FromDictionary(match) for match in matches]
+        lines = [line for line in lines if line.key and line.key not in self.translations]
+
+        for line in lines:
+            self.translations[line.key] = line
+
+        return lines
+
     def FindMatches(self, text, template):
         """
         re.findall has some very unhelpful behaviour, so we use finditer instead.
@@ -4,7 +4,9 @@ from PySubtitle.SubtitleLine import SubtitleLine
 
 default_prompt_template = "<context>\n{context}\n</context>\n\n{prompt}\n\n<summary>Summary of the batch</summary>\n<scene>Summary of the scene</scene>\n"
 default_line_template = "#{number}\nOriginal>\n{text}\nTranslation>\n"
+default_summary_line_template = "#{number}\n{text}\n"
 default_tag_template = "<{tag}>{content}</{tag}>"
+default_scene_marker_template = "[Scene {number}]"
 default_context_tags = ["description", "names", "history", "scene", "summary", "batch"]
 
 
@@ -39,6 +41,7 @@ class TranslationPrompt:
         self.prompt_template = default_prompt_template
         self.line_template = default_line_template
         self.tag_template = default_tag_template
+        self.scene_marker_template = default_scene_marker_template
         self.context_tags = default_context_tags
 
         self.system_prompt = None
@@ -87,6 +90,16 @@ class TranslationPrompt:
 
         source_lines = [_get_line_prompt(line, self.line_template) for line in lines]
 
+        # Mark where each scene begins if lines from several scenes are translated together
+        scene_markers = context.get("scene_markers") if context else None
+        if scene_markers:
+            source_lines = [
+                f"{self.scene_marker_template.format(number=scene_markers[line.number])}\n\n{source}"
+                if line.number in scene_markers
+                else source
+                for line, source in zip(lines, source_lines, strict=True)
+            ]
+
         prompt = "\n\n".join(source_lines).strip()
 
         if self.user_prompt:
@@ -154,7 +167,7 @@ def _get_line_prompt(line: SubtitleLine, line_template: str = None):
     """
     Generate a prompt for a single subtitle line
     """
-    if not line._item:
+    if line.number is None and line.text is None:
         return None
 
     return line_template.format(number=line.number, text=line.text_normalized)
@@ -65,6 +65,12 @@ def CreateArgParser(description: str) -> ArgumentParser:
     parser.add_argument(
         "--batchthreshold", type=float, default=None, help="Number of seconds between lines to consider for batching"
     )
+    parser.add_argument(
+        "--coalescescenes",
+        type=int,
+        default=None,
+        help="Translate adjacent scenes with no more than this many lines together in a single request",
+    )
     parser.add_argument("--debug", action="store_true", help="Run with DEBUG log level")
     parser.add_argument("--description", type=str, default=None, help="A brief description of the film to give context")
     parser.add_argument(
@@ -81,7 +87,31 @@ def CreateArgParser(description: str) -> ArgumentParser:
     parser.add_argument(
         "--maxbatchsize", type=int, default=None, help="Maximum number of lines before starting a new batch is compulsory"
     )
+    parser.add_argument(
+        "--maxbatchtokens",
+        type=int,
+        default=None,
+        help="Size batches by estimated tokens instead of line count, up to this many prompt and response tokens",
+    )
     parser.add_argument("--maxlines", type=int, default=None, help="Maximum number of lines(subtitles) to process in this run")
+    parser.add_argument(
+        "--maxthreads",
+        type=int,
+        default=None,
+        help="Maximum number of batches to translate in parallel, if the provider allows it",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=None,
+        help="Stream responses from the provider and apply translated lines as they arrive, if the provider supports it",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=None,
+        help="Adjust the number of parallel requests to stay within the provider's rate limits",
+    )
     parser.add_argument(
         "--maxsummaries", type=int, default=None, help="Maximum number of context summaries to provide with each batch"
     )
@@ -96,10 +126,35 @@ def CreateArgParser(description: str) -> ArgumentParser:
     parser.add_argument("--postprocess", action="store_true", default=None, help="Postprocess the subtitles after translation")
     parser.add_argument("--preprocess", action="store_true", default=None, help="Preprocess the subtitles before translation")
     parser.add_argument("--project", type=str, default=None, help="Read or Write project file to working directory")
+    parser.add_argument(
+        "--cache", action="store_true", default=None, help="Reuse cached responses for requests that have been sent before"
+    )
+    parser.add_argument(
+        "--bypasscache", action="store_true", default=None, help="Send every request to the provider and refresh the cache"
+    )
+    parser.add_argument(
+        "--fullretry",
+        action="store_true",
+        default=None,
+        help="Resend the whole batch when retrying a translation that failed validation, rather than just the failed lines",
+    )
     parser.add_argument("--ratelimit", type=int, default=None, help="Maximum number of batches per minute to process")
+    parser.add_argument(
+        "--tokenratelimit", type=int, default=None, help="Maximum number of tokens per minute to send and receive"
+    )
+    parser.add_argument(
+        "--ratelimitfile", type=str, default=None, help="File to share the rate limit budget with other processes"
+    )
     parser.add_argument(
         "--scenethreshold", type=float, default=None, help="Number of seconds between lines to consider a new scene"
     )
+    parser.add_argument(
+        "--summaryprepass",
+        action="store_true",
+        default=None,
+        help="Summarise every scene before translating, so that scenes can be translated in parallel",
+    )
+    parser.add_argument("--summarymodel", type=str, default=None, help="Model to use for the scene summary pass")
     parser.add_argument(
         "--substitution",
         action="append",
@@ -120,6 +175,7 @@ def CreateOptions(args: Namespace, provider: str, **kwargs) -> Options:
     """Create options with additional arguments"""
     options = {
         "api_key": args.apikey,
+        "coalesce_scene_size": args.coalescescenes,
         "description": args.description,
         "include_original": args.includeoriginal,
         "add_right_to_left_markers": args.addrtlmarkers,
@@ -127,17 +183,28 @@ def CreateOptions(args: Namespace, provider: str, **kwargs) -> Options:
         "instruction_file": args.instructionfile,
         "substitution_mode": "Partial Words" if args.matchpartialwords else "Auto",
         "max_batch_size": args.maxbatchsize,
+        "max_batch_tokens": args.maxbatchtokens,
         "max_context_summaries": args.maxsummaries,
         "max_lines": args.maxlines,
+        "max_threads": args.maxthreads,
+        "adaptive_concurrency": args.adaptive,
+        "stream_responses": args.stream,
         "min_batch_size": args.minbatchsize,
         "movie_name": args.moviename or os.path.splitext(os.path.basename(args.input))[0],
         "names": ParseNames(args.names or args.name),
         "postprocess_translation": args.postprocess,
         "preprocess_subtitles": args.preprocess,
         "project": args.project and args.project.lower(),
+        "cache_responses": args.cache,
+        "bypass_cache": args.bypasscache,
         "provider": provider,
+        "targeted_retry": False if args.fullretry else None,
         "rate_limit": args.ratelimit,
+        "token_rate_limit": args.tokenratelimit,
+        "rate_limit_file": args.ratelimitfile,
         "scene_threshold": args.scenethreshold,
+        "scene_summary_prepass": args.summaryprepass,
+        "summary_model": args.summarymodel,
         "substitutions": Substitutions.Parse(args.substitution),
         "target_language": args.target_language,
         "temperature": args.temperature,
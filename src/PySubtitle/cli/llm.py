@@ -31,6 +31,10 @@ def main():
         default=None,
         help="Request timeout in seconds for server calls (defaults to 300)",
     )
+    parser.add_argument(
+        "--maxconnections", type=int, default=None, help="Maximum number of pooled connections to the server (defaults to 10)"
+    )
+    parser.add_argument("--http2", action="store_true", default=None, help="Use HTTP/2 if the server supports it")
     args = parser.parse_args()
 
     InitLogger("llm-subtrans", args.debug)
@@ -45,6 +49,8 @@ def main():
             supports_conversation=args.chat,
             supports_system_messages=args.systemmessages,
             timeout=args.timeout,
+            max_connections=args.maxconnections,
+            use_http2=args.http2,
         )
 
         # Create a project for the translation
@@ -1,7 +1,12 @@
+from datetime import timedelta
+
+import srt
+
 from PySubtitle.Helpers.TestCases import PrepareSubtitles, SubtitleTestCase
 from PySubtitle.Helpers.Tests import log_info, log_input_expected_result, log_test_name
 from PySubtitle.SubtitleBatch import SubtitleBatch
 from PySubtitle.SubtitleBatcher import SubtitleBatcher
+from PySubtitle.SubtitleError import SubtitleError
 from PySubtitle.SubtitleFile import SubtitleFile
 from PySubtitle.SubtitleLine import SubtitleLine
 from PySubtitle.SubtitleProject import SubtitleProject
@@ -330,3 +335,129 @@ class ChineseDinnerTests(SubtitleTestCase):
         self.assertEqual(translated_line.srt_end, "00:15:36,790")
 
         self.assertEqual(translated_line, line.translated)
+
+    def test_IndexedLookups(self):
+        """
+        Test that scene, batch and line lookups remain correct after structural edits
+        """
+        log_test_name("Indexed lookup tests")
+        subtitles: SubtitleFile = PrepareSubtitles(chinese_dinner_data)
+        subtitles.AutoBatch(SubtitleBatcher({"min_batch_size": 5, "max_batch_size": 20, "scene_threshold": 30.0}))
+
+        def check_lookups(description: str):
+            with self.subTest(description):
+                for scene in subtitles.scenes:
+                    self.assertIs(subtitles.GetScene(scene.number), scene)
+                    for batch in scene.batches:
+                        self.assertIs(subtitles.GetBatch(scene.number, batch.number), batch)
+                        for line in batch.originals:
+                            self.assertIs(subtitles.GetBatchContainingLine(line.number), batch)
+
+                for line in subtitles.originals:
+                    self.assertIs(subtitles.GetOriginalLine(line.number), line)
+
+                log_input_expected_result(description, True, True)
+
+        check_lookups("Initial batches")
+
+        subtitles.MergeScenes([1, 2])
+        check_lookups("After merging scenes")
+
+        subtitles.SplitScene(1, 2)
+        check_lookups("After splitting a scene")
+
+        # Splitting a batch through the scene does not notify the subtitle file
+        scene: SubtitleScene = subtitles.GetScene(2)
+        scene.AutoSplitBatch(1)
+        check_lookups("After splitting a batch")
+
+        subtitles.MergeBatches(2, [1, 2])
+        check_lookups("After merging batches")
+
+        subtitles.Sanitise()
+        check_lookups("After sanitising")
+
+        self.assertIsNone(subtitles.GetOriginalLine(10000))
+        with self.assertRaises(SubtitleError):
+            subtitles.GetScene(subtitles.scenecount + 1)
+
+    def test_BatchContextHistory(self):
+        """
+        Test that the history of summaries in the batch context matches a full scan of the previous scenes and batches
+        """
+        log_test_name("Batch context history tests")
+        subtitles: SubtitleFile = PrepareSubtitles(chinese_dinner_data)
+        subtitles.AutoBatch(SubtitleBatcher({"min_batch_size": 3, "max_batch_size": 10, "scene_threshold": 30.0}))
+
+        # Include repeated and missing summaries, which are collapsed or skipped
+        for scene in subtitles.scenes:
+            scene.summary = f"Summary of scene {scene.number}" if scene.number != 2 else None
+            for batch in scene.batches:
+                batch.summary = scene.summary if batch.number == 1 else f"Summary of batch {batch.number // 2}"
+
+        def expected_history(scene_number: int, batch_number: int, max_lines: int):
+            history_lines = []
+            last_summary = ""
+            for scene in [scene for scene in subtitles.scenes if scene.number < scene_number and scene.summary]:
+                if scene.summary != last_summary:
+                    history_lines.append(f"scene {scene.number}: {scene.summary}")
+                    last_summary = scene.summary
+
+            batches = subtitles.GetScene(scene_number).batches
+            for batch in [batch for batch in batches if batch.number < batch_number and batch.summary]:
+                if batch.summary != last_summary:
+                    history_lines.append(f"scene {batch.scene} batch {batch.number}: {batch.summary}")
+                    last_summary = batch.summary
+
+            return history_lines[-max_lines:] if max_lines else history_lines
+
+        for max_lines in [None, 1, 2, 5]:
+            with self.subTest(max_lines=max_lines):
+                for scene in subtitles.scenes:
+                    for batch in scene.batches:
+                        context = subtitles.GetBatchContext(scene.number, batch.number, max_lines)
+                        expected = expected_history(scene.number, batch.number, max_lines)
+                        self.assertEqual(context.get("history", []), expected)
+
+                log_input_expected_result(f"History (max_lines={max_lines})", expected, context.get("history", []))
+
+    def test_SubtitleLineTiming(self):
+        """
+        Test the compact representation of subtitle lines against srt.Subtitle
+        """
+        log_test_name("Subtitle line timing tests")
+        subtitles = PrepareSubtitles(chinese_dinner_data)
+
+        for line in subtitles.originals:
+            item = line.item
+            self.assertIsInstance(item, srt.Subtitle)
+            self.assertEqual(line.line, item.to_srt(strict=False))
+            self.assertEqual(str(line), item.to_srt())
+            self.assertEqual(line.start_ms, item.start // timedelta(milliseconds=1))
+            self.assertEqual(line.end_ms, item.end // timedelta(milliseconds=1))
+            self.assertEqual(line.duration, item.end - item.start)
+            self.assertEqual(SubtitleLine(line.line), line)
+
+        line: SubtitleLine = subtitles.GetOriginalLine(36)
+        self.assertFalse(hasattr(line, "__dict__"))
+
+        # Times keep the full precision of a timedelta, and SRT timestamps are truncated to milliseconds
+        line.start = timedelta(seconds=935, microseconds=590999)
+        log_input_expected_result("Precise start", "00:15:35,590", line.srt_start)
+        self.assertEqual(line.start, timedelta(seconds=935, microseconds=590999))
+        self.assertEqual(line.start_ms, 935590)
+        self.assertEqual(line.srt_start, srt.timedelta_to_srt_timestamp(line.start))
+
+        line.duration = timedelta(seconds=2)
+        log_input_expected_result("End after setting duration", "00:15:37,590", line.srt_end)
+        self.assertEqual(line.end - line.start, timedelta(seconds=2))
+        self.assertEqual(line.duration_ms, 2000)
+
+        line.end_ms = 940000
+        self.assertEqual(line.end, timedelta(seconds=940))
+
+        invalid = SubtitleLine(None)
+        self.assertIsNone(invalid.item)
+        self.assertIsNone(invalid.start)
+        self.assertIsNone(invalid.line)
+        self.assertEqual(invalid.duration_ms, 0)
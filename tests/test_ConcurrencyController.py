@@ -0,0 +1,70 @@
+import unittest
+
+from PySubtitle.ConcurrencyController import ConcurrencyController
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+
+
+class TestConcurrencyController(unittest.TestCase):
+    def test_AdditiveIncrease(self):
+        log_test_name("Additive increase")
+
+        controller = ConcurrencyController(max_limit=8, initial_limit=2)
+
+        for _ in range(20):
+            self.assertTrue(controller.Acquire())
+            controller.Release(1.0)
+
+        log_input_expected_result("Limit after 20 requests", 6, controller.limit)
+        self.assertEqual(controller.limit, 6)
+
+        for _ in range(100):
+            self.assertTrue(controller.Acquire())
+            controller.Release(1.0)
+
+        log_input_expected_result("Limit is capped", 8, controller.limit)
+        self.assertEqual(controller.limit, 8)
+
+    def test_MultiplicativeDecrease(self):
+        log_test_name("Multiplicative decrease")
+
+        controller = ConcurrencyController(max_limit=8, initial_limit=8)
+
+        controller.OnRateLimited(retry_after=0.01)
+        log_input_expected_result("Limit after rate limit", 4, controller.limit)
+        self.assertEqual(controller.limit, 4)
+
+        # Further signals from requests that were already in flight are not counted again
+        controller.OnRateLimited(retry_after=0.01)
+        log_input_expected_result("Repeated signal", 4, controller.limit)
+        self.assertEqual(controller.limit, 4)
+        self.assertEqual(controller.rate_limit_count, 2)
+
+        self.assertTrue(controller.Acquire())
+        controller.Release(1.0)
+
+    def test_LatencyDecrease(self):
+        log_test_name("Latency decrease")
+
+        controller = ConcurrencyController(max_limit=8, initial_limit=8, window=10)
+
+        for _ in range(10):
+            controller.Acquire()
+            controller.Release(1.0)
+
+        log_input_expected_result("Healthy latency", 8, controller.limit)
+        self.assertEqual(controller.limit, 8)
+
+        controller.Acquire()
+        controller.Release(5.0)
+
+        log_input_expected_result("Rising p95 latency", 4, controller.limit)
+        self.assertEqual(controller.limit, 4)
+
+    def test_Stop(self):
+        log_test_name("Stop")
+
+        controller = ConcurrencyController(max_limit=1)
+        self.assertTrue(controller.Acquire())
+
+        controller.Stop()
+        self.assertFalse(controller.Acquire())
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import unittest
+from datetime import timedelta
+from unittest.mock import patch
+
+import httpx
+
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.Providers.Custom.CustomClient import CustomClient
+from PySubtitle.SubtitleError import TranslationImpossibleError
+from PySubtitle.SubtitleLine import SubtitleLine
+
+
+def _success_response() -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"text": "#1\nTranslation>\nHello", "finish_reason": "stop"}]})
+
+
+class CustomClientTests(unittest.TestCase):
+    settings = {
+        "instructions": "Translate these subtitles",
+        "server_address": "http://localhost:1234",
+        "endpoint": "/v1/completions",
+        "max_retries": 2,
+        "backoff_time": 0.5,
+    }
+
+    def _create_client(self, handler) -> tuple[CustomClient, list]:
+        """
+        Create a client that sends its requests to the handler, recording them
+        """
+        client = CustomClient(dict(self.settings))
+        requests = []
+
+        def handle_request(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return handler(len(requests))
+
+        client_options = client._get_client_options()
+        client._get_client_options = lambda: {**client_options, "transport": httpx.MockTransport(handle_request)}
+        return client, requests
+
+    def _create_prompt(self, client: CustomClient):
+        line = SubtitleLine.Construct(1, timedelta(seconds=1), timedelta(seconds=2), "你好")
+        return client.BuildTranslationPrompt("Translate to English", client.instructions, [line], {})
+
+    def test_RateLimitRetry(self):
+        log_test_name("Retry after a rate limit")
+
+        def handler(count: int) -> httpx.Response:
+            if count == 1:
+                return httpx.Response(429, text="Too many requests")
+            if count == 2:
+                return httpx.Response(503, headers={"Retry-After": "2"}, text="Service unavailable")
+            return _success_response()
+
+        for name in ["sync", "async"]:
+            with self.subTest(path=name):
+                client, requests = self._create_client(handler)
+                rate_limits = []
+                client.events.rate_limited += rate_limits.append
+
+                delays = []
+
+                async def async_sleep(delay):
+                    delays.append(delay)
+
+                prompt = self._create_prompt(client)
+                with patch("time.sleep", delays.append), patch("asyncio.sleep", async_sleep):
+                    if name == "sync":
+                        translation = client.RequestTranslation(prompt)
+                    else:
+                        translation = asyncio.run(client.RequestTranslationAsync(prompt))
+
+                log_input_expected_result(name, 3, len(requests))
+                self.assertEqual(len(requests), 3)
+                self.assertEqual(rate_limits, [None, 2.0])
+
+                # The server's suggested delay is used if it gives one, otherwise the usual backoff
+                self.assertEqual(delays, [0.5, 2.0])
+                self.assertEqual(translation.text, "#1\nTranslation>\nHello")
+
+    def test_RateLimitExhausted(self):
+        log_test_name("Give up after repeated rate limits")
+
+        client, requests = self._create_client(lambda count: httpx.Response(429, text="Too many requests"))
+
+        with patch("time.sleep"), self.assertRaises(TranslationImpossibleError):
+            client.RequestTranslation(self._create_prompt(client))
+
+        log_input_expected_result("Requests", 3, len(requests))
+        self.assertEqual(len(requests), 3)
+
+    def test_AbortAsyncRequest(self):
+        log_test_name("Abort during an async request")
+
+        started = threading.Event()
+        cancelled = []
+
+        async def handle_request(request: httpx.Request) -> httpx.Response:
+            started.set()
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(request)
+                raise
+            return _success_response()
+
+        client = CustomClient(dict(self.settings))
+        client_options = client._get_client_options()
+        client._get_client_options = lambda: {**client_options, "transport": httpx.MockTransport(handle_request)}
+
+        async def translate():
+            request = asyncio.create_task(client.RequestTranslationAsync(self._create_prompt(client)))
+            await asyncio.to_thread(started.wait, 5)
+            async_client = client._async_client
+
+            # Abort from another thread, as the translation would be stopped by the user
+            await asyncio.to_thread(client.AbortTranslation)
+            translation = await asyncio.wait_for(request, 5)
+
+            await client.CloseAsyncClient()
+            return translation, async_client
+
+        translation, async_client = asyncio.run(translate())
+
+        log_input_expected_result("Request cancelled", True, bool(cancelled))
+        self.assertIsNone(translation)
+        self.assertEqual(len(cancelled), 1)
+        self.assertTrue(async_client.is_closed)
+        self.assertIsNone(client._async_client)
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import threading
+import time
+
+from PySubtitle.Helpers.TestCases import DummyProvider, PrepareSubtitles, SubtitleTestCase
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.ProjectAutosave import ProjectAutosave
+from PySubtitle.SubtitleBatch import SubtitleBatch
+from PySubtitle.SubtitleBatcher import SubtitleBatcher
+from PySubtitle.SubtitleFile import SubtitleFile
+from PySubtitle.SubtitleProject import SubtitleProject
+from PySubtitle.SubtitleSerialisation import SubtitleEncoder
+from PySubtitle.SubtitleTranslator import SubtitleTranslator
+from tests.TestData.chinese_dinner import chinese_dinner_data
+
+
+class FailingEncoder(SubtitleEncoder):
+    def default(self, obj):
+        if isinstance(obj, SubtitleBatch):
+            raise OSError("Simulated failure while writing")
+        return super().default(obj)
+
+
+class ProjectAutosaveTests(SubtitleTestCase):
+    def __init__(self, methodName):
+        super().__init__(
+            methodName,
+            custom_options={"max_batch_size": 100, "project": "true", "project_journal": False, "autosave_interval": 0.0},
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.projectfile = os.path.join(self.directory.name, "chinese_dinner.subtrans")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_CoalescedSaves(self):
+        log_test_name("Coalesced saves")
+
+        saves = []
+        saved = threading.Event()
+
+        def save_changes(batches, scenes):
+            saves.append([batch.number for batch in batches])
+            saved.set()
+
+        autosave = ProjectAutosave(save_changes, interval=60.0, batch_count=3)
+        batches = [SubtitleBatch({"scene": 1, "number": number}) for number in range(1, 5)]
+
+        # The same batch changing twice is only saved once
+        for batch in [batches[0], batches[0], batches[1]]:
+            autosave.RequestSave(batch=batch)
+
+        self.assertTrue(saved.wait(5.0))
+        log_input_expected_result("First save", [[1, 2]], saves)
+        self.assertEqual(saves, [[1, 2]])
+
+        # Fewer requests than the batch count are held until the interval elapses or the worker is stopped
+        autosave.RequestSave(batch=batches[2])
+        autosave.RequestSave(batch=batches[3])
+        time.sleep(0.1)
+        self.assertEqual(len(saves), 1)
+
+        autosave.Stop()
+        log_input_expected_result("Saves after stop", [[1, 2], [3, 4]], saves)
+        self.assertEqual(saves, [[1, 2], [3, 4]])
+        self.assertFalse(autosave.pending)
+
+    def test_AutosaveProject(self):
+        log_test_name("Autosave project")
+
+        subtitles: SubtitleFile = PrepareSubtitles(chinese_dinner_data, "original")
+        subtitles.AutoBatch(SubtitleBatcher(self.options))
+
+        project = SubtitleProject(self.options, subtitles=subtitles)
+        project.save_subtitles = False
+        project.projectfile = self.projectfile
+
+        translator = SubtitleTranslator(self.options, translation_provider=DummyProvider(data=chinese_dinner_data))
+        project.TranslateSubtitles(translator)
+
+        log_input_expected_result("Autosaves", "> 0", project.autosave.save_count)
+        self.assertGreater(project.autosave.save_count, 0)
+        self.assertFalse(project.needs_writing)
+
+        loaded = SubtitleProject(self.options).ReadProjectFile(self.projectfile)
+        self.assertSequenceEqual([line.text for line in loaded.translated], [line.text for line in subtitles.translated])
+        self._assert_same_as_reference(loaded, subtitles)
+
+        self.assertEqual(os.listdir(self.directory.name), [os.path.basename(self.projectfile)])
+
+    def test_AtomicWrite(self):
+        log_test_name("Atomic project write")
+
+        subtitles: SubtitleFile = PrepareSubtitles(chinese_dinner_data, "original")
+        subtitles.AutoBatch(SubtitleBatcher(self.options))
+        subtitles.SaveProjectFile(self.projectfile, encoder_class=SubtitleEncoder)
+
+        with open(self.projectfile, "rb") as f:
+            expected = f.read()
+
+        with self.assertRaises(OSError):
+            subtitles.SaveProjectFile(self.projectfile, encoder_class=FailingEncoder)
+
+        with open(self.projectfile, "rb") as f:
+            content = f.read()
+
+        log_input_expected_result("Project file after failed write", len(expected), len(content))
+        self.assertEqual(content, expected)
+        self.assertEqual(os.listdir(self.directory.name), [os.path.basename(self.projectfile)])
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import tempfile
+
+from PySubtitle.Helpers.TestCases import DummyProvider, PrepareSubtitles, SubtitleTestCase
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.SubtitleBatcher import SubtitleBatcher
+from PySubtitle.SubtitleFile import SubtitleFile
+from PySubtitle.SubtitleProject import SubtitleProject
+from PySubtitle.SubtitleTranslator import SubtitleTranslator
+from tests.TestData.chinese_dinner import chinese_dinner_data
+
+
+class ProjectJournalTests(SubtitleTestCase):
+    def __init__(self, methodName):
+        super().__init__(
+            methodName,
+            custom_options={"max_batch_size": 100, "project": "true", "journal_compact_threshold": 100, "autosave": False},
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.projectfile = os.path.join(self.directory.name, "chinese_dinner.subtrans")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _translate_project(self, projectfile: str = None) -> SubtitleProject:
+        subtitles: SubtitleFile = PrepareSubtitles(chinese_dinner_data, "original")
+        subtitles.AutoBatch(SubtitleBatcher(self.options))
+
+        project = SubtitleProject(self.options, subtitles=subtitles)
+        project.save_subtitles = False
+        project.WriteProjectFile(projectfile or self.projectfile)
+
+        translator = SubtitleTranslator(self.options, translation_provider=DummyProvider(data=chinese_dinner_data))
+        project.TranslateSubtitles(translator)
+        return project
+
+    def test_ReplayJournal(self):
+        log_test_name("Replay journal")
+
+        project = self._translate_project()
+        journal = project.journal
+
+        batch_count = sum(scene.size for scene in project.subtitles.scenes)
+        log_input_expected_result("Journal records", f">= {batch_count - 1}", journal.record_count)
+        self.assertGreaterEqual(journal.record_count, batch_count - 1)
+        self.assertTrue(os.path.exists(journal.path))
+
+        # Simulate a crash part way through writing a record
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"scene": 1, "batch": 1, "data": {"_class": "Subtit')
+
+        loaded = SubtitleProject(self.options).ReadProjectFile(self.projectfile)
+
+        expected = [line.text for line in project.subtitles.translated]
+        log_input_expected_result("Translated lines", len(expected), len(loaded.translated or []))
+        self.assertSequenceEqual([line.text for line in loaded.translated], expected)
+        self._assert_same_as_reference(loaded, project.subtitles)
+
+    def test_CompressedProjectJournal(self):
+        log_test_name("Replay journal for a compressed project")
+
+        projectfile = os.path.join(self.directory.name, "chinese_dinner.subtrans.gz")
+        project = self._translate_project(projectfile)
+        self.assertGreater(project.journal.record_count, 0)
+
+        # The compressed project file is hashed as it is streamed, which must match the hash of the file on disk
+        with open(projectfile, "rb") as f:
+            expected_hash = hashlib.sha256(f.read()).hexdigest()
+
+        reloaded = SubtitleProject(self.options)
+        loaded = reloaded.ReadProjectFile(projectfile)
+
+        log_input_expected_result("Snapshot hash", expected_hash, reloaded.journal.snapshot_hash)
+        self.assertEqual(reloaded.journal.snapshot_hash, expected_hash)
+        self.assertSequenceEqual(
+            [line.text for line in loaded.translated], [line.text for line in project.subtitles.translated]
+        )
+
+    def test_CompactJournal(self):
+        log_test_name("Compact journal")
+
+        project = self._translate_project()
+        project.WriteProjectFile()
+
+        self.assertEqual(project.journal.record_count, 0)
+        self.assertFalse(os.path.exists(project.journal.path))
+
+        loaded = SubtitleProject(self.options).ReadProjectFile(self.projectfile)
+        self._assert_same_as_reference(loaded, project.subtitles)
+
+    def test_StaleJournal(self):
+        log_test_name("Stale journal")
+
+        project = self._translate_project()
+
+        # A project file that has changed since the journal was written should not have it replayed
+        with open(self.projectfile, "a", encoding="utf-8") as f:
+            f.write("\n")
+
+        loaded = SubtitleProject(self.options).ReadProjectFile(self.projectfile)
+
+        # Only the batches that were written to the project file in full are translated
+        translated = len(loaded.translated or [])
+        log_input_expected_result("Translated lines", f"< {len(project.subtitles.translated)}", translated)
+        self.assertLess(translated, len(project.subtitles.translated))
+        self.assertFalse(os.path.exists(project.journal.path))
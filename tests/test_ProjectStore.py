@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+
+from PySubtitle.Helpers.TestCases import DummyProvider, PrepareSubtitles, SubtitleTestCase
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.ProjectStore import ExportProject, ImportProject, ProjectStore
+from PySubtitle.SubtitleBatcher import SubtitleBatcher
+from PySubtitle.SubtitleFile import SubtitleFile
+from PySubtitle.SubtitleProject import SubtitleProject
+from PySubtitle.SubtitleSerialisation import SubtitleDecoder
+from PySubtitle.SubtitleTranslator import SubtitleTranslator
+from tests.TestData.chinese_dinner import chinese_dinner_data
+
+
+class ProjectStoreTests(SubtitleTestCase):
+    def __init__(self, methodName):
+        super().__init__(methodName, custom_options={"max_batch_size": 100, "project": "true"})
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.directory.name, "chinese_dinner.subtrans.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _translate_project(self) -> SubtitleProject:
+        subtitles: SubtitleFile = PrepareSubtitles(chinese_dinner_data, "original")
+        subtitles.AutoBatch(SubtitleBatcher(self.options))
+
+        project = SubtitleProject(self.options, subtitles=subtitles)
+        project.save_subtitles = False
+        project.WriteProjectFile(self.store_path)
+
+        translator = SubtitleTranslator(self.options, translation_provider=DummyProvider(data=chinese_dinner_data))
+        project.TranslateSubtitles(translator)
+        return project
+
+    def test_TranslateToStore(self):
+        log_test_name("Translate to project store")
+
+        project = self._translate_project()
+        self.assertEqual(project.GetProjectFilepath(self.store_path), os.path.normpath(self.store_path))
+
+        loaded = SubtitleProject(self.options).ReadProjectFile(self.store_path)
+
+        expected = [line.text for line in project.subtitles.translated]
+        log_input_expected_result("Translated lines", len(expected), len(loaded.translated or []))
+        self.assertSequenceEqual([line.text for line in loaded.translated], expected)
+        self._assert_same_as_reference(loaded, project.subtitles)
+
+        # Prompts and translations are not loaded until they are needed
+        batch = loaded.GetBatch(1, 1)
+        self.assertIn("translation", batch._deferred)
+        self.assertEqual(batch.translation.text, project.subtitles.GetBatch(1, 1).translation.text)
+        self.assertNotIn("translation", batch._deferred)
+        self.assertEqual(batch.prompt.batch_prompt, project.subtitles.GetBatch(1, 1).prompt.batch_prompt)
+
+    def test_ImportExport(self):
+        log_test_name("Import and export project store")
+
+        project = self._translate_project()
+
+        exported = os.path.join(self.directory.name, "exported.subtrans")
+        ExportProject(self.store_path, exported)
+
+        with open(exported, encoding="utf-8") as f:
+            exported_subtitles: SubtitleFile = json.load(f, cls=SubtitleDecoder)
+
+        self._assert_same_as_reference(exported_subtitles, project.subtitles)
+
+        imported = os.path.join(self.directory.name, "imported.subtrans.db")
+        ImportProject(exported, imported)
+
+        store = ProjectStore(imported)
+        try:
+            imported_subtitles = store.Load(lazy=False)
+        finally:
+            store.Close()
+
+        log_input_expected_result("Imported scenes", project.subtitles.scenecount, imported_subtitles.scenecount)
+        self._assert_same_as_reference(imported_subtitles, project.subtitles)
+        self.assertEqual(imported_subtitles.GetBatch(1, 1).translation.text, project.subtitles.GetBatch(1, 1).translation.text)
+
+    def test_CreateProjectByExtension(self):
+        log_test_name("Create a project by its extension")
+
+        sourcepath = os.path.join(self.directory.name, "chinese_dinner.srt")
+        with open(sourcepath, "w", encoding="utf-8") as f:
+            f.write(chinese_dinner_data["original"])
+
+        for projectfile in [self.store_path, os.path.join(self.directory.name, "chinese_dinner.subtrans.gz")]:
+            with self.subTest(projectfile=projectfile):
+                # A project file that does not exist yet is created from the subtitle file it is named after
+                project = SubtitleProject(self.options)
+                project.InitialiseProject(projectfile)
+
+                log_input_expected_result(projectfile, os.path.normpath(sourcepath), project.subtitles.sourcepath)
+                self.assertEqual(project.projectfile, os.path.normpath(projectfile))
+                self.assertEqual(project.subtitles.sourcepath, os.path.normpath(sourcepath))
+                self.assertTrue(project.subtitles.has_subtitles)
+
+                project.subtitles.AutoBatch(SubtitleBatcher(self.options))
+                project.WriteProjectFile()
+                self.assertTrue(os.path.exists(projectfile))
+
+                reloaded = SubtitleProject(self.options)
+                reloaded.InitialiseProject(projectfile)
+                self.assertEqual(reloaded.subtitles.scenecount, project.subtitles.scenecount)
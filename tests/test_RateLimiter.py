@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.RateLimiter import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_RequestBudget(self):
+        log_test_name("Request budget")
+
+        limiter = RateLimiter("test", requests_per_minute=6)
+
+        first_delay = limiter.Reserve()
+        log_input_expected_result("First request", 0.0, first_delay)
+        self.assertEqual(first_delay, 0.0)
+
+        second_delay = limiter.Reserve()
+        log_input_expected_result("Second request", 10.0, round(second_delay))
+        self.assertAlmostEqual(second_delay, 10.0, delta=0.5)
+
+        third_delay = limiter.Reserve()
+        log_input_expected_result("Third request", 20.0, round(third_delay))
+        self.assertAlmostEqual(third_delay, 20.0, delta=0.5)
+
+    def test_TokenBudget(self):
+        log_test_name("Token budget")
+
+        limiter = RateLimiter("test", tokens_per_minute=600)
+
+        log_input_expected_result("Within budget", 0.0, limiter.Reserve(100))
+        self.assertEqual(limiter.Reserve(0), 0.0)
+
+        delay = limiter.Reserve(50)
+        log_input_expected_result("Over budget", 5.0, round(delay))
+        self.assertAlmostEqual(delay, 5.0, delta=0.5)
+
+        # The request used fewer tokens than estimated, so the next request can be sent sooner
+        limiter.Reconcile(50, 20)
+        delay = limiter.Reserve(10)
+        log_input_expected_result("After reconciling", 3.0, round(delay))
+        self.assertAlmostEqual(delay, 3.0, delta=0.5)
+
+    def test_SharedStateFile(self):
+        log_test_name("Shared state file")
+
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, "ratelimit.json")
+
+            first = RateLimiter("shared", requests_per_minute=6, state_file=state_file)
+            second = RateLimiter("shared", requests_per_minute=6, state_file=state_file)
+            other = RateLimiter("other", requests_per_minute=6, state_file=state_file)
+
+            self.assertEqual(first.Reserve(), 0.0)
+
+            delay = second.Reserve()
+            log_input_expected_result("Shared budget", 10.0, round(delay))
+            self.assertAlmostEqual(delay, 10.0, delta=0.5)
+
+            self.assertEqual(other.Reserve(), 0.0)
@@ -0,0 +1,88 @@
+import threading
+import time
+import unittest
+
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.ReadWriteLock import ReadWriteLock
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_ConcurrentReaders(self):
+        log_test_name("Concurrent readers")
+
+        lock = ReadWriteLock()
+        reader_count = 4
+        barrier = threading.Barrier(reader_count, timeout=5.0)
+        errors = []
+
+        def reader():
+            with lock.read():
+                try:
+                    # Every reader must hold the lock at the same time to pass the barrier
+                    barrier.wait()
+                except threading.BrokenBarrierError as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=reader) for _ in range(reader_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        log_input_expected_result("Readers blocked", 0, len(errors))
+        self.assertEqual(errors, [])
+        self.assertEqual(lock.contention_count, 0)
+
+    def test_ExclusiveWriter(self):
+        log_test_name("Exclusive writer")
+
+        lock = ReadWriteLock()
+        events = []
+        writer_holding = threading.Event()
+
+        def writer():
+            with lock:
+                writer_holding.set()
+                time.sleep(0.05)
+                events.append("write")
+
+        def reader():
+            writer_holding.wait()
+            with lock.read():
+                events.append("read")
+
+        threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        log_input_expected_result("Order", ["write", "read"], events)
+        self.assertEqual(events, ["write", "read"])
+        log_input_expected_result("Read contention", 1, lock.read_contention)
+        self.assertEqual(lock.read_contention, 1)
+        self.assertGreater(lock.wait_time, 0.0)
+
+    def test_Reentrancy(self):
+        log_test_name("Reentrant locking")
+
+        lock = ReadWriteLock()
+
+        with lock, lock.write(), lock.read(), lock.read():
+            pass
+
+        with lock.read(), lock.read(), self.assertRaises(RuntimeError):
+            lock.AcquireWrite()
+
+        # The lock is free again afterwards
+        acquired = []
+
+        def writer():
+            with lock:
+                acquired.append(True)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        thread.join(5.0)
+        self.assertEqual(len(acquired), 1)
+        self.assertEqual(lock.contention_count, 0)
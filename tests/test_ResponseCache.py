@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import unittest
+
+from PySubtitle.Helpers.TestCases import DummyTranslationClient
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.ResponseCache import ResponseCache
+from PySubtitle.Translation import Translation
+
+
+class TestResponseCache(unittest.TestCase):
+    messages = [{"role": "user", "content": "Translate these subtitles"}]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_GetKey(self):
+        log_test_name("Cache keys")
+
+        key = ResponseCache.GetKey("OpenAI", "gpt-5", 0.0, self.messages, None)
+
+        self.assertEqual(key, ResponseCache.GetKey("OpenAI", "gpt-5", 0.0, list(self.messages), None))
+        self.assertNotEqual(key, ResponseCache.GetKey("OpenAI", "gpt-5", 0.5, self.messages, None))
+        self.assertNotEqual(key, ResponseCache.GetKey("OpenAI", "gpt-5-mini", 0.0, self.messages, None))
+        self.assertNotEqual(key, ResponseCache.GetKey("OpenAI", "gpt-5", 0.0, self.messages, "Instructions"))
+
+    def test_GetAndPut(self):
+        log_test_name("Cache get and put")
+
+        cache = ResponseCache(self.directory.name)
+        key = ResponseCache.GetKey("OpenAI", "gpt-5", 0.0, self.messages)
+
+        self.assertIsNone(cache.Get(key))
+
+        response = {"text": "#1\nTranslation>\nHello", "finish_reason": "stop", "prompt_tokens": 10}
+        cache.Put(key, response)
+
+        result = ResponseCache(self.directory.name).Get(key)
+        log_input_expected_result(key, response, result)
+        self.assertEqual(result, response)
+
+    def test_Expiry(self):
+        log_test_name("Cache expiry")
+
+        cache = ResponseCache(self.directory.name, ttl=60)
+        key = ResponseCache.GetKey("OpenAI", "gpt-5", 0.0, self.messages)
+        cache.Put(key, {"text": "Hello"})
+
+        # Backdate the entry beyond the time to live
+        path = cache._get_path(key)
+        with open(path, encoding="utf-8") as file:
+            entry = json.load(file)
+        entry["created"] -= 120
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+
+        self.assertIsNone(cache.Get(key))
+        self.assertFalse(os.path.exists(path))
+
+    def test_Eviction(self):
+        log_test_name("Cache eviction")
+
+        cache = ResponseCache(self.directory.name)
+        keys = [ResponseCache.GetKey("OpenAI", "gpt-5", 0.0, [{"role": "user", "content": str(i)}]) for i in range(4)]
+
+        cache.Put(keys[0], {"text": "0" * 100})
+        entry_size = os.path.getsize(cache._get_path(keys[0]))
+        # Entry sizes vary slightly with the timestamp, so allow some slack for three entries
+        cache.max_size = entry_size * 3 + entry_size // 2
+
+        for key in keys[1:3]:
+            cache.Put(key, {"text": "0" * 100})
+
+        # Using the first entry makes the second the least recently used
+        self.assertIsNotNone(cache.Get(keys[0]))
+        cache.Put(keys[3], {"text": "0" * 100})
+
+        remaining = [cache.Get(key) is not None for key in keys]
+        log_input_expected_result("Remaining entries", [True, False, True, True], remaining)
+        self.assertSequenceEqual(remaining, [True, False, True, True])
+
+    def test_IncompleteResponses(self):
+        log_test_name("Incomplete responses are not cached")
+
+        cache = ResponseCache(self.directory.name)
+        client = DummyTranslationClient({"instructions": "Translate these subtitles"})
+
+        for finish_reason, expected in [("stop", True), ("length", False), ("interrupted", False)]:
+            key = ResponseCache.GetKey("Dummy", "dummy", 0.0, self.messages, finish_reason)
+            translation = Translation({"text": "#1\nOriginal>\nHello\nTranslation>\nBonjour", "finish_reason": finish_reason})
+            client._cache_translation(cache, key, translation)
+
+            cached = cache.Get(key) is not None
+            log_input_expected_result(finish_reason, expected, cached)
+            self.assertEqual(cached, expected)
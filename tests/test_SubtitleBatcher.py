@@ -0,0 +1,171 @@
+import random
+import unittest
+from datetime import timedelta
+
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.SubtitleBatcher import SubtitleBatcher
+from PySubtitle.SubtitleLine import SubtitleLine
+from PySubtitle.SubtitleTimeline import IsTimelineAvailable
+from PySubtitle.TokenEstimator import TokenEstimator
+
+
+def _random_lines(count: int, seed: int) -> list[SubtitleLine]:
+    """
+    Generate lines with a mix of short gaps, long gaps, overlaps and sub-millisecond times
+    """
+    rng = random.Random(seed)
+    lines = []
+    start = 0
+    for number in range(1, count + 1):
+        start += rng.choice([rng.randint(-2000000, 0), rng.randint(0, 3000000), rng.randint(0, 60000000), rng.randint(0, 999)])
+        start = max(start, 0)
+        end = start + rng.randint(1, 5000000)
+        lines.append(
+            SubtitleLine.Construct(number, timedelta(microseconds=start), timedelta(microseconds=end), f"Line {number}")
+        )
+    return lines
+
+
+def _batch_lines(scenes) -> list[list[SubtitleLine]]:
+    return [batch.originals for scene in scenes for batch in scene.batches]
+
+
+def _describe(scenes) -> list[list[list[tuple]]]:
+    return [[[(line.number, line.start, line.end) for line in batch.originals] for batch in scene.batches] for scene in scenes]
+
+
+class SubtitleBatcherTests(unittest.TestCase):
+    @unittest.skipUnless(IsTimelineAvailable(), "numpy is not installed")
+    def test_TimelineBatching(self):
+        log_test_name("Timeline batching")
+
+        settings_list = [
+            {"min_batch_size": 2, "max_batch_size": 8, "scene_threshold": 30.0},
+            {"min_batch_size": 5, "max_batch_size": 20, "scene_threshold": 30.0},
+            {"min_batch_size": 10, "max_batch_size": 30, "scene_threshold": 10.0},
+            {"min_batch_size": 1, "max_batch_size": 100, "scene_threshold": 60.0},
+        ]
+
+        for seed, settings in enumerate(settings_list):
+            with self.subTest(settings=settings):
+                list_batcher = SubtitleBatcher(settings)
+                list_batcher.use_timeline = False
+                expected = _describe(list_batcher.BatchSubtitles(_random_lines(2000, seed)))
+
+                timeline_batcher = SubtitleBatcher(settings)
+                self.assertTrue(timeline_batcher.use_timeline)
+                result = _describe(timeline_batcher.BatchSubtitles(_random_lines(2000, seed)))
+
+                log_input_expected_result(settings, len(expected), len(result))
+                self.assertEqual(result, expected)
+
+    def test_IncompleteLines(self):
+        log_test_name("Batching lines without times")
+
+        lines = _random_lines(50, 0)
+        lines[10].end = None
+
+        scenes = SubtitleBatcher({"min_batch_size": 5, "max_batch_size": 100}).BatchSubtitles(lines)
+        line_count = sum(len(batch.originals) for scene in scenes for batch in scene.batches)
+
+        log_input_expected_result("Lines batched", len(lines), line_count)
+        self.assertEqual(line_count, len(lines))
+
+    def test_SplitLines(self):
+        log_test_name("Split lines at the largest gaps")
+
+        def reference_split(lines, min_size, max_size):
+            # The original recursive implementation
+            if len(lines) <= max_size:
+                return [lines]
+
+            longest_gap = timedelta(seconds=0)
+            split_index = min_size
+            last_split_index = len(lines) - min_size
+
+            if last_split_index > split_index:
+                for i in range(split_index, last_split_index):
+                    gap = lines[i].start - lines[i - 1].end
+                    if gap > longest_gap:
+                        longest_gap = gap
+                        split_index = i
+
+            return reference_split(lines[:split_index], min_size, max_size) + reference_split(
+                lines[split_index:], min_size, max_size
+            )
+
+        for seed, (min_size, max_size) in enumerate([(1, 10), (3, 7), (10, 30), (20, 100), (5, 10)]):
+            with self.subTest(min_batch_size=min_size, max_batch_size=max_size):
+                lines = _random_lines(1000, seed)
+                batcher = SubtitleBatcher({"min_batch_size": min_size, "max_batch_size": max_size})
+
+                expected = [[line.number for line in batch] for batch in reference_split(lines, min_size, max_size)]
+                result = [[line.number for line in batch] for batch in batcher._split_lines(lines)]
+
+                log_input_expected_result((min_size, max_size), len(expected), len(result))
+                self.assertEqual(result, expected)
+
+    def test_SplitLinesWithoutGaps(self):
+        log_test_name("Split lines without gaps")
+
+        # A long karaoke track where every line starts as the previous line ends
+        lines = [
+            SubtitleLine.Construct(number, timedelta(seconds=number), timedelta(seconds=number + 1), f"La {number}")
+            for number in range(1, 5001)
+        ]
+
+        batcher = SubtitleBatcher({"min_batch_size": 1, "max_batch_size": 10})
+        batches = batcher._split_lines(lines)
+
+        log_input_expected_result("Batch count", 4991, len(batches))
+        self.assertEqual([len(batch) for batch in batches], [1] * 4990 + [10])
+        self.assertEqual([line.number for batch in batches for line in batch], list(range(1, 5001)))
+
+    def test_TokenEstimator(self):
+        log_test_name("Character token estimator")
+
+        estimator = TokenEstimator()
+        cases = [("", 0), ("Hello", 2), ("Hello there, friend", 5), ("你好", 2), ("你好 world", 4)]
+        for text, expected in cases:
+            result = estimator.EstimateTokens(text)
+            log_input_expected_result(text, expected, result)
+            self.assertEqual(result, expected)
+
+    def test_TokenBatching(self):
+        log_test_name("Token budget batching")
+
+        rng = random.Random(42)
+        lines = _random_lines(600, 3)
+        for line in lines:
+            line.text = " ".join(["word"] * rng.choice([1, 1, 2, 3, 20]))
+
+        settings = {"min_batch_size": 2, "max_batch_size": 30, "scene_threshold": 600.0}
+        line_batches = _batch_lines(SubtitleBatcher(settings).BatchSubtitles(lines))
+
+        token_settings = {**settings, "max_batch_tokens": 1500}
+        batchers = [SubtitleBatcher(token_settings, estimator=TokenEstimator())]
+        if IsTimelineAvailable():
+            list_batcher = SubtitleBatcher(token_settings, estimator=TokenEstimator())
+            list_batcher.use_timeline = False
+            batchers.append(list_batcher)
+
+        results = [_batch_lines(batcher.BatchSubtitles(lines)) for batcher in batchers]
+        self.assertTrue(all(result == results[0] for result in results))
+
+        token_batches = results[0]
+        batcher = batchers[0]
+        self.assertEqual([line.number for batch in token_batches for line in batch], list(range(1, 601)))
+
+        for batch in token_batches:
+            tokens = sum(prompt + response for prompt, response in map(batcher.EstimateLineTokens, batch))
+            self.assertTrue(len(batch) <= 2 or tokens <= 1500, f"Batch of {len(batch)} lines has {tokens} tokens")
+
+        fewer_batches = len(token_batches) < len(line_batches)
+        log_input_expected_result((len(line_batches), len(token_batches)), True, fewer_batches)
+        self.assertTrue(fewer_batches)
+
+        # The provider's response limit is respected as well
+        limited = SubtitleBatcher(token_settings, max_output_tokens=400, estimator=TokenEstimator())
+        for batch in _batch_lines(limited.BatchSubtitles(lines)):
+            response_tokens = sum(response for _, response in map(limited.EstimateLineTokens, batch))
+            self.assertTrue(len(batch) <= 2 or response_tokens <= 400)
@@ -0,0 +1,150 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from PySubtitle.Helpers.TestCases import AddResponsesFromMap, AddTranslations, PrepareSubtitles, SubtitleTestCase
+from PySubtitle.Helpers.Tests import log_input_expected_result, log_test_name
+from PySubtitle.ProjectCompression import IsZstdAvailable
+from PySubtitle.SubtitleBatcher import SubtitleBatcher
+from PySubtitle.SubtitleError import SubtitleError
+from PySubtitle.SubtitleFile import SubtitleFile
+from PySubtitle.SubtitleProject import SubtitleProject
+from PySubtitle.SubtitleSerialisation import SubtitleDecoder, SubtitleEncoder
+from PySubtitle.Translation import Translation
+from tests.TestData.chinese_dinner import chinese_dinner_data
+
+
+class SubtitleSerialisationTests(SubtitleTestCase):
+    def _prepare_subtitles(self) -> SubtitleFile:
+        subtitles: SubtitleFile = PrepareSubtitles(chinese_dinner_data, "original")
+        subtitles.AutoBatch(SubtitleBatcher(self.options))
+        AddTranslations(subtitles, chinese_dinner_data, "translated")
+        return subtitles
+
+    def _encode(self, subtitles: SubtitleFile, **kwargs) -> str:
+        return json.dumps(subtitles, cls=SubtitleEncoder, ensure_ascii=False, **kwargs)
+
+    def test_CachedBatches(self):
+        log_test_name("Cached batch encoding")
+
+        subtitles = self._prepare_subtitles()
+
+        for indent in [4, None]:
+            expected = self._encode(subtitles, indent=indent, cache_batches=False)
+
+            encoded = self._encode(subtitles, indent=indent)
+            log_input_expected_result(f"First encoding (indent={indent})", len(expected), len(encoded))
+            self.assertEqual(encoded, expected)
+
+            encoded = self._encode(subtitles, indent=indent)
+            log_input_expected_result(f"Cached encoding (indent={indent})", len(expected), len(encoded))
+            self.assertEqual(encoded, expected)
+
+        decoded: SubtitleFile = json.loads(self._encode(subtitles, indent=4), cls=SubtitleDecoder)
+        self._assert_same_as_reference(decoded, subtitles)
+
+    def test_DirtyBatches(self):
+        log_test_name("Dirty batch encoding")
+
+        subtitles = self._prepare_subtitles()
+        self._encode(subtitles, indent=4)
+
+        batches = [batch for scene in subtitles.scenes for batch in scene.batches]
+        self.assertFalse(any(batch.dirty for batch in batches))
+
+        # Modify batches in the ways that the translator and editing operations do
+        first_batch = batches[0]
+        first_batch.translated = first_batch.translated[1:]
+
+        last_batch = batches[-1]
+        last_batch.AddContext("summary", "An updated summary")
+
+        middle_batch = batches[len(batches) // 2]
+        line_number = middle_batch.originals[0].number
+        subtitles.UpdateLineText(line_number, "Edited original", None)
+
+        self.assertTrue(first_batch.dirty and last_batch.dirty and middle_batch.dirty)
+
+        encoded = self._encode(subtitles, indent=4)
+        expected = self._encode(subtitles, indent=4, cache_batches=False)
+        self.assertEqual(encoded, expected)
+
+        decoded: SubtitleFile = json.loads(encoded, cls=SubtitleDecoder)
+        decoded_line = decoded.GetOriginalLine(line_number)
+        log_input_expected_result("Edited line", "Edited original", decoded_line.text)
+        self.assertEqual(decoded_line.text, "Edited original")
+        self.assertEqual(len(decoded.GetBatch(first_batch.scene, first_batch.number).translated), len(first_batch.translated))
+
+    def test_LazyDecoding(self):
+        log_test_name("Lazy decoding")
+
+        subtitles = self._prepare_subtitles()
+        AddResponsesFromMap(subtitles, chinese_dinner_data)
+        encoded = self._encode(subtitles, indent=4)
+
+        decoded: SubtitleFile = json.loads(encoded, cls=SubtitleDecoder, lazy=True)
+        self._assert_same_as_reference(decoded, subtitles)
+
+        batch = decoded.GetBatch(1, 1)
+        self.assertIn("translation", batch._deferred)
+
+        reference_batch = subtitles.GetBatch(1, 1)
+        log_input_expected_result("Deferred translation", reference_batch.translation.text[:20], batch.translation.text[:20])
+        self.assertIsInstance(batch.translation, Translation)
+        self.assertEqual(batch.translation.text, reference_batch.translation.text)
+        self.assertNotIn("translation", batch._deferred)
+
+        # Re-encoding a lazily decoded project produces the same output
+        self.assertEqual(self._encode(decoded, indent=4), encoded)
+
+    def test_StreamingEncoding(self):
+        log_test_name("Streaming encoding")
+
+        subtitles = self._prepare_subtitles()
+        expected = self._encode(subtitles, indent=4, cache_batches=False)
+
+        for attempt in ["first", "cached"]:
+            stream = io.StringIO()
+            json.dump(subtitles, stream, cls=SubtitleEncoder, ensure_ascii=False, indent=4)
+            log_input_expected_result(f"Streamed encoding ({attempt})", len(expected), len(stream.getvalue()))
+            self.assertEqual(stream.getvalue(), expected)
+
+    def test_CompressedProject(self):
+        log_test_name("Compressed project files")
+
+        subtitles = self._prepare_subtitles()
+        extensions = [".subtrans.gz"] + ([".subtrans.zst"] if IsZstdAvailable() else [])
+
+        with tempfile.TemporaryDirectory() as directory:
+            for extension in extensions:
+                projectfile = os.path.join(directory, f"chinese_dinner{extension}")
+
+                project = SubtitleProject(self.options, subtitles=subtitles)
+                self.assertEqual(project.GetProjectFilepath(projectfile), os.path.normpath(projectfile))
+                project.WriteProjectFile(projectfile)
+                expected = self._encode(subtitles, indent=4)
+
+                with open(projectfile, "rb") as f:
+                    content = f.read()
+
+                log_input_expected_result(f"Compressed size ({extension})", f"< {len(expected)}", len(content))
+                self.assertLess(len(content), len(expected))
+
+                if extension.endswith(".gz"):
+                    self.assertEqual(gzip.decompress(content).decode("utf-8"), expected)
+
+                loaded = SubtitleProject(self.options).ReadProjectFile(projectfile)
+                self._assert_same_as_reference(loaded, subtitles)
+
+    @unittest.skipIf(IsZstdAvailable(), "zstandard is installed")
+    def test_ZstdUnavailable(self):
+        log_test_name("Zstandard project without zstandard")
+
+        subtitles = self._prepare_subtitles()
+        with tempfile.TemporaryDirectory() as directory:
+            projectfile = os.path.join(directory, "chinese_dinner.subtrans.zst")
+            with self.assertRaises(SubtitleError):
+                subtitles.SaveProjectFile(projectfile, encoder_class=SubtitleEncoder)
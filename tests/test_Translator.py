@@ -1,12 +1,17 @@
+import asyncio
 from copy import deepcopy
 
+import regex
+
 from PySubtitle.Helpers.TestCases import DummyProvider, PrepareSubtitles, SubtitleTestCase
 from PySubtitle.Helpers.Tests import log_info, log_input_expected_result, log_test_name
 from PySubtitle.SubtitleBatch import SubtitleBatch
 from PySubtitle.SubtitleBatcher import SubtitleBatcher
+from PySubtitle.SubtitleError import LineTooLongError, TranslationResponseError, UntranslatedLinesError
 from PySubtitle.SubtitleFile import SubtitleFile
 from PySubtitle.SubtitleScene import SubtitleScene
 from PySubtitle.SubtitleTranslator import SubtitleTranslator
+from PySubtitle.Translation import Translation
 from tests.TestData.chinese_dinner import chinese_dinner_data
 
 
@@ -134,3 +139,467 @@ class SubtitleTranslatorTests(SubtitleTestCase):
 
             log_input_expected_result("Unchanged", expected_unchanged, unchanged)
             self.assertEqual(unchanged, expected_unchanged)
+
+    def test_ConcurrentTranslation(self):
+        log_test_name("Concurrent translation tests")
+
+        test_data = [chinese_dinner_data]
+
+        for data in test_data:
+            log_test_name(f"Testing concurrent translation of {data.get('movie_name')}")
+
+            batcher = SubtitleBatcher(self.options)
+
+            sequential: SubtitleFile = PrepareSubtitles(data, "original")
+            sequential.AutoBatch(batcher)
+
+            sequential_options = deepcopy(self.options)
+            sequential_options.add("max_threads", 1)
+            sequential_translator = SubtitleTranslator(sequential_options, translation_provider=DummyProvider(data=data))
+            self.assertFalse(sequential_translator.multithreaded)
+            sequential_translator.TranslateSubtitles(sequential)
+
+            concurrent: SubtitleFile = PrepareSubtitles(data, "original")
+            concurrent.AutoBatch(batcher)
+
+            provider = DummyProvider(data=data)
+            provider.settings["supports_parallel_threads"] = True
+
+            concurrent_options = deepcopy(self.options)
+            concurrent_options.add("max_threads", 4)
+            translator = SubtitleTranslator(concurrent_options, translation_provider=provider)
+            self.assertTrue(translator.multithreaded)
+
+            translated_batches = []
+            translator.events.batch_translated += lambda batch: translated_batches.append((batch.scene, batch.number))
+
+            translator.TranslateSubtitles(concurrent)
+
+            expected_order = [(batch.scene, batch.number) for scene in concurrent.scenes for batch in scene.batches]
+            log_input_expected_result("Batch order", expected_order, translated_batches)
+            self.assertSequenceEqual(translated_batches, expected_order)
+
+            log_input_expected_result("Translated lines", len(sequential.translated), len(concurrent.translated))
+            self.assertEqual(len(concurrent.translated), len(sequential.translated))
+            self.assertSequenceEqual(
+                [line.text for line in concurrent.translated], [line.text for line in sequential.translated]
+            )
+
+            log_test_name(f"Testing asyncio translation of {data.get('movie_name')}")
+
+            async_subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+            async_subtitles.AutoBatch(batcher)
+
+            async_translator = SubtitleTranslator(concurrent_options, translation_provider=provider)
+            asyncio.run(async_translator.TranslateSubtitlesAsync(async_subtitles))
+
+            log_input_expected_result("Async translated lines", len(sequential.translated), len(async_subtitles.translated))
+            self.assertSequenceEqual(
+                [line.text for line in async_subtitles.translated], [line.text for line in sequential.translated]
+            )
+
+    def test_DefaultIsSequential(self):
+        log_test_name("Default translation is sequential")
+
+        data = chinese_dinner_data
+        batcher = SubtitleBatcher(self.options)
+
+        def translate(options, supports_parallel_threads: bool) -> tuple[SubtitleTranslator, SubtitleFile, list]:
+            subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+            subtitles.AutoBatch(batcher)
+
+            provider = DummyProvider(data=data)
+            provider.settings["supports_parallel_threads"] = supports_parallel_threads
+            translator = SubtitleTranslator(options, translation_provider=provider)
+
+            prompts = []
+            request_translation = translator.client.RequestTranslation
+
+            def recording_request(prompt, *args, **kwargs):
+                prompts.append(deepcopy(prompt.content))
+                return request_translation(prompt, *args, **kwargs)
+
+            translator.client.RequestTranslation = recording_request
+
+            translator.TranslateSubtitles(subtitles)
+            return translator, subtitles, prompts
+
+        _, sequential, sequential_prompts = translate(self.options, supports_parallel_threads=False)
+
+        # Concurrent translation must be requested, even if the provider allows it
+        translator, subtitles, prompts = translate(self.options, supports_parallel_threads=True)
+
+        log_input_expected_result("Multithreaded", False, translator.multithreaded)
+        self.assertFalse(translator.multithreaded)
+        self.assertSequenceEqual(prompts, sequential_prompts)
+        self.assertSequenceEqual([line.text for line in subtitles.translated], [line.text for line in sequential.translated])
+
+    def test_SummaryPrepass(self):
+        log_test_name("Summary pre-pass tests")
+
+        test_data = [chinese_dinner_data]
+
+        for data in test_data:
+            log_test_name(f"Testing scene-parallel translation of {data.get('movie_name')}")
+
+            batcher = SubtitleBatcher(self.options)
+
+            reference: SubtitleFile = PrepareSubtitles(data, "original")
+            reference.AutoBatch(batcher)
+            SubtitleTranslator(self.options, translation_provider=DummyProvider(data=data)).TranslateSubtitles(reference)
+
+            subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+            subtitles.AutoBatch(batcher)
+
+            provider = DummyProvider(data=data)
+            provider.settings["supports_parallel_threads"] = True
+
+            options = deepcopy(self.options)
+            options.add("max_threads", 4)
+            options.add("scene_summary_prepass", True)
+            translator = SubtitleTranslator(options, translation_provider=provider)
+            translator.TranslateSubtitles(subtitles)
+
+            for scene in subtitles.scenes:
+                expected_summary = f"Summarise scene {scene.number} of {data.get('movie_name')} in English"
+                log_input_expected_result(f"Scene {scene.number} summary", expected_summary, scene.summary)
+                self.assertEqual(scene.summary, expected_summary)
+
+            if subtitles.scenecount > 1:
+                first_batch = subtitles.GetBatch(2, 1)
+                history = first_batch.context.get("history")
+                log_input_expected_result("History", True, bool(history))
+                self.assertIn(f"scene 1: {subtitles.GetScene(1).summary}", history)
+
+            self.assertSequenceEqual(
+                [line.text for line in subtitles.translated], [line.text for line in reference.translated]
+            )
+
+    def test_StreamedTranslation(self):
+        log_test_name("Streamed translation tests")
+
+        test_data = [chinese_dinner_data]
+
+        for data in test_data:
+            log_test_name(f"Testing streamed translation of {data.get('movie_name')}")
+
+            batcher = SubtitleBatcher(self.options)
+
+            reference: SubtitleFile = PrepareSubtitles(data, "original")
+            reference.AutoBatch(batcher)
+            SubtitleTranslator(self.options, translation_provider=DummyProvider(data=data)).TranslateSubtitles(reference)
+
+            subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+            subtitles.AutoBatch(batcher)
+
+            provider = DummyProvider(data=data)
+            provider.settings["supports_streaming"] = True
+
+            options = deepcopy(self.options)
+            options.add("stream_responses", True)
+            translator = SubtitleTranslator(options, translation_provider=provider)
+
+            streamed_lines = {}
+            translated_batches = []
+
+            def on_lines_translated(batch: SubtitleBatch, lines: list):
+                self.assertNotIn((batch.scene, batch.number), translated_batches)
+                streamed_lines.setdefault((batch.scene, batch.number), []).extend(line.number for line in lines)
+
+            translator.events.lines_translated += on_lines_translated
+            translator.events.batch_translated += lambda batch: translated_batches.append((batch.scene, batch.number))
+
+            translator.TranslateSubtitles(subtitles)
+
+            for scene in subtitles.scenes:
+                for batch in scene.batches:
+                    streamed = streamed_lines.get((batch.scene, batch.number), [])
+                    # Every line except the last is complete before the response finishes
+                    expected = [line.number for line in batch.translated][: len(streamed)]
+                    log_input_expected_result(f"Scene {batch.scene} batch {batch.number} streamed", expected, streamed)
+                    self.assertSequenceEqual(streamed, expected)
+                    self.assertGreaterEqual(len(streamed), min(batch.size, len(batch.translated)) - 1)
+
+            self.assertSequenceEqual(
+                [line.text for line in subtitles.translated], [line.text for line in reference.translated]
+            )
+
+    def test_TruncatedResponses(self):
+        log_test_name("Truncated response tests")
+
+        test_data = [chinese_dinner_data]
+
+        for data in test_data:
+            log_test_name(f"Testing truncated responses for {data.get('movie_name')}")
+
+            batcher = SubtitleBatcher(self.options)
+
+            reference: SubtitleFile = PrepareSubtitles(data, "original")
+            reference.AutoBatch(batcher)
+            SubtitleTranslator(self.options, translation_provider=DummyProvider(data=data)).TranslateSubtitles(reference)
+
+            for finish_reason in ["length", "interrupted"]:
+                log_test_name(f"Testing responses with finish reason {finish_reason}")
+
+                subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+                subtitles.AutoBatch(batcher)
+
+                provider = DummyProvider(data=data)
+                provider.settings["max_response_lines"] = 7
+                provider.settings["truncated_finish_reason"] = finish_reason
+
+                translator = SubtitleTranslator(self.options, translation_provider=provider)
+
+                requests = []
+                request_translation = translator.client.RequestTranslation
+                translator.client.RequestTranslation = lambda prompt, *args, **kwargs: (
+                    requests.append(prompt) or request_translation(prompt, *args, **kwargs)
+                )
+
+                translator.TranslateSubtitles(subtitles)
+
+                batch_count = sum(scene.size for scene in subtitles.scenes)
+                log_input_expected_result("Requests", f"> {batch_count}", len(requests))
+                self.assertGreater(len(requests), batch_count)
+
+                log_input_expected_result("Translated lines", reference.linecount, len(subtitles.translated))
+                self.assertSequenceEqual(
+                    [line.text for line in subtitles.translated], [line.text for line in reference.translated]
+                )
+                self.assertFalse(translator.errors)
+
+    def test_TargetedRetry(self):
+        log_test_name("Targeted retry tests")
+
+        data = chinese_dinner_data
+
+        subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+        subtitles.AutoBatch(SubtitleBatcher(self.options))
+
+        translator = SubtitleTranslator(self.options, translation_provider=DummyProvider(data=data))
+        translator.TranslateSubtitles(subtitles)
+
+        batch = subtitles.scenes[0].batches[0]
+        expected = [line.text for line in batch.translated]
+
+        # Lose some of the translations so that they need to be retried
+        failed_numbers = [batch.originals[5].number, batch.originals[6].number, batch.originals[-1].number]
+        for line in batch.originals:
+            if line.number in failed_numbers:
+                line.translation = None
+        batch.translated = [line for line in batch.translated if line.number not in failed_numbers]
+        batch.errors = [UntranslatedLinesError("No translation found for 3 lines", lines=batch.untranslated)]
+
+        prompts = []
+        request_translation = translator.client.RequestTranslation
+        translator.client.RequestTranslation = lambda prompt, *args, **kwargs: (
+            prompts.append(prompt) or request_translation(prompt, *args, **kwargs)
+        )
+
+        context = subtitles.GetBatchContext(batch.scene, batch.number)
+        translator.RequestRetranslation(batch, context=context)
+
+        requested = [int(number) for number in regex.findall(r"^#(\d+)$", prompts[0].batch_prompt, regex.MULTILINE)]
+        expected_requested = [line.number for line in batch.originals[3:9]] + [line.number for line in batch.originals[-3:]]
+        log_input_expected_result("Requested lines", expected_requested, requested)
+        self.assertSequenceEqual(requested, expected_requested)
+
+        self.assertSequenceEqual([line.text for line in batch.translated], expected)
+        self.assertFalse(batch.untranslated)
+        self.assertFalse(batch.errors)
+
+        # A line that is missing from the retry response keeps its previous translation
+        retry_line = batch.originals[2]
+        previous_translation = retry_line.translation
+        batch.errors = [LineTooLongError("Line is too long", lines=[retry_line])]
+
+        def request_without_line(prompt, *args, **kwargs):
+            translation = request_translation(prompt, *args, **kwargs)
+            blocks = regex.split(r"\n+(?=#\d+\n)", translation.text)
+            text = "\n\n".join(block for block in blocks if not block.startswith(f"#{retry_line.number}\n"))
+            return Translation({"text": text})
+
+        translator.client.RequestTranslation = request_without_line
+        translator.RequestRetranslation(batch, context=context)
+
+        translated_line = next(line for line in batch.translated if line.number == retry_line.number)
+        log_input_expected_result("Unmatched retry line", previous_translation, retry_line.translation)
+        self.assertEqual(retry_line.translation, previous_translation)
+        self.assertEqual(translated_line.text, previous_translation)
+        self.assertFalse(batch.untranslated)
+
+    def test_CoalescedScenes(self):
+        log_test_name("Coalesced scene tests")
+
+        data = chinese_dinner_data
+        batcher = SubtitleBatcher(self.options)
+
+        reference: SubtitleFile = PrepareSubtitles(data, "original")
+        reference.AutoBatch(batcher)
+        SubtitleTranslator(self.options, translation_provider=DummyProvider(data=data)).TranslateSubtitles(reference)
+
+        options = deepcopy(self.options)
+        options.add("coalesce_scene_size", 100)
+
+        groups = SubtitleBatcher(options).CoalesceScenes(reference.scenes)
+        log_input_expected_result("Scene groups", [[1, 2, 3, 4]], [[scene.number for scene in group] for group in groups])
+        self.assertEqual([[scene.number for scene in group] for group in groups], [[1, 2, 3, 4]])
+
+        # A response to the shared request that repeats the scene markers
+        responses = [data["response_map"][f"Translate scene {number} batch 1"] for number in range(1, 5)]
+        combined_data = deepcopy(data)
+        combined_data["response_map"] = {
+            "Translate scene 1 batch 1": "\n\n".join(
+                f"[Scene {number}]\n{response.strip()}" for number, response in enumerate(responses, start=1)
+            )
+        }
+
+        for provider_data, expected_requests in [(combined_data, 1), (data, 4)]:
+            subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+            subtitles.AutoBatch(batcher)
+
+            translator = SubtitleTranslator(options, translation_provider=DummyProvider(data=provider_data))
+
+            requests = []
+            request_translation = translator.client.RequestTranslation
+            translator.client.RequestTranslation = lambda prompt, *args, **kwargs: (
+                requests.append(prompt) or request_translation(prompt, *args, **kwargs)
+            )
+
+            translated_scenes = []
+            translator.events.scene_translated += lambda scene: translated_scenes.append(scene.number)
+
+            translator.TranslateSubtitles(subtitles)
+
+            log_input_expected_result("Requests", expected_requests, len(requests))
+            self.assertEqual(len(requests), expected_requests)
+            self.assertIn("[Scene 2]", requests[0].batch_prompt)
+
+            self.assertEqual(translated_scenes, [1, 2, 3, 4])
+
+            # Each batch receives the summary from its own scene's part of the response
+            summaries = [batch.summary for scene in subtitles.scenes for batch in scene.batches]
+            reference_summaries = [batch.summary for scene in reference.scenes for batch in scene.batches]
+            log_input_expected_result("Batch summaries", reference_summaries, summaries)
+            self.assertSequenceEqual(summaries, reference_summaries)
+            self.assertSequenceEqual(
+                [line.text for line in subtitles.translated], [line.text for line in reference.translated]
+            )
+            self.assertFalse(translator.errors)
+
+    def test_CoalescedSceneErrors(self):
+        log_test_name("Coalesced scene error tests")
+
+        data = chinese_dinner_data
+        batcher = SubtitleBatcher(self.options)
+
+        reference: SubtitleFile = PrepareSubtitles(data, "original")
+        reference.AutoBatch(batcher)
+        SubtitleTranslator(self.options, translation_provider=DummyProvider(data=data)).TranslateSubtitles(reference)
+
+        options = deepcopy(self.options)
+        options.add("max_batch_size", 60)
+        options.add("coalesce_scene_size", 30)
+
+        groups = SubtitleBatcher(options).CoalesceScenes(reference.scenes)
+        self.assertEqual([[scene.number for scene in group] for group in groups], [[1, 2], [3, 4]])
+
+        def create_translator(fail_requests: int) -> tuple[SubtitleTranslator, list]:
+            translator = SubtitleTranslator(options, translation_provider=DummyProvider(data=data))
+
+            requests = []
+            request_translation = translator.client.RequestTranslation
+
+            def failing_request(prompt, *args, **kwargs):
+                requests.append(prompt)
+                if len(requests) <= fail_requests:
+                    raise TranslationResponseError("Simulated provider error", response=None)
+                return request_translation(prompt, *args, **kwargs)
+
+            translator.client.RequestTranslation = failing_request
+            return translator, requests
+
+        # A failed group request is recovered by translating each batch separately
+        subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+        subtitles.AutoBatch(batcher)
+        translator, requests = create_translator(fail_requests=1)
+        translator.TranslateSubtitles(subtitles)
+
+        # The second group gets one request, plus another for scene 4, which the dummy response does not include
+        log_input_expected_result("Requests", 5, len(requests))
+        self.assertEqual(len(requests), 5)
+        self.assertFalse(translator.errors)
+        self.assertSequenceEqual([line.text for line in subtitles.translated], [line.text for line in reference.translated])
+
+        # If the batches cannot be translated separately either, stop_on_error stops before the next group
+        subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+        subtitles.AutoBatch(batcher)
+        translator, requests = create_translator(fail_requests=100)
+        translator.TranslateSubtitles(subtitles)
+
+        log_input_expected_result("Requests", 2, len(requests))
+        self.assertEqual(len(requests), 2)
+        self.assertTrue(translator.errors)
+        self.assertFalse(subtitles.translated)
+
+    def test_AsyncClientLifetime(self):
+        log_test_name("Async client lifetime tests")
+
+        class DummyAsyncClient:
+            def __init__(self):
+                self.closed = False
+
+            async def aclose(self):
+                self.closed = True
+
+        data = chinese_dinner_data
+        provider = DummyProvider(data=data)
+        provider.settings["supports_parallel_threads"] = True
+
+        options = deepcopy(self.options)
+        options.add("max_threads", 4)
+        translator = SubtitleTranslator(options, translation_provider=provider)
+        client = translator.client
+        client._create_async_client = DummyAsyncClient
+
+        async def get_async_client():
+            return client._get_async_client()
+
+        first_client = asyncio.run(get_async_client())
+        self.assertFalse(first_client.closed)
+
+        async def translate():
+            # The client from the previous event loop is replaced and closed
+            second_client = client._get_async_client()
+            self.assertIsNot(second_client, first_client)
+
+            subtitles: SubtitleFile = PrepareSubtitles(data, "original")
+            subtitles.AutoBatch(SubtitleBatcher(options))
+            await translator.TranslateSubtitlesAsync(subtitles)
+            return second_client
+
+        second_client = asyncio.run(translate())
+
+        log_input_expected_result("Clients closed", (True, True), (first_client.closed, second_client.closed))
+        self.assertTrue(first_client.closed)
+        self.assertTrue(second_client.closed)
+        self.assertIsNone(client._async_client)
+
+    def test_MaxOutputTokens(self):
+        log_test_name("Provider response token limit")
+
+        data = chinese_dinner_data
+        options = deepcopy(self.options)
+        options.add("max_batch_tokens", 2000)
+
+        translator = SubtitleTranslator(options, translation_provider=DummyProvider(data=data))
+        log_input_expected_result("No limit", 0, translator.batcher.max_output_tokens)
+        self.assertEqual(translator.batcher.max_output_tokens, 0)
+
+        # The limit is a provider setting, which the translator's settings do not include
+        provider = DummyProvider(data=data)
+        provider.settings["max_tokens"] = 400
+        translator = SubtitleTranslator(options, translation_provider=provider)
+
+        log_input_expected_result("Provider limit", 400, translator.batcher.max_output_tokens)
+        self.assertEqual(translator.batcher.max_output_tokens, 400)